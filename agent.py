@@ -1,25 +1,23 @@
 import argparse
 import os
 import sys
-import time
 from datetime import datetime
 
 import requests
 import trafilatura
 from dotenv import load_dotenv
-from duckduckgo_search import DDGS
-from google import genai
 from rich.box import ROUNDED
 from rich.console import Console
 from rich.panel import Panel
 from rich.text import Text
 
+from agents.llm_gateway import LLMGatewayError, generate_text, generate_with_fallback
+from agents.search_gateway import search_text
+
 load_dotenv()
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-if GOOGLE_API_KEY:
-    client = genai.Client(api_key=GOOGLE_API_KEY)
 
 BRAVE_API_KEY = os.getenv("BRAVE_API_KEY")
+SCRAPE_TIMEOUT = float(os.getenv("SCRAPE_TIMEOUT", "15"))
 
 
 def brave_search_api(query: str):
@@ -76,36 +74,37 @@ def search_legal_news(country="USA", max_results=5, topic=None):
 
     # --- 1. Primary: DuckDuckGo Specific ---
     try:
-        with DDGS() as ddgs:
-            # Narrow search to reliable domains for specific legal news
-            ddg_results = ddgs.text(primary_query, region=region, max_results=max_results)
-            if ddg_results:
-                for r in ddg_results:
-                    results.append(
-                        {"title": r.get("title"), "href": r.get("href"), "body": r.get("body")}
-                    )
-                msg = (
-                    f" Marcus Vane Intelligence: Analyzing {len(results)} "
-                    f"news items for {country}..."
+        # Narrow search to reliable domains for specific legal news
+        ddg_results = search_text(
+            primary_query, region=region, max_results=max_results, agent="content_agent"
+        )
+        if ddg_results:
+            for r in ddg_results:
+                results.append(
+                    {"title": r.get("title"), "href": r.get("href"), "body": r.get("body")}
                 )
-                print(msg)
-                return results
+            msg = (
+                f" Marcus Vane Intelligence: Analyzing {len(results)} "
+                f"news items for {country}..."
+            )
+            print(msg)
+            return results
     except Exception as e:
         print(f"  ❌ DDG Specific failed: {e}")
 
     # --- 2. Secondary: DuckDuckGo Broad ---
     try:
-        time.sleep(2)
-        with DDGS() as ddgs:
-            # Broad search for current legal headlines
-            ddg_results = ddgs.text(secondary_query, region=region, max_results=max_results)
-            if ddg_results:
-                for r in ddg_results:
-                    results.append(
-                        {"title": r.get("title"), "href": r.get("href"), "body": r.get("body")}
-                    )
-                print(f"  ✅ DDG Broad found {len(results)} results.")
-                return results
+        # Broad search for current legal headlines (the gateway spaces requests out)
+        ddg_results = search_text(
+            secondary_query, region=region, max_results=max_results, agent="content_agent"
+        )
+        if ddg_results:
+            for r in ddg_results:
+                results.append(
+                    {"title": r.get("title"), "href": r.get("href"), "body": r.get("body")}
+                )
+            print(f"  ✅ DDG Broad found {len(results)} results.")
+            return results
     except Exception as e:
         print(f"  ❌ DDG Broad failed: {e}")
 
@@ -143,12 +142,13 @@ def search_legal_news(country="USA", max_results=5, topic=None):
 def scrape_content(url):
     """
     Extract main text from a URL using Trafilatura.
+    The download has a timeout (trafilatura.fetch_url has none), so one slow site
+    cannot stall the run.
     """
     try:
-        downloaded = trafilatura.fetch_url(url)
-        if downloaded:
-            text = trafilatura.extract(downloaded)
-            return text
+        response = requests.get(url, timeout=SCRAPE_TIMEOUT)
+        if response.ok and response.text:
+            return trafilatura.extract(response.text)
         return None
     except Exception as e:
         print(f"Error scraping {url}: {e}")
@@ -166,10 +166,10 @@ def is_relevant(text):
     # Multi-model logic for relevance checking (candidate models not used in current implementation)
     try:
         # Use a cheaper/faster model for this check
-        response = client.models.generate_content(
-            model="gemini-flash-latest", contents=f"Is this article relevant? {text[:2000]}"
+        answer = generate_text(
+            "gemini-flash-latest", f"Is this article relevant? {text[:2000]}", agent="content_agent"
         )
-        return "yes" in (response.text or "").lower()
+        return "yes" in answer.lower()
     except Exception:
         return True  # Fallback to include if check fails
 
@@ -244,21 +244,16 @@ def generate_linkedin_posts(articles_text, country):
 
     # Multi-Model Fallback Chain
 
-    for model_name in [country_model, "gemini-3-flash", "gemini-flash-latest"]:
-        try:
-            print(f"  Attempting generation with {model_name}...")
-            response = client.models.generate_content(model=model_name, contents=prompt)
-
-            if response.text:
-                raw_text = response.text
-                # Apply 2026 Compliance Layers
-                final = apply_2026_standards(raw_text)
-                return final
-        except Exception as e:
-            print(f"  ⚠️ {model_name} failed: {e}")
-            continue
+    # Hedged: a slow model gets the next one fired alongside it, first answer wins.
+    models = [country_model, "gemini-3-flash", "gemini-flash-latest"]
+    try:
+        print(f"  Attempting generation with {' → '.join(models)}...")
+        raw_text = generate_with_fallback(models, prompt, agent="content_agent")
+    except LLMGatewayError:
+        return "Error: All models in fallback chain failed."
 
-    return "Error: All models in fallback chain failed."
+    # Apply 2026 Compliance Layers
+    return apply_2026_standards(raw_text)
 
 
 def show_phone_preview(posts_text):
@@ -5,13 +5,29 @@ Purpose: Identify high-potential candidates blocked from partnership at Tier-1 f
 
 import json
 import os
+import sys
+from typing import AsyncIterator
+
+try:
+    from agents.llm_gateway import (
+        StructuredOutputError,
+        agenerate_structured,
+        astream_structured,
+        generate_structured,
+    )
+    from models import FrustrationAssessment
+except ImportError:  # pragma: no cover - supports direct script execution.
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from llm_gateway import (  # type: ignore
+        StructuredOutputError,
+        agenerate_structured,
+        astream_structured,
+        generate_structured,
+    )
 
-from dotenv import load_dotenv
-from google import genai
+    from models import FrustrationAssessment
 
-load_dotenv()
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-client = genai.Client(api_key=GOOGLE_API_KEY)
+MODEL_ID = "gemini-3-pro"
 
 # Tier-1 Firm List (German Market)
 TIER_1_FIRMS = [
@@ -67,24 +83,14 @@ IMPORTANT: Only output candidates with a Frustration Score >70. Return valid JSO
 """
 
 
-def analyze_profiles(profiles_text: str) -> dict:
-    """
-    Analyzes lawyer profiles and returns frustration scores.
-
-    Args:
-        profiles_text: Raw text containing lawyer profiles (from LinkedIn, JUVE, Legal 500, etc.)
-
-    Returns:
-        JSON object with scored candidates
-    """
-
+def _build_prompt(profiles_text: str) -> str:
     # Enrich the prompt with firm context
     firm_context = f"""
     Known Tier-1 Firms: {", ".join(TIER_1_FIRMS)}
     Firms with Up-or-Out Policy: {", ".join(UP_OR_OUT_FIRMS)}
     """
 
-    full_prompt = f"""
+    return f"""
     {SYSTEM_PROMPT}
     
     FIRM CONTEXT:
@@ -96,24 +102,53 @@ def analyze_profiles(profiles_text: str) -> dict:
     Return your analysis as a JSON array. If no candidates score >70, return an empty array [].
     """
 
+
+def analyze_profiles(profiles_text: str) -> dict:
+    """
+    Analyzes lawyer profiles and returns frustration scores.
+
+    Args:
+        profiles_text: Raw text containing lawyer profiles (from LinkedIn, JUVE, Legal 500, etc.)
+
+    Returns:
+        JSON object with scored candidates
+    """
     try:
-        response = client.models.generate_content(model="gemini-3-pro", contents=full_prompt)
-
-        # Extract JSON from response
-        text = response.text
-        # Clean potential markdown
-        if "```json" in text:
-            text = text.split("```json")[1].split("```")[0]
-        elif "```" in text:
-            text = text.split("```")[1].split("```")[0]
-
-        return json.loads(text.strip())
-    except json.JSONDecodeError:
-        return {"error": "Failed to parse JSON", "raw_response": response.text}
+        return generate_structured(
+            MODEL_ID, _build_prompt(profiles_text), list[FrustrationAssessment], agent="agent_a"
+        )
+    except StructuredOutputError as e:
+        return {"error": "Failed to parse JSON", "raw_response": e.raw_response}
     except Exception as e:
         return {"error": str(e)}
 
 
+async def analyze_profiles_async(profiles_text: str) -> dict:
+    """Async variant of `analyze_profiles` on the shared gateway client."""
+    try:
+        return await agenerate_structured(
+            MODEL_ID, _build_prompt(profiles_text), list[FrustrationAssessment], agent="agent_a"
+        )
+    except StructuredOutputError as e:
+        return {"error": "Failed to parse JSON", "raw_response": e.raw_response}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+async def stream_profiles_async(profiles_text: str) -> AsyncIterator[dict]:
+    """
+    Streaming variant of `analyze_profiles_async`: yields each scored candidate
+    as soon as its JSON object is complete, before the rest of the array arrives.
+
+    Raises:
+        StructuredOutputError: if a candidate fails validation or the output is not an array
+    """
+    async for candidate in astream_structured(
+        MODEL_ID, _build_prompt(profiles_text), FrustrationAssessment, agent="agent_a"
+    ):
+        yield candidate
+
+
 def score_candidate_manual(candidate: dict) -> dict:
     """
     Manual scoring logic if you have structured data.
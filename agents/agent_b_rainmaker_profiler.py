@@ -5,13 +5,22 @@ Purpose: Validate the business case (revenue potential) of a candidate by estima
 
 import json
 import os
+import sys
 
-from dotenv import load_dotenv
-from google import genai
+try:
+    from agents.llm_gateway import StructuredOutputError, agenerate_structured, generate_structured
+    from models import RevenueAnalysis
+except ImportError:  # pragma: no cover - supports direct script execution.
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from llm_gateway import (  # type: ignore
+        StructuredOutputError,
+        agenerate_structured,
+        generate_structured,
+    )
 
-load_dotenv()
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-client = genai.Client(api_key=GOOGLE_API_KEY)
+    from models import RevenueAnalysis
+
+MODEL_ID = "gemini-3-pro"
 
 # Revenue thresholds
 MIN_PORTABLE_REVENUE = 200_000  # €200k threshold for "Go"
@@ -60,6 +69,19 @@ Output Format - Return a JSON object:
 """
 
 
+def _build_prompt(deal_sheet: str, candidate_name: str) -> str:
+    return f"""
+    {SYSTEM_PROMPT}
+    
+    CANDIDATE NAME: {candidate_name}
+    
+    DEAL SHEET / BIOGRAPHY:
+    {deal_sheet}
+    
+    Provide your analysis as valid JSON. Be conservative in your estimates.
+    """
+
+
 def analyze_book_of_business(deal_sheet: str, candidate_name: str = "Unknown") -> dict:
     """
     Analyzes a lawyer's deal sheet or biography to estimate portable revenue.
@@ -71,31 +93,22 @@ def analyze_book_of_business(deal_sheet: str, candidate_name: str = "Unknown") -
     Returns:
         Business case memo as JSON
     """
+    prompt = _build_prompt(deal_sheet, candidate_name)
+    try:
+        return generate_structured(MODEL_ID, prompt, RevenueAnalysis, agent="agent_b")
+    except StructuredOutputError as e:
+        return {"error": "Failed to parse JSON", "raw_response": e.raw_response}
+    except Exception as e:
+        return {"error": str(e)}
 
-    full_prompt = f"""
-    {SYSTEM_PROMPT}
-    
-    CANDIDATE NAME: {candidate_name}
-    
-    DEAL SHEET / BIOGRAPHY:
-    {deal_sheet}
-    
-    Provide your analysis as valid JSON. Be conservative in your estimates.
-    """
 
+async def analyze_book_of_business_async(deal_sheet: str, candidate_name: str = "Unknown") -> dict:
+    """Async variant of `analyze_book_of_business` on the shared gateway client."""
+    prompt = _build_prompt(deal_sheet, candidate_name)
     try:
-        response = client.models.generate_content(model="gemini-3-pro", contents=full_prompt)
-
-        text = response.text
-        if "```json" in text:
-            text = text.split("```json")[1].split("```")[0]
-        elif "```" in text:
-            text = text.split("```")[1].split("```")[0]
-
-        result = json.loads(text.strip())
-        return result
-    except json.JSONDecodeError:
-        return {"error": "Failed to parse JSON", "raw_response": response.text}
+        return await agenerate_structured(MODEL_ID, prompt, RevenueAnalysis, agent="agent_b")
+    except StructuredOutputError as e:
+        return {"error": "Failed to parse JSON", "raw_response": e.raw_response}
     except Exception as e:
         return {"error": str(e)}
 
@@ -5,13 +5,22 @@ Purpose: Write hyper-personalized outreach messages that convert.
 
 import json
 import os
+import sys
+
+try:
+    from agents.llm_gateway import StructuredOutputError, agenerate_structured, generate_structured
+    from models import OutreachDraft
+except ImportError:  # pragma: no cover - supports direct script execution.
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from llm_gateway import (  # type: ignore
+        StructuredOutputError,
+        agenerate_structured,
+        generate_structured,
+    )
 
-from dotenv import load_dotenv
-from google import genai
+    from models import OutreachDraft
 
-load_dotenv()
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-client = genai.Client(api_key=GOOGLE_API_KEY)
+MODEL_ID = "gemini-3-pro"
 
 SYSTEM_PROMPT = """
 You are the Ghostwriter for the Managing Partner of Gunnercooke Germany. You are writing a direct message to a senior lawyer at a competitor firm.
@@ -42,6 +51,28 @@ Keep the total message (body + P.S.) under 100 words.
 """
 
 
+def _build_prompt(
+    candidate_name: str,
+    current_firm: str,
+    recent_achievement: str,
+    practice_area: str,
+    sender_name: str,
+) -> str:
+    return f"""
+    {SYSTEM_PROMPT}
+    
+    CANDIDATE CONTEXT:
+    - Name: {candidate_name}
+    - Current Firm: {current_firm}
+    - Practice Area: {practice_area}
+    - Recent Achievement: {recent_achievement}
+    
+    SENDER: {sender_name}, Managing Partner, Gunnercooke Germany
+    
+    Generate the outreach message as valid JSON. Remember: max 100 words total, peer-to-peer tone, reference the Netto-Rechner.
+    """
+
+
 def generate_outreach(
     candidate_name: str,
     current_firm: str,
@@ -62,34 +93,32 @@ def generate_outreach(
     Returns:
         JSON with message components
     """
+    prompt = _build_prompt(
+        candidate_name, current_firm, recent_achievement, practice_area, sender_name
+    )
+    try:
+        return generate_structured(MODEL_ID, prompt, OutreachDraft, agent="agent_c")
+    except StructuredOutputError as e:
+        return {"error": "Failed to parse JSON", "raw_response": e.raw_response}
+    except Exception as e:
+        return {"error": str(e)}
 
-    full_prompt = f"""
-    {SYSTEM_PROMPT}
-    
-    CANDIDATE CONTEXT:
-    - Name: {candidate_name}
-    - Current Firm: {current_firm}
-    - Practice Area: {practice_area}
-    - Recent Achievement: {recent_achievement}
-    
-    SENDER: {sender_name}, Managing Partner, Gunnercooke Germany
-    
-    Generate the outreach message as valid JSON. Remember: max 100 words total, peer-to-peer tone, reference the Netto-Rechner.
-    """
 
+async def generate_outreach_async(
+    candidate_name: str,
+    current_firm: str,
+    recent_achievement: str,
+    practice_area: str,
+    sender_name: str = "Managing Partner",
+) -> dict:
+    """Async variant of `generate_outreach` on the shared gateway client."""
+    prompt = _build_prompt(
+        candidate_name, current_firm, recent_achievement, practice_area, sender_name
+    )
     try:
-        response = client.models.generate_content(model="gemini-3-pro", contents=full_prompt)
-
-        text = response.text
-        if "```json" in text:
-            text = text.split("```json")[1].split("```")[0]
-        elif "```" in text:
-            text = text.split("```")[1].split("```")[0]
-
-        result = json.loads(text.strip())
-        return result
-    except json.JSONDecodeError:
-        return {"error": "Failed to parse JSON", "raw_response": response.text}
+        return await agenerate_structured(MODEL_ID, prompt, OutreachDraft, agent="agent_c")
+    except StructuredOutputError as e:
+        return {"error": "Failed to parse JSON", "raw_response": e.raw_response}
     except Exception as e:
         return {"error": str(e)}
 
@@ -3,15 +3,15 @@ Agent D: The Scheduling Concierge
 Purpose: Handle logistics and interviewer briefing for candidate interviews.
 """
 
-import os
 from datetime import datetime
 
-from dotenv import load_dotenv
-from google import genai
+try:
+    from agents.llm_gateway import agenerate_text, generate_text
+except ImportError:  # pragma: no cover - supports direct script execution.
+    from llm_gateway import agenerate_text, generate_text  # type: ignore
 
-load_dotenv()
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-client = genai.Client(api_key=GOOGLE_API_KEY)
+# Using gemini-1.5-flash as gemini-3-flash is not a standard model name
+SLOTS_MODEL_ID = "gemini-1.5-flash"
 
 # Configuration
 MAX_INTERVIEWS_PER_PARTNER_PER_WEEK = 3
@@ -71,13 +71,11 @@ def find_matching_interviewer(candidate_niche: str) -> dict:
     return None
 
 
-def generate_time_slots(days_ahead: int = 7) -> list:
-    """Generate available evening time slots for the next N days."""
+def _build_slots_prompt(days_ahead: int) -> str:
     # The original logic for generating slots is replaced by a call to the generative model.
     # The model will be prompted to suggest evening slots for the next N days.
-
     today = datetime.now().strftime("%Y-%m-%d")
-    prompt = f"""
+    return f"""
     Generate a list of 10 distinct evening time slots for interviews over the next {days_ahead} days, starting from tomorrow ({today}).
     Each slot should be in the format: "DayOfWeek, Day Month Year at HH:MM CET".
     Prioritize times between 18:00 and 20:00 CET.
@@ -89,20 +87,26 @@ def generate_time_slots(days_ahead: int = 7) -> list:
     Wednesday, 24 July 2024 at 19:00 CET
     """
 
-    response = client.models.generate_content(
-        model="gemini-1.5-flash",  # Using gemini-1.5-flash as gemini-3-flash is not a standard model name
-        contents=prompt,
-    )
 
+def _parse_slots(text: str) -> list:
     # Parse the response into a list of strings
-    slots = [s.strip() for s in response.text.split("\n") if s.strip()]
+    slots = [s.strip() for s in text.split("\n") if s.strip()]
     return slots[:10]  # Ensure we return at most 10 options as per original function's intent
 
 
-def generate_scheduling_email(candidate_name: str) -> str:
-    """Generate the scheduling email to send to candidate."""
-    slots = generate_time_slots()
+def generate_time_slots(days_ahead: int = 7) -> list:
+    """Generate available evening time slots for the next N days."""
+    text = generate_text(SLOTS_MODEL_ID, _build_slots_prompt(days_ahead), agent="agent_d")
+    return _parse_slots(text)
+
+
+async def generate_time_slots_async(days_ahead: int = 7) -> list:
+    """Async variant of `generate_time_slots` on the shared gateway client."""
+    text = await agenerate_text(SLOTS_MODEL_ID, _build_slots_prompt(days_ahead), agent="agent_d")
+    return _parse_slots(text)
+
 
+def _render_scheduling_email(candidate_name: str, slots: list) -> str:
     email = f"""
 Dear {candidate_name},
 
@@ -126,6 +130,16 @@ Gunnercooke Germany
     return email
 
 
+def generate_scheduling_email(candidate_name: str) -> str:
+    """Generate the scheduling email to send to candidate."""
+    return _render_scheduling_email(candidate_name, generate_time_slots())
+
+
+async def generate_scheduling_email_async(candidate_name: str) -> str:
+    """Async variant of `generate_scheduling_email`."""
+    return _render_scheduling_email(candidate_name, await generate_time_slots_async())
+
+
 def generate_briefing_dossier(
     candidate_name: str,
     current_firm: str,
@@ -228,13 +242,48 @@ class SchedulingConcierge:
         scheduling_email = generate_scheduling_email(candidate_name)
 
         # Task 3: Generate briefing dossier
-        briefing = generate_briefing_dossier(
+        return self._build_result(
+            interviewer,
+            scheduling_email,
             candidate_name=candidate_name,
             current_firm=current_firm,
             practice_area=practice_area,
             frustration_score=frustration_score,
             frustration_reasons=frustration_reasons,
             portable_revenue=portable_revenue,
+        )
+
+    async def process_acceptance_async(
+        self,
+        candidate_name: str,
+        candidate_email: str,
+        current_firm: str,
+        practice_area: str,
+        frustration_score: int,
+        frustration_reasons: str,
+        portable_revenue: float,
+    ) -> dict:
+        """Async variant of `process_acceptance` on the shared gateway client."""
+        interviewer = find_matching_interviewer(practice_area)
+        if not interviewer:
+            return {"error": "No available interviewers for this niche"}
+
+        scheduling_email = await generate_scheduling_email_async(candidate_name)
+
+        return self._build_result(
+            interviewer,
+            scheduling_email,
+            candidate_name=candidate_name,
+            current_firm=current_firm,
+            practice_area=practice_area,
+            frustration_score=frustration_score,
+            frustration_reasons=frustration_reasons,
+            portable_revenue=portable_revenue,
+        )
+
+    def _build_result(self, interviewer: dict, scheduling_email: str, **dossier_fields) -> dict:
+        briefing = generate_briefing_dossier(
+            **dossier_fields,
             interviewer_name=interviewer["name"],
         )
 
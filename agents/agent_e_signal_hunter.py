@@ -2,20 +2,63 @@
 Agent E: The "Signal Hunter"
 Purpose: Find relevant topics for partners to write about by monitoring regulatory feeds,
 insolvency registers, and competitor blogs.
+
+The async run fans every scanner's queries out at once (`scan_sources_async`);
+the search gateway's politeness gate paces them per provider. Signals are
+deduplicated as they arrive, and analysis batches start as soon as they fill,
+while later queries are still running.
 """
 
+import asyncio
 import json
 import os
-import time
+import sys
 from datetime import datetime
-
-from ddgs import DDGS
-from dotenv import load_dotenv
-from google import genai
-
-load_dotenv()
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-client = genai.Client(api_key=GOOGLE_API_KEY)
+from typing import AsyncIterator, Callable
+
+try:
+    from agents.deadlines import check_cancelled
+    from agents.entity_ledger import KNOWN, canonical_url, content_hash, get_entity_ledger
+    from agents.llm_gateway import (
+        StructuredOutputError,
+        agenerate_structured,
+        generate_structured,
+    )
+    from agents.rate_limiter import estimate_tokens
+    from agents.search_gateway import asearch_news, asearch_text, search_news, search_text
+    from agents.single_flight import get_single_flight
+    from models import TopicBrief
+except ImportError:  # pragma: no cover - supports direct script execution.
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from deadlines import check_cancelled  # type: ignore
+    from entity_ledger import (  # type: ignore
+        KNOWN,
+        canonical_url,
+        content_hash,
+        get_entity_ledger,
+    )
+    from llm_gateway import (  # type: ignore
+        StructuredOutputError,
+        agenerate_structured,
+        generate_structured,
+    )
+    from rate_limiter import estimate_tokens  # type: ignore
+    from search_gateway import (  # type: ignore
+        asearch_news,
+        asearch_text,
+        search_news,
+        search_text,
+    )
+    from single_flight import get_single_flight  # type: ignore
+
+    from models import TopicBrief
+
+
+MODEL_ID = "gemini-1.5-pro"
+
+# Batched analysis: prompt tokens per request (signals only) and items per request
+BATCH_TOKEN_BUDGET = int(os.getenv("SIGNAL_BATCH_TOKEN_BUDGET", "6000"))
+BATCH_MAX_ITEMS = int(os.getenv("SIGNAL_BATCH_MAX_ITEMS", "20"))
 
 # Monitoring Configuration
 REGULATORY_KEYWORDS = [
@@ -64,90 +107,97 @@ Output Format (JSON):
 """
 
 
-def scan_regulatory_feeds() -> list:
-    """Scan for regulatory updates."""
-    results = []
-
-    with DDGS() as ddgs:
-        for keyword in REGULATORY_KEYWORDS:
-            try:
-                news = ddgs.news(keyword, region="de-de", max_results=3)
-                for item in news:
-                    results.append(
-                        {
-                            "type": "regulatory",
-                            "keyword": keyword,
-                            "title": item.get("title"),
-                            "body": item.get("body"),
-                            "url": item.get("url"),
-                            "date": item.get("date"),
-                        }
-                    )
-                time.sleep(1)
-            except Exception as e:
-                print(f"  Error scanning '{keyword}': {e}")
+def _news_signal(source_type: str, keyword: str, item: dict) -> dict:
+    return {
+        "type": source_type,
+        "keyword": keyword,
+        "title": item.get("title"),
+        "body": item.get("body"),
+        "url": item.get("url"),
+        "date": item.get("date"),
+    }
+
+
+def _blog_signal(source_type: str, site_query: str, item: dict) -> dict:
+    return {
+        "type": source_type,
+        "source": (
+            site_query.split("site:")[1].split("/")[0] if "site:" in site_query else "Unknown"
+        ),
+        "title": item.get("title"),
+        "body": item.get("body"),
+        "url": item.get("href"),
+    }
+
+
+# Scanners as (signal type, search kind, queries, signal builder), in report order
+SCANNERS: list[tuple[str, str, list[str], Callable[[str, str, dict], dict]]] = [
+    ("regulatory", "news", REGULATORY_KEYWORDS, _news_signal),
+    ("insolvency", "news", INSOLVENCY_KEYWORDS, _news_signal),
+    ("competitor", "text", COMPETITOR_BLOGS, _blog_signal),
+]
 
+
+def _scan(source_type: str, kind: str, queries: list[str], build) -> list:
+    search = search_news if kind == "news" else search_text
+    results: list[dict] = []
+    for query in queries:
+        try:
+            items = search(query, region="de-de", max_results=3, agent="agent_e")
+            results.extend(build(source_type, query, item) for item in items)
+        except Exception as e:
+            print(f"  Error scanning '{query}': {e}")
     return results
 
 
+def scan_regulatory_feeds() -> list:
+    """Scan for regulatory updates."""
+    return _scan(*SCANNERS[0])
+
+
 def scan_insolvency_news() -> list:
     """Scan for major insolvency filings."""
-    results = []
-
-    with DDGS() as ddgs:
-        for keyword in INSOLVENCY_KEYWORDS:
-            try:
-                news = ddgs.news(keyword, region="de-de", max_results=3)
-                for item in news:
-                    results.append(
-                        {
-                            "type": "insolvency",
-                            "keyword": keyword,
-                            "title": item.get("title"),
-                            "body": item.get("body"),
-                            "url": item.get("url"),
-                            "date": item.get("date"),
-                        }
-                    )
-                time.sleep(1)
-            except Exception as e:
-                print(f"  Error scanning '{keyword}': {e}")
-
-    return results
+    return _scan(*SCANNERS[1])
 
 
 def scan_competitor_blogs() -> list:
     """Scan competitor law firm blogs."""
-    results = []
-
-    with DDGS() as ddgs:
-        for site_query in COMPETITOR_BLOGS:
-            try:
-                search_results = ddgs.text(site_query, region="de-de", max_results=3)
-                for item in search_results:
-                    results.append(
-                        {
-                            "type": "competitor",
-                            "source": site_query.split("site:")[1].split("/")[0]
-                            if "site:" in site_query
-                            else "Unknown",
-                            "title": item.get("title"),
-                            "body": item.get("body"),
-                            "url": item.get("href"),
-                        }
-                    )
-                time.sleep(1)
-            except Exception as e:
-                print(f"  Error scanning '{site_query}': {e}")
+    return _scan(*SCANNERS[2])
 
-    return results
 
+async def _scan_query(position: tuple, source_type: str, kind: str, query: str, build) -> list:
+    search = asearch_news if kind == "news" else asearch_text
+    try:
+        items = await search(query, region="de-de", max_results=3, agent="agent_e")
+    except Exception as e:
+        print(f"  Error scanning '{query}': {e}")
+        return []
+    return [((*position, i), build(source_type, query, item)) for i, item in enumerate(items)]
 
-def analyze_signal(signal: dict) -> dict:
+
+async def scan_sources_async() -> AsyncIterator[tuple[tuple, dict]]:
     """
-    Use Gemini to analyze a signal and extract the business pain.
+    Run every scanner's queries concurrently and yield signals as their query returns.
+
+    Each signal comes with its position in the sequential scan order (scanner,
+    query, result), so callers can restore that order once the scan is done.
     """
-    prompt = f"""
+    queries = [
+        asyncio.create_task(_scan_query((s, q), source_type, kind, query, build))
+        for s, (source_type, kind, queries, build) in enumerate(SCANNERS)
+        for q, query in enumerate(queries)
+    ]
+    try:
+        for finished in asyncio.as_completed(queries):
+            for entry in await finished:
+                yield entry
+    finally:
+        for task in queries:
+            task.cancel()
+
+
+def _build_signal_prompt(signal: dict) -> str:
+    return f"""
     {SYSTEM_PROMPT}
     
     NEWS ITEM:
@@ -159,30 +209,196 @@ def analyze_signal(signal: dict) -> dict:
     Analyze this and return valid JSON.
     """
 
+
+def analyze_signal(signal: dict) -> dict:
+    """
+    Use Gemini to analyze a signal and extract the business pain.
+    """
     try:
-        response = client.models.generate_content(model="gemini-1.5-pro", contents=prompt)
+        return generate_structured(
+            MODEL_ID, _build_signal_prompt(signal), TopicBrief, agent="agent_e"
+        )
+    except Exception as e:
+        return {"error": str(e), "raw_signal": signal}
 
-        text = response.text
-        if "```json" in text:
-            text = text.split("```json")[1].split("```")[0]
-        elif "```" in text:
-            text = text.split("```")[1].split("```")[0]
 
-        return json.loads(text.strip())
+async def analyze_signal_async(signal: dict) -> dict:
+    """Async variant of `analyze_signal` on the shared gateway client."""
+    try:
+        return await agenerate_structured(
+            MODEL_ID, _build_signal_prompt(signal), TopicBrief, agent="agent_e"
+        )
     except Exception as e:
         return {"error": str(e), "raw_signal": signal}
 
 
-def run_signal_hunter() -> list:
+def _signal_url(signal: dict) -> str:
+    return signal.get("url") or signal.get("href") or ""
+
+
+def _normalize_url(url: str | None) -> str:
+    return (url or "").strip().rstrip("/")
+
+
+def _render_batch_item(index: int, signal: dict) -> str:
+    return f"""
+    NEWS ITEM {index}:
+    Type: {signal.get("type", "Unknown")}
+    Title: {signal.get("title", "No title")}
+    Summary: {signal.get("body", "No summary")}
+    URL: {_signal_url(signal)}
     """
-    Main function to run the signal hunter.
-    Returns list of analyzed signals ready for Agent F.
+
+
+def _build_batch_prompt(signals: list) -> str:
+    items = "".join(_render_batch_item(i, s) for i, s in enumerate(signals, 1))
+    return f"""
+    {SYSTEM_PROMPT}
+    
+    You will receive {len(signals)} news items. Return a JSON array with exactly one
+    topic brief per news item. Set "source_url" to the item's URL exactly as given.
+    {items}
+    Analyze every item and return valid JSON.
     """
-    print("=" * 70)
-    print("AGENT E: SIGNAL HUNTER")
-    print(f"Scan Time: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
-    print("=" * 70)
 
+
+def pack_signal_batches(
+    signals: list, token_budget: int = BATCH_TOKEN_BUDGET, max_items: int = BATCH_MAX_ITEMS
+) -> list[list]:
+    """
+    Greedily pack signals into batches that fit the prompt token budget.
+
+    Args:
+        signals: Deduplicated signals from `collect_signals`
+        token_budget: Estimated prompt tokens per batch for the news items
+        max_items: Upper bound on items per batch (keeps responses short)
+
+    Returns:
+        List of batches, in input order
+    """
+    packer = BatchPacker(token_budget, max_items)
+    batches = [batch for signal in signals if (batch := packer.add(signal))]
+    if packer.pending:
+        batches.append(packer.flush())
+    return batches
+
+
+class BatchPacker:
+    """Incremental `pack_signal_batches`: hands out each batch as soon as it is full."""
+
+    def __init__(self, token_budget: int = BATCH_TOKEN_BUDGET, max_items: int = BATCH_MAX_ITEMS):
+        self.token_budget = token_budget
+        self.max_items = max_items
+        self.pending: list = []
+        self._used = 0
+
+    def add(self, signal: dict) -> list | None:
+        """Add a signal; returns the previous batch if the signal did not fit into it."""
+        cost = estimate_tokens(_render_batch_item(len(self.pending) + 1, signal))
+        full = None
+        if self.pending and (
+            self._used + cost > self.token_budget or len(self.pending) >= self.max_items
+        ):
+            full = self.flush()
+        self.pending.append(signal)
+        self._used += cost
+        return full
+
+    def flush(self) -> list:
+        batch, self.pending, self._used = self.pending, [], 0
+        return batch
+
+
+def _match_briefs(batch: list, briefs: list) -> tuple[dict, list]:
+    """Map briefs back to their signals by URL; return (briefs by URL, unmatched signals)."""
+    by_url = {_normalize_url(brief.get("source_url")): brief for brief in briefs}
+    matched: dict[str, dict] = {}
+    missing = []
+    for signal in batch:
+        url = _signal_url(signal)
+        brief = by_url.get(_normalize_url(url))
+        if brief is None:
+            missing.append(signal)
+        else:
+            matched[url] = brief
+    return matched, missing
+
+
+def _split(batch: list) -> list[list]:
+    middle = len(batch) // 2
+    return [batch[:middle], batch[middle:]]
+
+
+def analyze_signal_batch(batch: list) -> dict:
+    """
+    Analyze several signals in one request.
+
+    Items the model drops or that fail validation are retried in smaller batches
+    (down to single-item `analyze_signal` calls).
+
+    Returns:
+        Topic briefs (or error dicts) keyed by signal URL
+    """
+    if len(batch) == 1:
+        return {_signal_url(batch[0]): analyze_signal(batch[0])}
+
+    try:
+        briefs = generate_structured(
+            MODEL_ID, _build_batch_prompt(batch), list[TopicBrief], agent="agent_e"
+        )
+    except StructuredOutputError:
+        briefs = []
+    except Exception as e:
+        return {_signal_url(s): {"error": str(e), "raw_signal": s} for s in batch}
+
+    results, missing = _match_briefs(batch, briefs)
+    if missing:
+        for part in _split(missing) if len(missing) > 1 else [missing]:
+            results.update(analyze_signal_batch(part))
+    return results
+
+
+async def analyze_signal_batch_async(batch: list) -> dict:
+    """Async variant of `analyze_signal_batch`."""
+    if len(batch) == 1:
+        return {_signal_url(batch[0]): await analyze_signal_async(batch[0])}
+
+    try:
+        briefs = await agenerate_structured(
+            MODEL_ID, _build_batch_prompt(batch), list[TopicBrief], agent="agent_e"
+        )
+    except StructuredOutputError:
+        briefs = []
+    except Exception as e:
+        return {_signal_url(s): {"error": str(e), "raw_signal": s} for s in batch}
+
+    results, missing = _match_briefs(batch, briefs)
+    if missing:
+        parts = _split(missing) if len(missing) > 1 else [missing]
+        for part_results in await asyncio.gather(*(analyze_signal_batch_async(p) for p in parts)):
+            results.update(part_results)
+    return results
+
+
+def analyze_signals(signals: list) -> list:
+    """Analyze all signals in token-budgeted batches; returns briefs in input order."""
+    results: dict = {}
+    for batch in pack_signal_batches(signals):
+        results.update(analyze_signal_batch(batch))
+    return [results[_signal_url(s)] for s in signals if _signal_url(s) in results]
+
+
+async def analyze_signals_async(signals: list) -> list:
+    """Async variant of `analyze_signals`; batches run concurrently."""
+    results: dict = {}
+    batches = pack_signal_batches(signals)
+    for batch_results in await asyncio.gather(*(analyze_signal_batch_async(b) for b in batches)):
+        results.update(batch_results)
+    return [results[_signal_url(s)] for s in signals if _signal_url(s) in results]
+
+
+def collect_signals() -> list:
+    """Scan all sources and return the signals deduplicated by URL."""
     all_signals = []
 
     # Scan all sources
@@ -191,11 +407,13 @@ def run_signal_hunter() -> list:
     print(f"   Found {len(reg_signals)} regulatory signals")
     all_signals.extend(reg_signals)
 
+    check_cancelled()  # Stop between sources once the scan's deadline has passed
     print("\n📡 Scanning Insolvency News...")
     insolvency_signals = scan_insolvency_news()
     print(f"   Found {len(insolvency_signals)} insolvency signals")
     all_signals.extend(insolvency_signals)
 
+    check_cancelled()
     print("\n📡 Scanning Competitor Blogs...")
     competitor_signals = scan_competitor_blogs()
     print(f"   Found {len(competitor_signals)} competitor signals")
@@ -205,24 +423,171 @@ def run_signal_hunter() -> list:
     seen_urls = set()
     unique_signals = []
     for s in all_signals:
-        url = s.get("url", s.get("href", ""))
+        url = _signal_url(s)
         if url and url not in seen_urls:
             seen_urls.add(url)
             unique_signals.append(s)
 
     print(f"\n📊 Total Unique Signals: {len(unique_signals)}")
+    return unique_signals
+
 
-    # Analyze top signals
-    analyzed = []
-    print("\n🔬 Analyzing top signals with Gemini...")
+def _signal_hash(signal: dict) -> str:
+    return content_hash(signal.get("title"), signal.get("body"))
 
-    for signal in unique_signals[:5]:  # Analyze top 5 to save API calls
-        print(f"   Analyzing: {signal.get('title', 'Unknown')[:50]}...")
-        analysis = analyze_signal(signal)
+
+def recall_briefs(signals: list) -> tuple[dict, list]:
+    """
+    Split scanned signals into briefs the entity ledger still holds and signals to analyze.
+
+    A signal is reused when its article (by canonical URL) was analyzed within the
+    freshness window and its title and summary have not changed.
+
+    Returns:
+        (briefs by signal URL, signals that need analysis)
+    """
+    ledger = get_entity_ledger()
+    if ledger is None:
+        return {}, signals
+    known: dict[str, dict] = {}
+    new = []
+    for signal in signals:
+        brief = _recall_brief(ledger, signal)
+        if brief is not None:
+            known[_signal_url(signal)] = brief
+        else:
+            new.append(signal)
+    return known, new
+
+
+def _recall_brief(ledger, signal: dict) -> dict | None:
+    recall = ledger.recall("signal", canonical_url(_signal_url(signal)), _signal_hash(signal))
+    return recall.entry.data if recall.state == KNOWN else None
+
+
+def remember_briefs(signals: list, analyses: list) -> None:
+    """Record fresh briefs (`analyze_signals` returns one entry per signal, in order)."""
+    ledger = get_entity_ledger()
+    if ledger is None:
+        return
+    for signal, analysis in zip(signals, analyses, strict=True):
         if "error" not in analysis:
-            analyzed.append(analysis)
+            url = canonical_url(_signal_url(signal))
+            ledger.record("signal", url, _signal_hash(signal), analysis)
 
-    return analyzed
+
+def _merge_briefs(signals: list, known: dict, new: list, analyses: list) -> list:
+    """All briefs in scan order, skipping failed analyses."""
+    briefs = dict(known)
+    for signal, analysis in zip(new, analyses, strict=True):
+        if "error" not in analysis:
+            briefs[_signal_url(signal)] = analysis
+    return [briefs[_signal_url(s)] for s in signals if _signal_url(s) in briefs]
+
+
+def _print_analysis_header(known: dict, new: list, batches: list) -> None:
+    reused = f", {len(known)} reused from the ledger" if known else ""
+    print(f"\n🔬 Analyzing {len(new)} signals in {len(batches)} batched request(s){reused}...")
+
+
+def _print_scan_header() -> None:
+    print("=" * 70)
+    print("AGENT E: SIGNAL HUNTER")
+    print(f"Scan Time: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
+    print("=" * 70)
+
+
+def run_signal_hunter() -> list:
+    """
+    Main function to run the signal hunter.
+    Returns list of analyzed signals ready for Agent F.
+
+    Concurrent callers (e.g. the content pipeline and the daily dashboard)
+    share one in-flight scan instead of running it twice.
+    """
+    return list(get_single_flight().do("run_signal_hunter", _run_signal_hunter))
+
+
+def _run_signal_hunter() -> list:
+    _print_scan_header()
+    unique_signals = collect_signals()
+
+    known, new = recall_briefs(unique_signals)
+    _print_analysis_header(known, new, pack_signal_batches(new))
+    analyses = analyze_signals(new)
+    remember_briefs(new, analyses)
+
+    return _merge_briefs(unique_signals, known, new, analyses)
+
+
+async def run_signal_hunter_async() -> list:
+    """
+    Async variant of `run_signal_hunter`.
+    All scanner queries run concurrently (paced by the search gateway's politeness
+    gate); each batch of new signals is analyzed as soon as it is full.
+    Shares the in-flight scan with any concurrent sync or async caller.
+    """
+    return list(await get_single_flight().ado("run_signal_hunter", _run_signal_hunter_async))
+
+
+async def _run_signal_hunter_async() -> list:
+    _print_scan_header()
+    print("\n📡 Scanning regulatory feeds, insolvency news and competitor blogs concurrently...")
+    ledger = get_entity_ledger()
+    positions: dict[str, tuple] = {}  # Earliest scan position per URL
+    signals: dict[str, dict] = {}
+    found = {source_type: 0 for source_type, *_ in SCANNERS}
+    known: dict[str, dict] = {}
+    new: list = []
+    packer = BatchPacker()
+    batches: list[list] = []
+    analyses: list[asyncio.Task] = []
+
+    def analyze(batch: list) -> None:
+        batches.append(batch)
+        analyses.append(asyncio.create_task(analyze_signal_batch_async(batch)))
+
+    try:
+        async for position, signal in scan_sources_async():
+            found[signal["type"]] += 1
+            url = _signal_url(signal)
+            if not url:
+                continue
+            if url in positions:  # Deduplicate by URL
+                positions[url] = min(positions[url], position)
+                continue
+            positions[url] = position
+            signals[url] = signal
+            brief = _recall_brief(ledger, signal) if ledger is not None else None
+            if brief is not None:
+                known[url] = brief
+                continue
+            new.append(signal)
+            if batch := packer.add(signal):
+                analyze(batch)
+        if packer.pending:
+            analyze(packer.flush())
+
+        for source_type, count in found.items():
+            print(f"   Found {count} {source_type} signals")
+        print(f"\n📊 Total Unique Signals: {len(signals)}")
+        _print_analysis_header(known, new, batches)
+        results: dict = {}
+        for batch_results in await asyncio.gather(*analyses):
+            results.update(batch_results)
+    finally:
+        for task in analyses:
+            task.cancel()
+
+    # Report in sequential scan order, whatever order the queries finished in
+    def scan_order(signal):
+        return positions[_signal_url(signal)]
+
+    unique_signals = sorted(signals.values(), key=scan_order)
+    new.sort(key=scan_order)
+    briefs = [results[_signal_url(s)] for s in new]
+    remember_briefs(new, briefs)
+    return _merge_briefs(unique_signals, known, new, briefs)
 
 
 def format_signal_report(signals: list) -> str:
@@ -5,13 +5,18 @@ Purpose: Turn signals from Agent E into LinkedIn posts.
 
 import json
 import os
+import sys
 
-from dotenv import load_dotenv
-from google import genai
+try:
+    from agents.llm_gateway import agenerate_structured, generate_structured
+    from models import LinkedInPostDraft
+except ImportError:  # pragma: no cover - supports direct script execution.
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from llm_gateway import agenerate_structured, generate_structured  # type: ignore
 
-load_dotenv()
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-client = genai.Client(api_key=GOOGLE_API_KEY)
+    from models import LinkedInPostDraft
+
+MODEL_ID = "gemini-3-pro"
 
 SYSTEM_PROMPT = """
 You are a LinkedIn Ghostwriter for a senior Gunnercooke Partner.
@@ -53,19 +58,8 @@ OUTPUT FORMAT (JSON):
 """
 
 
-def generate_linkedin_post(signal: dict, partner_name: str = "Senior Partner") -> dict:
-    """
-    Generate a LinkedIn post from a Signal Hunter brief.
-
-    Args:
-        signal: Dict from Agent E with headline, business_pain, suggested_angle, etc.
-        partner_name: Name of the partner for voice calibration
-
-    Returns:
-        JSON with the LinkedIn post
-    """
-
-    prompt = f"""
+def _build_prompt(signal: dict, partner_name: str) -> str:
+    return f"""
     {SYSTEM_PROMPT}
     
     SIGNAL INPUT:
@@ -81,17 +75,30 @@ def generate_linkedin_post(signal: dict, partner_name: str = "Senior Partner") -
     Generate the LinkedIn post as valid JSON. Remember: max 1,500 characters, contrarian hook, business focus, Gunnercooke pivot.
     """
 
+
+def generate_linkedin_post(signal: dict, partner_name: str = "Senior Partner") -> dict:
+    """
+    Generate a LinkedIn post from a Signal Hunter brief.
+
+    Args:
+        signal: Dict from Agent E with headline, business_pain, suggested_angle, etc.
+        partner_name: Name of the partner for voice calibration
+
+    Returns:
+        JSON with the LinkedIn post
+    """
+    prompt = _build_prompt(signal, partner_name)
     try:
-        response = client.models.generate_content(model="gemini-3-pro", contents=prompt)
+        return generate_structured(MODEL_ID, prompt, LinkedInPostDraft, agent="agent_f")
+    except Exception as e:
+        return {"error": str(e)}
 
-        text = response.text
-        if "```json" in text:
-            text = text.split("```json")[1].split("```")[0]
-        elif "```" in text:
-            text = text.split("```")[1].split("```")[0]
 
-        result = json.loads(text.strip())
-        return result
+async def generate_linkedin_post_async(signal: dict, partner_name: str = "Senior Partner") -> dict:
+    """Async variant of `generate_linkedin_post` on the shared gateway client."""
+    prompt = _build_prompt(signal, partner_name)
+    try:
+        return await agenerate_structured(MODEL_ID, prompt, LinkedInPostDraft, agent="agent_f")
     except Exception as e:
         return {"error": str(e)}
 
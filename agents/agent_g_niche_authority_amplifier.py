@@ -3,15 +3,19 @@ Agent G: The "Niche Authority" Amplifier
 Purpose: Engage with potential clients on LinkedIn by drafting thoughtful comments.
 """
 
-import json
 import os
+import sys
 
-from dotenv import load_dotenv
-from google import genai
+try:
+    from agents.llm_gateway import agenerate_structured, generate_structured
+    from models import EngagementComment
+except ImportError:  # pragma: no cover - supports direct script execution.
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from llm_gateway import agenerate_structured, generate_structured  # type: ignore
 
-load_dotenv()
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-client = genai.Client(api_key=GOOGLE_API_KEY)
+    from models import EngagementComment
+
+MODEL_ID = "gemini-3-pro"
 
 # Mock CRM data - Top 50 Target CEOs (in production, this would be Salesforce)
 TARGET_CEOS = [
@@ -70,21 +74,8 @@ OUTPUT FORMAT (JSON):
 """
 
 
-def analyze_and_comment(post_text: str, ceo_name: str, ceo_company: str, ceo_industry: str) -> dict:
-    """
-    Analyze a CEO's post and generate a strategic comment.
-
-    Args:
-        post_text: The content of the CEO's LinkedIn post
-        ceo_name: Name of the CEO
-        ceo_company: Their company
-        ceo_industry: Their industry
-
-    Returns:
-        JSON with comment and analysis
-    """
-
-    prompt = f"""
+def _build_prompt(post_text: str, ceo_name: str, ceo_company: str, ceo_industry: str) -> str:
+    return f"""
     {SYSTEM_PROMPT}
     
     CEO CONTEXT:
@@ -98,16 +89,34 @@ def analyze_and_comment(post_text: str, ceo_name: str, ceo_company: str, ceo_ind
     Generate a thoughtful comment as valid JSON. Remember: NO generic phrases, NO selling, ADD specific value.
     """
 
+
+def analyze_and_comment(post_text: str, ceo_name: str, ceo_company: str, ceo_industry: str) -> dict:
+    """
+    Analyze a CEO's post and generate a strategic comment.
+
+    Args:
+        post_text: The content of the CEO's LinkedIn post
+        ceo_name: Name of the CEO
+        ceo_company: Their company
+        ceo_industry: Their industry
+
+    Returns:
+        JSON with comment and analysis
+    """
+    prompt = _build_prompt(post_text, ceo_name, ceo_company, ceo_industry)
     try:
-        response = client.models.generate_content(model="gemini-3-pro", contents=prompt)
+        return generate_structured(MODEL_ID, prompt, EngagementComment, agent="agent_g")
+    except Exception as e:
+        return {"error": str(e)}
 
-        text = response.text
-        if "```json" in text:
-            text = text.split("```json")[1].split("```")[0]
-        elif "```" in text:
-            text = text.split("```")[1].split("```")[0]
 
-        return json.loads(text.strip())
+async def analyze_and_comment_async(
+    post_text: str, ceo_name: str, ceo_company: str, ceo_industry: str
+) -> dict:
+    """Async variant of `analyze_and_comment` on the shared gateway client."""
+    prompt = _build_prompt(post_text, ceo_name, ceo_company, ceo_industry)
+    try:
+        return await agenerate_structured(MODEL_ID, prompt, EngagementComment, agent="agent_g")
     except Exception as e:
         return {"error": str(e)}
 
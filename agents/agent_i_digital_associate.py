@@ -3,15 +3,19 @@ Agent I: The "Digital Associate"
 Purpose: Perform legal grunt work - review NDAs/contracts against playbook.
 """
 
-import json
 import os
+import sys
 
-from dotenv import load_dotenv
-from google import genai
+try:
+    from agents.llm_gateway import agenerate_structured, generate_structured
+    from models import RedFlagReport
+except ImportError:  # pragma: no cover - supports direct script execution.
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from llm_gateway import agenerate_structured, generate_structured  # type: ignore
 
-load_dotenv()
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-client = genai.Client(api_key=GOOGLE_API_KEY)
+    from models import RedFlagReport
+
+MODEL_ID = "gemini-3-pro"
 
 SYSTEM_PROMPT = """
 You are a Senior Associate at a top-tier law firm. Review the attached document.
@@ -39,10 +43,8 @@ Focus on: unlimited liability, broad indemnities, IP assignment, non-compete, te
 """
 
 
-def review_contract(contract_text: str, contract_type: str = "NDA") -> dict:
-    """Review a contract and generate a Red Flag Report."""
-
-    prompt = f"""
+def _build_prompt(contract_text: str, contract_type: str) -> str:
+    return f"""
     {SYSTEM_PROMPT}
     
     DOCUMENT TYPE: {contract_type}
@@ -53,16 +55,21 @@ def review_contract(contract_text: str, contract_type: str = "NDA") -> dict:
     Generate the Red Flag Report as valid JSON.
     """
 
+
+def review_contract(contract_text: str, contract_type: str = "NDA") -> dict:
+    """Review a contract and generate a Red Flag Report."""
+    prompt = _build_prompt(contract_text, contract_type)
     try:
-        response = client.models.generate_content(model="gemini-3-pro", contents=prompt)
+        return generate_structured(MODEL_ID, prompt, RedFlagReport, agent="agent_i")
+    except Exception as e:
+        return {"error": str(e)}
 
-        text = response.text
-        if "```json" in text:
-            text = text.split("```json")[1].split("```")[0]
-        elif "```" in text:
-            text = text.split("```")[1].split("```")[0]
 
-        return json.loads(text.strip())
+async def review_contract_async(contract_text: str, contract_type: str = "NDA") -> dict:
+    """Async variant of `review_contract` on the shared gateway client."""
+    prompt = _build_prompt(contract_text, contract_type)
+    try:
+        return await agenerate_structured(MODEL_ID, prompt, RedFlagReport, agent="agent_i")
     except Exception as e:
         return {"error": str(e)}
 
@@ -7,35 +7,39 @@ Author: Google Antigravity (2026)
 from __future__ import annotations
 
 import os
-import time
 from datetime import datetime
 
-from dotenv import load_dotenv
-from google import genai
-
 try:
+    from agents.llm_gateway import LLMGatewayError, generate_with_fallback, has_api_key
+    from agents.model_health import get_model_catalog
     from agents.prompt_guardrails import (
+        Budget,
         PromptBudget,
         SummaryPayload,
+        TokenBudget,
         TranscriptChunk,
         build_hierarchical_summary,
         reduce_summary_payloads,
         render_summary_payloads,
     )
 except ImportError:  # pragma: no cover - supports direct script execution.
+    from llm_gateway import (  # type: ignore
+        LLMGatewayError,
+        generate_with_fallback,
+        has_api_key,
+    )
+    from model_health import get_model_catalog  # type: ignore
     from prompt_guardrails import (  # type: ignore
+        Budget,
         PromptBudget,
         SummaryPayload,
+        TokenBudget,
         TranscriptChunk,
         build_hierarchical_summary,
         reduce_summary_payloads,
         render_summary_payloads,
     )
 
-# Load credentials
-load_dotenv()
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-
 TRANSCRIPT_CHUNK_SUMMARY_PROMPT = """
 TASK: TRANSCRIPT CHUNK SUMMARY
 TRANSCRIPT CHUNK {chunk_index}/{total_chunks}
@@ -151,6 +155,11 @@ Structured Evidence Brief:
 """
 
 
+FALLBACK_MODELS = ["gemini-pro-latest", "gemini-flash-latest"]
+# "tokens" fills the models' real context windows; "chars" keeps the fixed character budgets.
+PROMPT_BUDGET_MODE = os.getenv("PROMPT_BUDGET_MODE", "tokens").lower()
+
+
 class InterviewProcessorError(RuntimeError):
     """Raised when Agent J cannot safely complete the interview processing flow."""
 
@@ -159,15 +168,22 @@ class InterviewProcessor:
     def __init__(
         self,
         model_id: str = "gemini-3-flash-preview",
-        prompt_budget: PromptBudget | None = None,
+        prompt_budget: Budget | None = None,
     ):
         self.model_id = model_id
-        self.prompt_budget = prompt_budget or PromptBudget()
-        self.retry_delay_seconds = 5
-        if GOOGLE_API_KEY:
-            self.client = genai.Client(api_key=GOOGLE_API_KEY)
-        else:
-            self.client = None
+        self.prompt_budget = prompt_budget or self._default_budget()
+
+    def _default_budget(self) -> Budget:
+        if PROMPT_BUDGET_MODE == "chars":
+            return PromptBudget()
+        # Any model in the fallback chain may serve a prompt, so size for the smallest window.
+        catalog = get_model_catalog()
+        limits = [catalog.input_token_limit(model) for model in self._models()]
+        known = [limit for limit in limits if limit]
+        return TokenBudget.for_context_window(min(known) if known else None)
+
+    def _models(self) -> list[str]:
+        return [self.model_id, *FALLBACK_MODELS]
 
     def detect_language(self, text: str) -> str:
         """Roughly detect if text is German or English."""
@@ -177,33 +193,23 @@ class InterviewProcessor:
 
     def _generate_with_fallback(self, prompt: str) -> str:
         """Try multiple models, but fail cleanly if they all fail."""
-        if not self.client:
+        if not has_api_key():
             raise InterviewProcessorError("GOOGLE_API_KEY not found in environment.")
 
-        prompt_len = len(prompt)
-        if prompt_len > self.prompt_budget.input_budget_chars:
+        budget = self.prompt_budget
+        prompt_len = budget.measure(prompt)
+        if prompt_len > budget.input_budget:
             raise InterviewProcessorError(
-                f"Prompt budget exceeded ({prompt_len}/{self.prompt_budget.input_budget_chars} chars)."
+                f"Prompt budget exceeded ({prompt_len}/{budget.input_budget} {budget.unit})."
             )
 
-        models = [self.model_id, "gemini-pro-latest", "gemini-flash-latest"]
-        last_error: Exception | None = None
-        for model_name in models:
-            try:
-                response = self.client.models.generate_content(model=model_name, contents=prompt)
-                text = (response.text or "").strip()
-                if not text:
-                    raise InterviewProcessorError(f"Model {model_name} returned an empty response.")
-                return text
-            except Exception as exc:  # pragma: no cover - exercised via processor behavior.
-                last_error = exc
-                print(f"  ⚠️ Model {model_name} failed: {exc}")
-                if self.retry_delay_seconds > 0:
-                    time.sleep(self.retry_delay_seconds)
-
-        raise InterviewProcessorError(
-            "Unable to process interview after exhausting model fallbacks."
-        ) from last_error
+        try:
+            # Hedged: a slow primary gets the next model fired alongside it.
+            return generate_with_fallback(self._models(), prompt, agent="agent_j").strip()
+        except LLMGatewayError as exc:
+            raise InterviewProcessorError(
+                "Unable to process interview after exhausting model fallbacks."
+            ) from exc
 
     def _summarize_chunk(
         self,
@@ -246,10 +252,11 @@ class InterviewProcessor:
         fields = dict(prompt_fields)
         fields["evidence_brief"] = ""
         prompt_without_brief = template.format(**fields)
-        available_chars = (
-            self.prompt_budget.input_budget_chars - len(prompt_without_brief) - 200
+        budget = self.prompt_budget
+        available = (
+            budget.input_budget - budget.measure(prompt_without_brief) - budget.evidence_margin
         )
-        if available_chars <= 0:
+        if available <= 0:
             raise InterviewProcessorError("Prompt template leaves no room for evidence context.")
 
         reduced_payloads = reduce_summary_payloads(
@@ -260,13 +267,14 @@ class InterviewProcessor:
                 language_full=language_full,
                 reduction_index=idx,
             ),
-            available_chars,
+            available,
+            budget.measure,
         )
         evidence_brief = render_summary_payloads(reduced_payloads)
 
         fields["evidence_brief"] = evidence_brief
         prompt = template.format(**fields)
-        if len(prompt) > self.prompt_budget.input_budget_chars:
+        if budget.measure(prompt) > budget.input_budget:
             raise InterviewProcessorError("Unable to fit evidence brief within the prompt budget.")
         return prompt
 
@@ -302,7 +310,7 @@ class InterviewProcessor:
                     language_full=lang_full,
                     reduction_index=idx,
                 ),
-                target_chars=self.prompt_budget.reduction_batch_size_chars,
+                target_chars=self.prompt_budget.reduction_batch_size,
             )
 
             email_prompt = self._build_prompt_with_evidence(
@@ -3,10 +3,12 @@ Agent L: The "Insolvency" Deal Finder
 Purpose: Find business for the Restructuring practice by monitoring insolvency filings.
 """
 
-import time
 from datetime import datetime
 
-from ddgs import DDGS
+try:
+    from agents.search_gateway import search_news
+except ImportError:  # pragma: no cover - supports direct script execution.
+    from search_gateway import search_news  # type: ignore
 
 # Mock CRM data (in production: Salesforce/Elite 3E API)
 PARTNER_RELATIONSHIPS = {
@@ -38,23 +40,21 @@ def scan_insolvency_filings() -> list:
         "Insolvenz Bauunternehmen",
     ]
 
-    with DDGS() as ddgs:
-        for kw in keywords:
-            try:
-                news = ddgs.news(kw, region="de-de", max_results=3)
-                for item in news:
-                    results.append(
-                        {
-                            "title": item.get("title"),
-                            "body": item.get("body"),
-                            "url": item.get("url"),
-                            "date": item.get("date"),
-                            "keyword": kw,
-                        }
-                    )
-                time.sleep(1)
-            except Exception as e:
-                print(f"  Error: {e}")
+    for kw in keywords:
+        try:
+            news = search_news(kw, region="de-de", max_results=3, agent="agent_l")
+            for item in news:
+                results.append(
+                    {
+                        "title": item.get("title"),
+                        "body": item.get("body"),
+                        "url": item.get("url"),
+                        "date": item.get("date"),
+                        "keyword": kw,
+                    }
+                )
+        except Exception as e:
+            print(f"  Error: {e}")
 
     return results
 
@@ -0,0 +1,566 @@
+"""
+Backends
+Purpose: Swap the live Gemini and DDGS backends for recorded or synthetic ones.
+
+`AGENT_BACKEND` selects how the gateways reach the outside world:
+
+- `live` (default): the real Gemini client and DDGS searches.
+- `record`: live calls, and every `generate_content` response and search result
+  is also written to `BACKEND_FIXTURES_DIR` (one JSON file per request, keyed
+  like the response cache) together with its measured latency.
+- `replay`: serve those fixtures without touching the network.
+- `synthetic`: no fixtures needed. Structured calls get a random instance of
+  their response JSON schema, text calls get filler text and searches get
+  made-up news items.
+
+Offline responses (replay, synthetic) are delayed by `BACKEND_LLM_LATENCY` /
+`BACKEND_SEARCH_LATENCY` (see `LatencyModel`). Randomness is seeded per request
+from `BACKEND_SEED`, so a run is reproducible regardless of task scheduling.
+
+In the offline modes the gateway bypasses the response cache, model catalog and
+circuit breaker, so benchmark runs neither read nor pollute their on-disk state.
+Rate limiting, single-flight and metrics stay in the path.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Callable
+
+try:
+    from agents.llm_cache import make_cache_key
+    from agents.rate_limiter import estimate_tokens
+except ImportError:  # pragma: no cover - supports direct script execution.
+    from llm_cache import make_cache_key  # type: ignore
+    from rate_limiter import estimate_tokens  # type: ignore
+
+MODES = ("live", "record", "replay", "synthetic")
+DEFAULT_FIXTURES_DIR = os.path.join("fixtures", "recordings")
+SYNTHETIC_TEXT_LINES = int(os.getenv("SYNTHETIC_TEXT_LINES", "10"))
+STREAM_CHUNKS = 8  # Pieces an offline streamed response is split into
+
+URL_PATTERN = re.compile(r"https?://[^\s\"'<>]+")
+WORD_PATTERN = re.compile(r"[A-Za-zÄÖÜäöüß]{4,}")
+
+
+class BackendError(RuntimeError):
+    """Raised when the configured backend cannot serve a request."""
+
+
+class FixtureNotFoundError(BackendError):
+    """Raised in replay mode when no recording matches the request."""
+
+
+@dataclass
+class BackendResponse:
+    """The part of a `generate_content` response the gateway reads."""
+
+    text: str
+    usage_metadata: Any = None
+
+
+def _usage(prompt_tokens: int, completion_tokens: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        prompt_token_count=prompt_tokens, candidates_token_count=completion_tokens
+    )
+
+
+def search_key(kind: str, query: str, region: str, max_results: int) -> str:
+    payload = json.dumps([kind, query, region, max_results], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LatencyModel:
+    """
+    Delay distribution for offline responses, parsed from a spec string:
+
+    - `recorded`: the latency measured when the fixture was recorded (0 if none)
+    - `none`: no delay
+    - `fixed:SECONDS`
+    - `uniform:LOW:HIGH`
+    - `lognormal:MEDIAN:SIGMA` (long-tailed, closest to real API latencies)
+
+    Every sample is multiplied by `scale` (e.g. 0.1 replays ten times faster).
+    """
+
+    ARITY = {"recorded": 0, "none": 0, "fixed": 1, "uniform": 2, "lognormal": 2}
+
+    def __init__(self, spec: str = "recorded", scale: float = 1.0):
+        kind, _, args = spec.strip().lower().partition(":")
+        if kind not in self.ARITY:
+            raise ValueError(f"Unknown latency distribution: {spec!r}")
+        try:
+            params = [float(arg) for arg in args.split(":")] if args else []
+        except ValueError as exc:
+            raise ValueError(f"Invalid latency spec: {spec!r}") from exc
+        if len(params) != self.ARITY[kind]:
+            raise ValueError(f"{kind} latency takes {self.ARITY[kind]} parameter(s): {spec!r}")
+        self.spec = spec
+        self.kind = kind
+        self.params = params
+        self.scale = scale
+
+    def sample(self, rng: random.Random, recorded: float | None = None) -> float:
+        if self.kind == "recorded":
+            seconds = recorded or 0.0
+        elif self.kind == "none":
+            seconds = 0.0
+        elif self.kind == "fixed":
+            seconds = self.params[0]
+        elif self.kind == "uniform":
+            seconds = rng.uniform(*self.params)
+        else:
+            median, sigma = self.params
+            seconds = median * rng.lognormvariate(0.0, sigma)
+        return max(0.0, seconds * self.scale)
+
+
+class FixtureStore:
+    """One JSON file per recorded request: `<directory>/<kind>/<key>.json`."""
+
+    def __init__(self, directory: str = DEFAULT_FIXTURES_DIR):
+        self.directory = directory
+
+    def path(self, kind: str, key: str) -> str:
+        return os.path.join(self.directory, kind, f"{key}.json")
+
+    def load(self, kind: str, key: str) -> dict | None:
+        try:
+            with open(self.path(kind, key), encoding="utf-8") as handle:
+                return json.load(handle)
+        except FileNotFoundError:
+            return None
+
+    def save(self, kind: str, key: str, record: dict) -> None:
+        path = self.path(kind, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write-then-rename so concurrent recorders never leave a torn file behind.
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(record, handle, indent=2, ensure_ascii=False, default=str)
+        os.replace(tmp_path, path)
+
+    def count(self, kind: str) -> int:
+        try:
+            return sum(
+                name.endswith(".json") for name in os.listdir(os.path.join(self.directory, kind))
+            )
+        except FileNotFoundError:
+            return 0
+
+
+class SchemaSynthesizer:
+    """
+    Build a random value that validates against a JSON schema.
+
+    URLs found in the prompt are handed out, in order, to string fields whose name
+    contains "url", and arrays of such objects get one item per URL, so batched
+    calls (e.g. Agent E's topic briefs) map back to their inputs. Other arrays get
+    `array_items` items (random 1-3 if None), within the schema's bounds.
+    """
+
+    def __init__(
+        self, rng: random.Random, urls: list[str] | None = None, array_items: int | None = None
+    ):
+        self.rng = rng
+        self.urls = urls or []
+        self.array_items = array_items
+        self._next_url = 0
+        self._counter = 0
+        self._defs: dict = {}
+
+    def generate(self, schema: dict) -> Any:
+        self._defs = schema.get("$defs", {})
+        return self._value(schema, "value")
+
+    def _resolve(self, schema: dict) -> dict:
+        while "$ref" in schema:
+            schema = self._defs[schema["$ref"].rsplit("/", 1)[-1]]
+        return schema
+
+    def _has_url_field(self, schema: dict) -> bool:
+        properties = self._resolve(schema).get("properties", {})
+        return any("url" in name.lower() for name in properties)
+
+    def _value(self, schema: dict, name: str) -> Any:
+        schema = self._resolve(schema)
+        if "const" in schema:
+            return schema["const"]
+        if "enum" in schema:
+            return self.rng.choice(schema["enum"])
+        for combinator in ("anyOf", "oneOf", "allOf"):
+            if combinator in schema:
+                options = [self._resolve(option) for option in schema[combinator]]
+                concrete = [option for option in options if option.get("type") != "null"]
+                return self._value((concrete or options)[0], name)
+
+        kind = schema.get("type", "string")
+        if isinstance(kind, list):
+            kind = next((k for k in kind if k != "null"), "null")
+
+        if kind == "object":
+            properties = schema.get("properties", {})
+            return {prop: self._value(sub, prop) for prop, sub in properties.items()}
+        if kind == "array":
+            items = schema.get("items", {})
+            return [self._value(items, name) for _ in range(self._array_length(schema, items))]
+        if kind == "integer":
+            return self.rng.randint(*self._bounds(schema, 0, 1_000_000, integer=True))
+        if kind == "number":
+            return round(self.rng.uniform(*self._bounds(schema, 0.0, 1_000_000.0)), 2)
+        if kind == "boolean":
+            return self.rng.random() < 0.5
+        if kind == "null":
+            return None
+        return self._string(schema, name)
+
+    def _array_length(self, schema: dict, items: dict) -> int:
+        low = schema.get("minItems", 1)
+        high = schema.get("maxItems", 1_000_000)
+        if self.urls and self._has_url_field(items):
+            wanted = len(self.urls) - self._next_url
+        elif self.array_items is not None:
+            wanted = self.array_items
+        else:
+            wanted = self.rng.randint(1, 3)
+        return min(max(wanted, low), high)
+
+    def _bounds(self, schema: dict, low: float, high: float, integer: bool = False) -> tuple:
+        step = 1 if integer else 0
+        low = schema.get("minimum", schema.get("exclusiveMinimum", low - step) + step)
+        high = schema.get("maximum", schema.get("exclusiveMaximum", high + step) - step)
+        return (int(low), int(high)) if integer else (float(low), float(high))
+
+    def _string(self, schema: dict, name: str) -> str:
+        if "url" in name.lower() or schema.get("format") == "uri":
+            if self._next_url < len(self.urls):
+                self._next_url += 1
+                return self.urls[self._next_url - 1]
+            return f"https://synthetic.example/{self.rng.getrandbits(32):08x}"
+        if schema.get("format") == "date-time":
+            return datetime.now(timezone.utc).isoformat(timespec="seconds")
+        if schema.get("format") == "date":
+            return datetime.now(timezone.utc).date().isoformat()
+        self._counter += 1
+        text = f"Synthetic {name.replace('_', ' ')} {self._counter}"
+        min_length = schema.get("minLength", 0)
+        if len(text) < min_length:
+            text = text.ljust(min_length, "x")
+        return text[: schema["maxLength"]] if "maxLength" in schema else text
+
+
+def synthesize_text(contents: Any, rng: random.Random, lines: int = SYNTHETIC_TEXT_LINES) -> str:
+    """Filler lines built from the prompt's own vocabulary (one item per line)."""
+    words = WORD_PATTERN.findall(str(contents)) or ["synthetic"]
+    return "\n".join(
+        " ".join(rng.choice(words) for _ in range(rng.randint(8, 14))) for _ in range(lines)
+    )
+
+
+def synthesize_search(kind: str, query: str, max_results: int, rng: random.Random) -> list[dict]:
+    """Fake DDGS items with the fields `news` (url, date, source) or `text` (href) return."""
+    results = []
+    for index in range(max_results):
+        url = f"https://synthetic.example/{kind}/{rng.getrandbits(48):012x}"
+        body = f"{query}: synthetic coverage {index + 1}. " * rng.randint(2, 6)
+        item = {"title": f"{query} - synthetic result {index + 1}", "body": body.strip()}
+        if kind == "news":
+            item.update(
+                url=url,
+                date=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                source="synthetic",
+            )
+        else:
+            item["href"] = url
+        results.append(item)
+    return results
+
+
+def _response_schema(config: Any) -> dict | None:
+    schema = getattr(config, "response_json_schema", None)
+    return schema if isinstance(schema, dict) else None
+
+
+class Backend:
+    """Routes gateway traffic to the live services, recordings or the synthetic generator."""
+
+    def __init__(
+        self,
+        mode: str = "live",
+        fixtures_dir: str = DEFAULT_FIXTURES_DIR,
+        llm_latency: str = "recorded",
+        search_latency: str = "recorded",
+        latency_scale: float = 1.0,
+        seed: str = "0",
+        on_miss: str = "error",
+        array_items: int | None = None,
+    ):
+        if mode not in MODES:
+            raise ValueError(f"Unknown backend {mode!r}; expected one of {', '.join(MODES)}.")
+        if on_miss not in ("error", "synthetic"):
+            raise ValueError(f"REPLAY_ON_MISS must be 'error' or 'synthetic', not {on_miss!r}.")
+        self.mode = mode
+        self.store = FixtureStore(fixtures_dir)
+        self.llm_latency = LatencyModel(llm_latency, latency_scale)
+        self.search_latency = LatencyModel(search_latency, latency_scale)
+        self.seed = seed
+        self.on_miss = on_miss
+        self.array_items = array_items
+
+    @property
+    def offline(self) -> bool:
+        return self.mode in ("replay", "synthetic")
+
+    def _rng(self, key: str) -> random.Random:
+        return random.Random(f"{self.seed}:{key}")
+
+    # ── LLM ──────────────────────────────────────────────────────────────
+
+    def client(self, live_factory: Callable[[], Any]) -> Any:
+        """Return the client the gateway should use; `live_factory` builds the real one."""
+        if self.mode == "live":
+            return live_factory()
+        if self.mode == "record":
+            return _RecordingClient(live_factory(), self)
+        return _OfflineClient(self)
+
+    def record_llm(
+        self, model: str, contents: Any, config: Any, response: Any, elapsed: float
+    ) -> None:
+        usage = getattr(response, "usage_metadata", None)
+        self.store.save(
+            "llm",
+            make_cache_key(model, contents, config),
+            {
+                "model": model,
+                "text": response.text or "",
+                "prompt_tokens": getattr(usage, "prompt_token_count", None),
+                "completion_tokens": getattr(usage, "candidates_token_count", None),
+                "latency_s": round(elapsed, 4),
+                "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "prompt_preview": str(contents)[:500],
+            },
+        )
+
+    def respond(self, model: str, contents: Any, config: Any) -> tuple[BackendResponse, float]:
+        """Offline answer for one `generate_content` call and how long to delay it."""
+        key = make_cache_key(model, contents, config)
+        rng = self._rng(key)
+        record = self.store.load("llm", key) if self.mode == "replay" else None
+        if record is None and self.mode == "replay" and self.on_miss == "error":
+            raise FixtureNotFoundError(f"No recording for {model} request {key[:12]}.")
+
+        if record is not None:
+            text = record["text"]
+            usage = _usage(
+                record.get("prompt_tokens") or estimate_tokens(contents),
+                record.get("completion_tokens") or estimate_tokens(text),
+            )
+            return BackendResponse(text, usage), self.llm_latency.sample(
+                rng, record.get("latency_s")
+            )
+
+        schema = _response_schema(config)
+        if schema is not None:
+            urls = URL_PATTERN.findall(str(contents))
+            value = SchemaSynthesizer(rng, urls, self.array_items).generate(schema)
+            text = json.dumps(value, ensure_ascii=False)
+        else:
+            text = synthesize_text(contents, rng)
+        usage = _usage(estimate_tokens(contents), estimate_tokens(text))
+        return BackendResponse(text, usage), self.llm_latency.sample(rng)
+
+    # ── Search ───────────────────────────────────────────────────────────
+
+    def search(
+        self,
+        kind: str,
+        query: str,
+        region: str,
+        max_results: int,
+        live: Callable[[], list[dict]],
+    ) -> list[dict]:
+        """Run one search through the backend; `live` performs the real DDGS call."""
+        if self.mode == "live":
+            return live()
+
+        key = search_key(kind, query, region, max_results)
+        if self.mode == "record":
+            started = time.monotonic()
+            results = live()
+            self.store.save(
+                "search",
+                key,
+                {
+                    "kind": kind,
+                    "query": query,
+                    "region": region,
+                    "max_results": max_results,
+                    "results": results,
+                    "latency_s": round(time.monotonic() - started, 4),
+                },
+            )
+            return results
+
+        rng = self._rng(key)
+        record = self.store.load("search", key) if self.mode == "replay" else None
+        if record is not None:
+            time.sleep(self.search_latency.sample(rng, record.get("latency_s")))
+            return list(record["results"])
+        if self.mode == "replay" and self.on_miss == "error":
+            raise FixtureNotFoundError(f"No recording for {kind} search {query!r}.")
+        time.sleep(self.search_latency.sample(rng))
+        return synthesize_search(kind, query, max_results, rng)
+
+
+class _RecordingModels:
+    def __init__(self, models: Any, backend: Backend):
+        self._models = models
+        self._backend = backend
+
+    def generate_content(self, *, model: str, contents: Any, config: Any = None) -> Any:
+        started = time.monotonic()
+        response = self._models.generate_content(model=model, contents=contents, config=config)
+        self._backend.record_llm(model, contents, config, response, time.monotonic() - started)
+        return response
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._models, name)
+
+
+class _AsyncRecordingModels(_RecordingModels):
+    async def generate_content(self, *, model: str, contents: Any, config: Any = None) -> Any:
+        started = time.monotonic()
+        response = await self._models.generate_content(
+            model=model, contents=contents, config=config
+        )
+        self._backend.record_llm(model, contents, config, response, time.monotonic() - started)
+        return response
+
+    async def generate_content_stream(
+        self, *, model: str, contents: Any, config: Any = None
+    ) -> AsyncIterator[Any]:
+        started = time.monotonic()
+        stream = await self._models.generate_content_stream(
+            model=model, contents=contents, config=config
+        )
+        return self._record_stream(stream, model, contents, config, started)
+
+    async def _record_stream(
+        self, stream: AsyncIterator[Any], model: str, contents: Any, config: Any, started: float
+    ) -> AsyncIterator[Any]:
+        parts: list[str] = []
+        usage = None
+        async for chunk in stream:
+            parts.append(chunk.text or "")
+            usage = getattr(chunk, "usage_metadata", None) or usage
+            yield chunk
+        response = BackendResponse("".join(parts), usage)
+        self._backend.record_llm(model, contents, config, response, time.monotonic() - started)
+
+
+class _RecordingClient:
+    """Live client whose `generate_content` calls (sync and aio) are also written to fixtures."""
+
+    def __init__(self, client: Any, backend: Backend):
+        self._client = client
+        self.models = _RecordingModels(client.models, backend)
+        self.aio = SimpleNamespace(
+            models=_AsyncRecordingModels(client.aio.models, backend), aclose=client.aio.aclose
+        )
+
+    def close(self) -> None:
+        self._client.close()
+
+
+class _OfflineModels:
+    def __init__(self, backend: Backend):
+        self._backend = backend
+
+    def generate_content(self, *, model: str, contents: Any, config: Any = None) -> Any:
+        response, delay = self._backend.respond(model, contents, config)
+        time.sleep(delay)
+        return response
+
+    def list(self) -> list:
+        return []
+
+
+class _AsyncOfflineModels(_OfflineModels):
+    async def generate_content(self, *, model: str, contents: Any, config: Any = None) -> Any:
+        response, delay = self._backend.respond(model, contents, config)
+        await asyncio.sleep(delay)
+        return response
+
+    async def generate_content_stream(
+        self, *, model: str, contents: Any, config: Any = None
+    ) -> AsyncIterator[Any]:
+        response, delay = self._backend.respond(model, contents, config)
+        return _stream_chunks(response, delay)
+
+
+async def _stream_chunks(response: BackendResponse, delay: float) -> AsyncIterator[Any]:
+    """Yield the text in STREAM_CHUNKS pieces with the delay spread evenly across them."""
+    text = response.text
+    size = max(1, -(-len(text) // STREAM_CHUNKS))
+    pieces = [text[start : start + size] for start in range(0, len(text), size)] or [""]
+    for index, piece in enumerate(pieces):
+        await asyncio.sleep(delay / len(pieces))
+        usage = response.usage_metadata if index == len(pieces) - 1 else None
+        yield BackendResponse(piece, usage)
+
+
+async def _aclose_nothing() -> None:
+    return None
+
+
+class _OfflineClient:
+    """Stand-in for `genai.Client` that answers from recordings or the synthetic generator."""
+
+    def __init__(self, backend: Backend):
+        self.models = _OfflineModels(backend)
+        self.aio = SimpleNamespace(models=_AsyncOfflineModels(backend), aclose=_aclose_nothing)
+
+    def close(self) -> None:
+        return None
+
+
+_backend: Backend | None = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> Backend:
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                array_items = os.getenv("SYNTHETIC_ARRAY_ITEMS")
+                _backend = Backend(
+                    mode=os.getenv("AGENT_BACKEND", "live").lower(),
+                    fixtures_dir=os.getenv("BACKEND_FIXTURES_DIR", DEFAULT_FIXTURES_DIR),
+                    llm_latency=os.getenv("BACKEND_LLM_LATENCY", "recorded"),
+                    search_latency=os.getenv("BACKEND_SEARCH_LATENCY", "recorded"),
+                    latency_scale=float(os.getenv("BACKEND_LATENCY_SCALE", "1")),
+                    seed=os.getenv("BACKEND_SEED", "0"),
+                    on_miss=os.getenv("REPLAY_ON_MISS", "error").lower(),
+                    array_items=int(array_items) if array_items else None,
+                )
+    return _backend
+
+
+def set_backend(backend: Backend) -> None:
+    """Install `backend` process-wide. Call before the first LLM request builds the client."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
@@ -0,0 +1,211 @@
+"""
+Checkpoints
+Purpose: Persist per-item, per-stage progress of orchestrator runs so a crashed run can resume.
+
+Every checkpointed step of a run (Agent A's candidate list, each candidate's B,
+C and D results, the signal scan, each post) is written to SQLite as soon as it
+finishes. A resumed run with the same run id returns completed steps straight
+from the store. Failed and never-started steps run again, so recovery costs
+only the unfinished work.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_CHECKPOINT_PATH = os.path.join(".cache", "checkpoints.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS steps (
+    run_id TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    item_key TEXT NOT NULL,
+    status TEXT NOT NULL,
+    payload TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 1,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (run_id, stage, item_key)
+);
+"""
+
+
+def new_run_id() -> str:
+    return f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+class CheckpointStore:
+    """SQLite table of runs and of the status/payload of each (stage, item) step."""
+
+    def __init__(self, path: str = DEFAULT_CHECKPOINT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def start_run(self, run_id: str, params: dict) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO runs (run_id, params, status, created_at, updated_at) "
+                "VALUES (?, ?, 'running', ?, ?)",
+                (run_id, json.dumps(params, ensure_ascii=False, default=str), now, now),
+            )
+            self._conn.commit()
+
+    def run_params(self, run_id: str) -> dict | None:
+        """Parameters the run was started with, or None for an unknown run id."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT params FROM runs WHERE run_id = ?", (run_id,)
+            ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def finish_run(self, run_id: str, status: str = "done") -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE runs SET status = ?, updated_at = ? WHERE run_id = ?",
+                (status, time.time(), run_id),
+            )
+            self._conn.commit()
+
+    def load(self, run_id: str, stage: str, item_key: str) -> tuple[bool, Any]:
+        """(True, payload) if the step completed, else (False, None)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM steps "
+                "WHERE run_id = ? AND stage = ? AND item_key = ? AND status = 'done'",
+                (run_id, stage, item_key),
+            ).fetchone()
+        if row is None:
+            return False, None
+        return True, json.loads(row[0])
+
+    def record(
+        self,
+        run_id: str,
+        stage: str,
+        item_key: str,
+        status: str,
+        payload: Any = None,
+        error: str | None = None,
+    ) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO steps "
+                "(run_id, stage, item_key, status, payload, error, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (run_id, stage, item_key) DO UPDATE SET "
+                "status = excluded.status, payload = excluded.payload, error = excluded.error, "
+                "attempts = attempts + 1, updated_at = excluded.updated_at",
+                (
+                    run_id,
+                    stage,
+                    item_key,
+                    status,
+                    json.dumps(payload, ensure_ascii=False, default=str),
+                    error,
+                    time.time(),
+                ),
+            )
+            self._conn.commit()
+
+    def summary(self, run_id: str) -> dict[str, dict[str, int]]:
+        """Step counts per stage and status, e.g. {"agent_b": {"done": 40, "failed": 2}}."""
+        counts: dict[str, dict[str, int]] = {}
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT stage, status, COUNT(*) FROM steps WHERE run_id = ? GROUP BY stage, status",
+                (run_id,),
+            ).fetchall()
+        for stage, status, count in rows:
+            counts.setdefault(stage, {})[status] = count
+        return counts
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class RunCheckpointer:
+    """Checkpointing bound to one run id."""
+
+    def __init__(self, store: CheckpointStore | None, run_id: str):
+        self.store = store
+        self.run_id = run_id
+
+    def start(self, params: dict) -> None:
+        """Register the run (a resumed run keeps its original parameters)."""
+        if self.store is not None:
+            self.store.start_run(self.run_id, params)
+
+    def params(self) -> dict | None:
+        return None if self.store is None else self.store.run_params(self.run_id)
+
+    def finish(self, status: str = "done") -> None:
+        if self.store is not None:
+            self.store.finish_run(self.run_id, status)
+
+    async def step(self, stage: str, item_key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Return the stored result of (stage, item_key) if it already completed in this
+        run; otherwise await `fn()` and record its result (or its failure).
+        """
+        if self.store is None:
+            return await fn()
+        found, payload = self.store.load(self.run_id, stage, item_key)
+        if found:
+            return payload
+        try:
+            value = await fn()
+        except Exception as exc:
+            self.store.record(self.run_id, stage, item_key, "failed", error=str(exc))
+            raise
+        self.store.record(self.run_id, stage, item_key, "done", payload=value)
+        return value
+
+    def load(self, stage: str, item_key: str) -> tuple[bool, Any]:
+        if self.store is None:
+            return False, None
+        return self.store.load(self.run_id, stage, item_key)
+
+    def save(self, stage: str, item_key: str, value: Any) -> None:
+        if self.store is not None:
+            self.store.record(self.run_id, stage, item_key, "done", payload=value)
+
+
+_store: CheckpointStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_checkpoint_store() -> CheckpointStore | None:
+    """Process-wide store configured from the environment (None when disabled)."""
+    global _store
+    if os.getenv("CHECKPOINTS_DISABLED", "").lower() in ("1", "true", "yes"):
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = CheckpointStore(os.getenv("CHECKPOINT_PATH", DEFAULT_CHECKPOINT_PATH))
+    return _store
@@ -0,0 +1,159 @@
+"""
+DAG
+Purpose: Run orchestrator steps as a dependency graph instead of fixed sequences.
+
+Each node is an async function with declared inputs and outputs (plain names).
+A run starts every node whose inputs are available at once, so independent
+steps overlap, and computes each node at most once, so a shared step such as
+the signal scan feeds every pipeline that needs it. Only the nodes required for
+the requested outputs are run.
+
+Inputs that no node produces must be passed as run parameters. A node with one
+output returns its value directly; a node with several returns a dict keyed by
+output name.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Iterable
+
+try:
+    from agents.metrics import get_metrics, pipeline_context
+except ImportError:  # pragma: no cover - supports direct script execution.
+    from metrics import get_metrics, pipeline_context  # type: ignore
+
+
+class DAGError(RuntimeError):
+    """Raised for an invalid graph or a node skipped because an upstream node failed."""
+
+
+@dataclass
+class Node:
+    name: str
+    fn: Callable[..., Awaitable[Any]]
+    inputs: tuple[str, ...] = ()
+    outputs: tuple[str, ...] = ()
+    pipeline: str | None = None  # Metrics label for everything the node calls
+
+    def __post_init__(self):
+        self.outputs = tuple(self.outputs) or (self.name,)
+        self.inputs = tuple(self.inputs)
+
+
+@dataclass
+class DAGResult:
+    """Outputs of the nodes that succeeded, and the exception of every node that did not."""
+
+    values: dict[str, Any] = field(default_factory=dict)
+    errors: dict[str, BaseException] = field(default_factory=dict)
+
+    def __getitem__(self, output: str) -> Any:
+        return self.values[output]
+
+    def get(self, output: str, default: Any = None) -> Any:
+        return self.values.get(output, default)
+
+
+class DAG:
+    """A set of nodes wired together by output name."""
+
+    def __init__(self):
+        self.nodes: dict[str, Node] = {}
+        self._producers: dict[str, str] = {}
+
+    def add(
+        self,
+        name: str,
+        fn: Callable[..., Awaitable[Any]],
+        *,
+        inputs: Iterable[str] = (),
+        outputs: Iterable[str] = (),
+        pipeline: str | None = None,
+    ) -> Node:
+        if name in self.nodes:
+            raise DAGError(f"Duplicate node {name!r}.")
+        node = Node(name, fn, tuple(inputs), tuple(outputs), pipeline)
+        for output in node.outputs:
+            if output in self._producers:
+                raise DAGError(
+                    f"Output {output!r} is produced by both {self._producers[output]!r} and {name!r}."
+                )
+        for output in node.outputs:
+            self._producers[output] = name
+        self.nodes[name] = node
+        return node
+
+    def plan(self, targets: Iterable[str], params: Iterable[str] = ()) -> list[str]:
+        """
+        Nodes needed for `targets`, dependencies first.
+
+        Raises:
+            DAGError: if an input is neither produced nor given, or the graph has a cycle
+        """
+        given = set(params)
+        order: list[str] = []
+        state: dict[str, str] = {}
+
+        def visit(output: str, wanted_by: str) -> None:
+            if output in given:
+                return
+            producer = self._producers.get(output)
+            if producer is None:
+                raise DAGError(f"No node produces {output!r} (needed by {wanted_by}).")
+            if state.get(producer) == "done":
+                return
+            if state.get(producer) == "visiting":
+                raise DAGError(f"Cycle through node {producer!r}.")
+            state[producer] = "visiting"
+            for dependency in self.nodes[producer].inputs:
+                visit(dependency, producer)
+            state[producer] = "done"
+            order.append(producer)
+
+        for target in targets:
+            visit(target, "run")
+        return order
+
+    async def run(self, targets: Iterable[str], params: dict[str, Any] | None = None) -> DAGResult:
+        """
+        Compute `targets` (output names), running ready nodes concurrently.
+
+        A failing node does not stop independent branches; nodes downstream of it
+        are skipped with a `DAGError`.
+        """
+        params = dict(params or {})
+        order = self.plan(targets, params)
+        result = DAGResult(values=dict(params))
+        tasks: dict[str, asyncio.Task] = {}
+
+        async def execute(node: Node) -> None:
+            upstream = {self._producers[i] for i in node.inputs if i not in params}
+            outcomes = await asyncio.gather(*(tasks[u] for u in upstream), return_exceptions=True)
+            failed = [
+                u
+                for u, outcome in zip(upstream, outcomes, strict=True)
+                if isinstance(outcome, BaseException)
+            ]
+            if failed:
+                raise DAGError(f"{node.name} skipped: upstream {', '.join(sorted(failed))} failed.")
+
+            kwargs = {name: result.values[name] for name in node.inputs}
+            label = pipeline_context(node.pipeline) if node.pipeline else contextlib.nullcontext()
+            with label, get_metrics().timer("dag_node_duration_seconds", node=node.name):
+                value = await node.fn(**kwargs)
+            if len(node.outputs) == 1:
+                result.values[node.outputs[0]] = value
+            else:
+                result.values.update({output: value[output] for output in node.outputs})
+
+        # Upstream tasks are created first, so every dependency exists when a node awaits it.
+        for name in order:
+            tasks[name] = asyncio.create_task(execute(self.nodes[name]), name=f"dag-{name}")
+        outcomes = await asyncio.gather(*tasks.values(), return_exceptions=True)
+        for name, outcome in zip(tasks, outcomes, strict=True):
+            if isinstance(outcome, BaseException):
+                result.errors[name] = outcome
+        return result
@@ -0,0 +1,164 @@
+"""
+Deadlines
+Purpose: Per-step and per-pipeline time limits with cancellation that reaches worker threads.
+
+`deadline_scope(seconds, step)` bounds an async block with `asyncio.timeout` and
+installs a `CancelToken` in a contextvar. `executors.run_in` copies the context
+into its threads, so blocking code on the other side can call `check_cancelled()`
+between units of work (each DDGS search, each source of the signal scan, each
+sync LLM call). When the scope times out or exits, the token is cancelled: an
+abandoned thread then stops at its next check instead of running to the end.
+Scopes nest; a token is cancelled when it or any enclosing scope is.
+
+`remaining(default)` caps per-request network timeouts by what is left of the
+enclosing deadlines.
+
+Limits come from `STEP_TIMEOUTS` (stage / step name) and `PIPELINE_TIMEOUTS`
+(pipeline name), in seconds, each overridable with a JSON mapping in the
+environment variable of the same name. 0 or a missing name means no limit.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+DEFAULT_STEP_TIMEOUTS = {
+    "agent_b": 90.0,
+    "agent_c": 90.0,
+    "agent_d": 120.0,
+    "agent_e": 300.0,
+    "agent_f": 120.0,
+    "agent_k": 30.0,
+}
+DEFAULT_PIPELINE_TIMEOUTS = {
+    "recruiting": 1800.0,
+    "content": 900.0,
+    "dashboard": 600.0,
+}
+
+
+def _load(env: str, defaults: dict[str, float]) -> dict[str, float]:
+    limits = dict(defaults)
+    raw = os.getenv(env)
+    if raw:
+        limits.update({name: float(value) for name, value in json.loads(raw).items()})
+    return limits
+
+
+_step_timeouts = _load("STEP_TIMEOUTS", DEFAULT_STEP_TIMEOUTS)
+_pipeline_timeouts = _load("PIPELINE_TIMEOUTS", DEFAULT_PIPELINE_TIMEOUTS)
+
+
+def step_timeout(name: str) -> float | None:
+    """Configured limit for one item in step `name`, or None for no limit."""
+    return _step_timeouts.get(name) or None
+
+
+def pipeline_timeout(name: str) -> float | None:
+    """Configured limit for a whole pipeline run, or None for no limit."""
+    return _pipeline_timeouts.get(name) or None
+
+
+class DeadlineExceeded(TimeoutError):
+    """A step or pipeline ran past its deadline (or its work was cancelled because of one)."""
+
+    def __init__(self, step: str, seconds: float | None = None):
+        self.step = step
+        self.seconds = seconds
+        limit = f" after {seconds:g}s" if seconds else ""
+        super().__init__(f"{step} timed out{limit}")
+
+
+class CancelToken:
+    """Thread-safe cancellation flag with an optional deadline, chained to its parent scope."""
+
+    def __init__(self, step: str, seconds: float | None = None, parent: CancelToken | None = None):
+        self.step = step
+        self.seconds = seconds
+        self.deadline = time.monotonic() + seconds if seconds else None
+        self.parent = parent
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        try:
+            self.check()
+        except DeadlineExceeded:
+            return True
+        return False
+
+    def remaining(self) -> float | None:
+        """Seconds until the nearest deadline of this scope or an enclosing one."""
+        own = None if self.deadline is None else max(0.0, self.deadline - time.monotonic())
+        inherited = self.parent.remaining() if self.parent is not None else None
+        if own is None:
+            return inherited
+        return own if inherited is None else min(own, inherited)
+
+    def check(self) -> None:
+        token: CancelToken | None = self
+        while token is not None:
+            if token._event.is_set() or (
+                token.deadline is not None and time.monotonic() >= token.deadline
+            ):
+                raise DeadlineExceeded(token.step, token.seconds)
+            token = token.parent
+
+
+_current: contextvars.ContextVar[CancelToken | None] = contextvars.ContextVar(
+    "cancel_token", default=None
+)
+
+
+def current_token() -> CancelToken | None:
+    return _current.get()
+
+
+def check_cancelled() -> None:
+    """Raise `DeadlineExceeded` if the enclosing scope timed out or was cancelled."""
+    token = _current.get()
+    if token is not None:
+        token.check()
+
+
+def remaining(default: float | None = None) -> float | None:
+    """`default` capped by the time left in the enclosing scopes."""
+    token = _current.get()
+    left = token.remaining() if token is not None else None
+    if left is None:
+        return default
+    return left if default is None else min(default, left)
+
+
+@asynccontextmanager
+async def deadline_scope(seconds: float | None, step: str) -> AsyncIterator[CancelToken]:
+    """
+    Bound the block by `seconds` (None: no limit of its own, but still cancellable).
+
+    Raises:
+        DeadlineExceeded: if the block ran past `seconds`
+    """
+    token = CancelToken(step, seconds, parent=_current.get())
+    reset = _current.set(token)
+    timeout = asyncio.timeout(seconds)
+    try:
+        async with timeout:
+            yield token
+    except TimeoutError as exc:
+        if not timeout.expired() or isinstance(exc, DeadlineExceeded):
+            raise  # Someone else's timeout (a socket, an inner scope)
+        raise DeadlineExceeded(step, seconds) from exc
+    finally:
+        # Whatever the block left running in threads stops at its next check.
+        token.cancel()
+        _current.reset(reset)
@@ -0,0 +1,281 @@
+"""
+Entity Ledger
+Purpose: Remember processed candidates, signals and posts across runs; daily runs pay for what is new.
+
+Checkpoints cover one run; the ledger spans all of them. Each entity is stored
+under its kind and a normalized key:
+
+- `candidate`: `candidate_identity` (name and firm without titles, accents,
+  punctuation or legal-form suffixes)
+- `signal` / `post`: `canonical_url` of the source article (scheme, `www.`,
+  fragment, tracking parameters and trailing slash do not matter)
+
+A content hash is stored with each entry. `recall` compares the entry with what
+the current run sees:
+
+- `new`: never processed
+- `known`: processed within the kind's freshness window and unchanged, so skip it
+- `stale`: unchanged but older than the window, so refresh it cheaply (reuse what
+  still holds, e.g. a candidate's revenue analysis)
+- `changed`: the content hash differs, so process it in full
+
+Freshness windows are in days (`DEFAULT_FRESHNESS_DAYS`), overridable with a JSON
+mapping in `ENTITY_FRESHNESS`, e.g. `{"signal": 3}`. Entries written by the
+same run are always `new` for it, so a resumed run still finishes its own items.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass
+from typing import Any
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+try:
+    from agents.metrics import get_metrics
+except ImportError:  # pragma: no cover - supports direct script execution.
+    from metrics import get_metrics  # type: ignore
+
+DEFAULT_LEDGER_PATH = os.path.join(".cache", "entities.sqlite3")
+DEFAULT_FRESHNESS_DAYS = {
+    "candidate": 30.0,  # Profiled, messaged and scheduled
+    "signal": 7.0,  # Analyzed into a topic brief
+    "post": 90.0,  # An article is written about once
+}
+
+NEW = "new"
+KNOWN = "known"
+STALE = "stale"
+CHANGED = "changed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entities (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    content_hash TEXT,
+    status TEXT NOT NULL,
+    data TEXT,
+    run_id TEXT,
+    first_seen REAL NOT NULL,
+    processed_at REAL NOT NULL,
+    PRIMARY KEY (kind, key)
+);
+"""
+
+# ── Normalization ───────────────────────────────────────────────────────
+
+_TITLES = re.compile(r"\b(dr|prof|mr|mrs|ms|ll\s*m|mba|phd|rechtsanwalt|ra)\b")
+_LEGAL_FORMS = re.compile(
+    r"\b(llp|llc|gmbh|mbb|partg|partgmbb|ag|kg|co|ltd|inc|plc|rechtsanwalte)\b"
+)
+_TRACKING_PARAMS = re.compile(r"^(utm_.*|fbclid|gclid|mc_[ce]id|ref|ocid)$", re.IGNORECASE)
+
+
+def _fold(text: Any) -> str:
+    """Lowercase, strip accents and punctuation, collapse whitespace."""
+    text = unicodedata.normalize("NFKD", str(text or "")).replace("ß", "ss")
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    return " ".join(re.sub(r"[^\w\s]", " ", text).split())
+
+
+def candidate_identity(candidate: dict) -> str:
+    """
+    Stable key for a person at a firm, e.g. "Dr. Anna Müller" at "Freshfields LLP"
+    becomes "anna muller|freshfields".
+    """
+    name = candidate.get("Name") or candidate.get("name")
+    firm = candidate.get("Current_Firm") or candidate.get("firm")
+    name = " ".join(_TITLES.sub(" ", _fold(name)).split())
+    firm = " ".join(_LEGAL_FORMS.sub(" ", _fold(firm).replace(" und ", " ")).split())
+    return f"{name}|{firm}"
+
+
+def canonical_url(url: str | None) -> str:
+    """URL without the parts that differ between links to the same article."""
+    url = (url or "").strip()
+    if not url:
+        return ""
+    parts = urlsplit(url if "://" in url else f"https://{url}")
+    host = parts.netloc.lower().removeprefix("www.")
+    query = urlencode(
+        sorted(
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not _TRACKING_PARAMS.match(key)
+        )
+    )
+    return urlunsplit(("https", host, parts.path.rstrip("/"), query, ""))
+
+
+def content_hash(*parts: Any) -> str:
+    """Hash of the parts after folding case, accents and whitespace."""
+    text = "\x1f".join(_fold(part) for part in parts)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+# ── Ledger ──────────────────────────────────────────────────────────────
+
+
+@dataclass
+class Entry:
+    kind: str
+    key: str
+    content_hash: str | None
+    status: str
+    data: Any
+    run_id: str | None
+    first_seen: float
+    processed_at: float
+
+
+@dataclass
+class Recall:
+    state: str
+    entry: Entry | None = None
+
+
+def _load_freshness() -> dict[str, float]:
+    days = dict(DEFAULT_FRESHNESS_DAYS)
+    raw = os.getenv("ENTITY_FRESHNESS")
+    if raw:
+        days.update({kind: float(value) for kind, value in json.loads(raw).items()})
+    return days
+
+
+class EntityLedger:
+    """SQLite table of processed entities, keyed by kind and normalized key."""
+
+    def __init__(self, path: str = DEFAULT_LEDGER_PATH, freshness_days: dict | None = None):
+        self.path = path
+        self.freshness_days = dict(
+            DEFAULT_FRESHNESS_DAYS if freshness_days is None else freshness_days
+        )
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def get(self, kind: str, key: str) -> Entry | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT kind, key, content_hash, status, data, run_id, first_seen, processed_at "
+                "FROM entities WHERE kind = ? AND key = ?",
+                (kind, key),
+            ).fetchone()
+        if row is None:
+            return None
+        entry = Entry(*row)
+        entry.data = json.loads(entry.data) if entry.data is not None else None
+        return entry
+
+    def recall(
+        self,
+        kind: str,
+        key: str,
+        content_hash: str | None = None,
+        run_id: str | None = None,
+        now: float | None = None,
+    ) -> Recall:
+        """
+        Classify an entity against the ledger.
+
+        Args:
+            content_hash: Current content; None compares freshness only
+            run_id: The calling run; its own entries count as new
+        """
+        entry = self.get(kind, key) if key else None
+        if entry is None or (run_id is not None and entry.run_id == run_id):
+            recall = Recall(NEW)
+        elif content_hash is not None and entry.content_hash != content_hash:
+            recall = Recall(CHANGED, entry)
+        else:
+            window = self.freshness_days.get(kind, 0) * 86400
+            age = (time.time() if now is None else now) - entry.processed_at
+            recall = Recall(KNOWN if age < window else STALE, entry)
+        get_metrics().inc("ledger_lookups_total", kind=kind, state=recall.state)
+        return recall
+
+    def record(
+        self,
+        kind: str,
+        key: str,
+        content_hash: str | None = None,
+        data: Any = None,
+        *,
+        status: str = "done",
+        run_id: str | None = None,
+    ) -> None:
+        """Insert or refresh an entity; `first_seen` is kept from the first record."""
+        if not key:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO entities (kind, key, content_hash, status, data, run_id, "
+                "first_seen, processed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (kind, key) DO UPDATE SET content_hash = excluded.content_hash, "
+                "status = excluded.status, data = excluded.data, run_id = excluded.run_id, "
+                "processed_at = excluded.processed_at",
+                (
+                    kind,
+                    key,
+                    content_hash,
+                    status,
+                    json.dumps(data, ensure_ascii=False, default=str),
+                    run_id,
+                    now,
+                    now,
+                ),
+            )
+            self._conn.commit()
+
+    def forget(self, kind: str, key: str | None = None) -> int:
+        """Drop one entity, or every entity of `kind`. Returns how many were removed."""
+        with self._lock:
+            if key is None:
+                cursor = self._conn.execute("DELETE FROM entities WHERE kind = ?", (kind,))
+            else:
+                cursor = self._conn.execute(
+                    "DELETE FROM entities WHERE kind = ? AND key = ?", (kind, key)
+                )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def count(self, kind: str) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM entities WHERE kind = ?", (kind,)
+            ).fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_ledger: EntityLedger | None = None
+_ledger_lock = threading.Lock()
+
+
+def get_entity_ledger() -> EntityLedger | None:
+    """Process-wide ledger configured from the environment (None when disabled)."""
+    global _ledger
+    if os.getenv("ENTITY_LEDGER_DISABLED", "").lower() in ("1", "true", "yes"):
+        return None
+    if _ledger is None:
+        with _ledger_lock:
+            if _ledger is None:
+                _ledger = EntityLedger(
+                    os.getenv("ENTITY_LEDGER_PATH", DEFAULT_LEDGER_PATH), _load_freshness()
+                )
+    return _ledger
@@ -0,0 +1,150 @@
+"""
+Executors
+Purpose: One named executor per resource class for blocking work, not asyncio's default pool.
+
+`asyncio.to_thread` sends every blocking call to the loop's default executor, a
+single pool of min(32, cpu+4) threads. There a burst of slow LLM-side calls
+queues up DDGS scraping and CPU work behind it. Here every call site names its
+resource class and gets its own pool:
+
+- `llm_io`: blocking calls on the LLM side (model catalog refresh, sync SDK calls)
+- `llm_hedge`: hedged duplicate LLM requests (see `generate_with_fallback`), kept
+  apart so a burst of hedges cannot starve `llm_io`
+- `web_io`: DDGS searches and page scraping
+- `cpu`: short CPU-bound steps (risk scoring), sized to the core count
+
+Sizes come from `DEFAULT_WORKERS` and can be overridden with a JSON mapping in
+`EXECUTOR_WORKERS`, e.g. `{"web_io": 16}`. Every executor reports its queue depth
+and active calls as gauges (`executor_queue_depth` / `executor_active`) and records
+how long calls waited for a worker (`executor_queue_wait_seconds`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, TypeVar
+
+try:
+    from agents.metrics import get_metrics
+except ImportError:  # pragma: no cover - supports direct script execution.
+    from metrics import get_metrics  # type: ignore
+
+T = TypeVar("T")
+
+CPU_COUNT = os.cpu_count() or 2
+DEFAULT_WORKERS = {
+    "llm_io": 16,
+    "llm_hedge": int(os.getenv("HEDGE_MAX_WORKERS", "16")),
+    "web_io": 8,
+    "cpu": CPU_COUNT,
+}
+
+
+def _load_workers() -> dict[str, int]:
+    sizes = dict(DEFAULT_WORKERS)
+    raw = os.getenv("EXECUTOR_WORKERS")
+    if raw:
+        sizes.update({name: int(value) for name, value in json.loads(raw).items()})
+    return sizes
+
+
+class ResourceExecutor(concurrent.futures.Executor):
+    """A thread pool that publishes its queue depth and active calls."""
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = max(1, workers)
+        self._pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix=f"exec-{name}"
+        )
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._publish()
+
+    def _publish(self) -> None:
+        metrics = get_metrics()
+        metrics.set_gauge("executor_queue_depth", self._queued, executor=self.name)
+        metrics.set_gauge("executor_active", self._active, executor=self.name)
+
+    def _change(self, queued: int = 0, active: int = 0) -> None:
+        with self._lock:
+            self._queued += queued
+            self._active += active
+            self._publish()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queued
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    def submit(
+        self, fn: Callable[..., T], /, *args: Any, **kwargs: Any
+    ) -> concurrent.futures.Future:
+        submitted = time.monotonic()
+        self._change(queued=1)
+
+        def run() -> T:
+            get_metrics().observe(
+                "executor_queue_wait_seconds", time.monotonic() - submitted, executor=self.name
+            )
+            self._change(queued=-1, active=1)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._change(active=-1)
+
+        try:
+            return self._pool.submit(run)
+        except BaseException:
+            self._change(queued=-1)
+            raise
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+
+_executors: dict[str, ResourceExecutor] = {}
+_executors_lock = threading.Lock()
+_workers = _load_workers()
+
+
+def get_executor(resource: str) -> ResourceExecutor:
+    """The process-wide executor for `resource` (created on first use)."""
+    executor = _executors.get(resource)
+    if executor is None:
+        if resource not in _workers:
+            raise ValueError(f"Unknown executor {resource!r}; expected one of {sorted(_workers)}")
+        with _executors_lock:
+            executor = _executors.get(resource)
+            if executor is None:
+                executor = _executors[resource] = ResourceExecutor(resource, _workers[resource])
+    return executor
+
+
+async def run_in(resource: str, fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+    """
+    Await blocking `fn(*args, **kwargs)` on the executor of `resource`.
+
+    Like `asyncio.to_thread`, the call runs in a copy of the current context, so
+    contextvars such as the metrics pipeline label carry over.
+    """
+    call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(get_executor(resource), call)
+
+
+def shutdown_executors(wait: bool = True) -> None:
+    with _executors_lock:
+        for executor in _executors.values():
+            executor.shutdown(wait=wait)
+        _executors.clear()
@@ -0,0 +1,325 @@
+"""
+Job Queue
+Purpose: Durable SQLite queue of pipeline jobs and recurring schedules for the service mode.
+
+Jobs survive restarts: a job is `queued` until a worker claims it (`running`),
+then ends `done`, `failed` or `cancelled`. A failed job is queued again with a
+backoff until it has used `max_attempts`. Claims run inside `BEGIN IMMEDIATE`,
+so several workers (or service processes) sharing the file never take the same
+job. On startup the service calls `recover()`, which requeues jobs that an
+earlier process left `running` when it died.
+
+Schedules turn into jobs: `enqueue_due()` submits one job per schedule whose
+`next_run_at` has passed and moves it forward by whole intervals (a service that
+was down for three days runs the daily dashboard once, not three times).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any
+
+DEFAULT_QUEUE_PATH = os.path.join(".cache", "jobs.sqlite3")
+RETRY_BACKOFF_SECONDS = 30.0
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 1,
+    schedule TEXT,
+    worker TEXT,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    available_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, available_at, priority);
+CREATE TABLE IF NOT EXISTS schedules (
+    name TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    params TEXT NOT NULL,
+    interval_s REAL NOT NULL,
+    next_run_at REAL NOT NULL,
+    last_job_id INTEGER
+);
+"""
+
+_JOB_COLUMNS = (
+    "id, kind, params, status, priority, attempts, max_attempts, schedule, worker, "
+    "result, error, created_at, started_at, finished_at"
+)
+
+
+@dataclass
+class Job:
+    id: int
+    kind: str
+    params: dict
+    status: str
+    priority: int
+    attempts: int
+    max_attempts: int
+    schedule: str | None
+    worker: str | None
+    result: Any
+    error: str | None
+    created_at: float
+    started_at: float | None
+    finished_at: float | None
+
+    @property
+    def run_id(self) -> str:
+        """Checkpoint run id: a retried job resumes where its last attempt stopped."""
+        return f"job-{self.id}"
+
+    @classmethod
+    def from_row(cls, row: tuple) -> Job:
+        values = list(row)
+        values[2] = json.loads(values[2])
+        values[9] = json.loads(values[9]) if values[9] is not None else None
+        return cls(*values)
+
+
+@dataclass
+class Schedule:
+    name: str
+    kind: str
+    params: dict
+    interval_s: float
+    next_run_at: float
+    last_job_id: int | None
+
+
+class JobQueue:
+    """SQLite-backed job queue shared by the service workers and the CLI."""
+
+    def __init__(self, path: str = DEFAULT_QUEUE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, timeout=30, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def _insert(self, kind, params, priority, max_attempts, available_at, schedule=None) -> int:
+        now = time.time()
+        cursor = self._conn.execute(
+            "INSERT INTO jobs (kind, params, status, priority, max_attempts, schedule, "
+            "created_at, available_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                kind,
+                json.dumps(params, ensure_ascii=False),
+                QUEUED,
+                priority,
+                max(1, max_attempts),
+                schedule,
+                now,
+                available_at if available_at is not None else now,
+            ),
+        )
+        return cursor.lastrowid
+
+    def submit(
+        self,
+        kind: str,
+        params: dict | None = None,
+        *,
+        priority: int = 0,
+        max_attempts: int = 1,
+        run_at: float | None = None,
+    ) -> int:
+        """Queue a job; higher `priority` runs first, `run_at` delays it. Returns the job id."""
+        with self._lock:
+            return self._insert(kind, params or {}, priority, max_attempts, run_at)
+
+    def claim(self, worker: str) -> Job | None:
+        """Atomically take the next ready job, or None if nothing is ready."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    f"SELECT {_JOB_COLUMNS} FROM jobs WHERE status = ? AND available_at <= ? "
+                    "ORDER BY priority DESC, id LIMIT 1",
+                    (QUEUED, now),
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = ?, worker = ?, attempts = attempts + 1, "
+                        "started_at = ? WHERE id = ?",
+                        (RUNNING, worker, now, row[0]),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        job = Job.from_row(row)
+        job.status, job.worker, job.started_at = RUNNING, worker, now
+        job.attempts += 1
+        return job
+
+    def complete(self, job_id: int, result: Any = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = NULL, finished_at = ? WHERE id = ?",
+                (DONE, json.dumps(result, ensure_ascii=False, default=str), time.time(), job_id),
+            )
+
+    def fail(self, job_id: int, error: str) -> str:
+        """Record a failed attempt. Returns the new status (queued again, or failed)."""
+        now = time.time()
+        with self._lock:
+            attempts, max_attempts = self._conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if attempts < max_attempts:
+                status, available_at, finished_at = QUEUED, now + RETRY_BACKOFF_SECONDS, None
+            else:
+                status, available_at, finished_at = FAILED, now, now
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, available_at = ?, finished_at = ? "
+                "WHERE id = ?",
+                (status, error, available_at, finished_at, job_id),
+            )
+        return status
+
+    def cancel(self, job_id: int) -> bool:
+        """Cancel a job that has not started. Returns whether it was cancelled."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?",
+                (CANCELLED, time.time(), job_id, QUEUED),
+            )
+        return cursor.rowcount == 1
+
+    def recover(self) -> int:
+        """Requeue jobs left `running` by a process that died. Returns how many."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, worker = NULL, available_at = ? WHERE status = ?",
+                (QUEUED, time.time(), RUNNING),
+            )
+        return cursor.rowcount
+
+    def get(self, job_id: int) -> Job | None:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_JOB_COLUMNS} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return None if row is None else Job.from_row(row)
+
+    def jobs(self, status: str | None = None, limit: int = 20) -> list[Job]:
+        """Most recent jobs first."""
+        query = f"SELECT {_JOB_COLUMNS} FROM jobs"
+        args: tuple = ()
+        if status:
+            query += " WHERE status = ?"
+            args = (status,)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY id DESC LIMIT ?", (*args, limit))
+            return [Job.from_row(row) for row in rows.fetchall()]
+
+    def pending(self) -> int:
+        """Jobs queued or running (including queued retries that are not ready yet)."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)
+            ).fetchone()[0]
+
+    # ── Schedules ───────────────────────────────────────────────────────
+
+    def schedule(
+        self,
+        name: str,
+        kind: str,
+        params: dict | None,
+        interval_s: float,
+        first_run_at: float | None = None,
+    ) -> None:
+        """Create or replace a recurring job. `interval_s` must be positive."""
+        if interval_s <= 0:
+            raise ValueError(f"Schedule interval must be positive, got {interval_s}")
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO schedules (name, kind, params, interval_s, next_run_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    name,
+                    kind,
+                    json.dumps(params or {}, ensure_ascii=False),
+                    interval_s,
+                    first_run_at if first_run_at is not None else time.time(),
+                ),
+            )
+
+    def unschedule(self, name: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM schedules WHERE name = ?", (name,))
+        return cursor.rowcount == 1
+
+    def schedules(self) -> list[Schedule]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name, kind, params, interval_s, next_run_at, last_job_id "
+                "FROM schedules ORDER BY next_run_at"
+            ).fetchall()
+        return [
+            Schedule(name, kind, json.loads(params), interval_s, next_run_at, last_job_id)
+            for name, kind, params, interval_s, next_run_at, last_job_id in rows
+        ]
+
+    def enqueue_due(self, now: float | None = None) -> list[int]:
+        """Submit a job for every schedule that is due. Returns the new job ids."""
+        now = time.time() if now is None else now
+        submitted = []
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                due = self._conn.execute(
+                    "SELECT name, kind, params, interval_s, next_run_at FROM schedules "
+                    "WHERE next_run_at <= ?",
+                    (now,),
+                ).fetchall()
+                for name, kind, params, interval_s, next_run_at in due:
+                    job_id = self._insert(kind, json.loads(params), 0, 1, now, schedule=name)
+                    # Skip missed runs: the next one is the first interval boundary after now
+                    missed = int((now - next_run_at) // interval_s) + 1
+                    self._conn.execute(
+                        "UPDATE schedules SET next_run_at = ?, last_job_id = ? WHERE name = ?",
+                        (next_run_at + missed * interval_s, job_id, name),
+                    )
+                    submitted.append(job_id)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return submitted
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
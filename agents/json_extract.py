@@ -0,0 +1,197 @@
+"""
+JSON Extract
+Purpose: Tolerant, incremental JSON extraction from LLM responses.
+
+Used as the local fallback behind schema-constrained output: it finds the first
+JSON value in prose or markdown fences, repairs the usual model slips (trailing
+commas, output truncated mid-object), and can parse a streamed top-level array
+item by item as each element closes.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def strip_code_fences(text: str) -> str:
+    if "```json" in text:
+        return text.split("```json")[1].split("```")[0]
+    if "```" in text:
+        return text.split("```")[1].split("```")[0]
+    return text
+
+
+def repair_json(fragment: str) -> str:
+    """Drop trailing commas and close an unterminated string and open brackets."""
+    out: list[str] = []
+    stack: list[str] = []
+    in_string = False
+    escape = False
+    pending_comma = False
+
+    for ch in fragment:
+        if in_string:
+            out.append(ch)
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+
+        if ch.isspace():
+            out.append(ch)
+            continue
+        if ch == ",":
+            pending_comma = True
+            continue
+        if pending_comma:
+            if ch not in "}]":
+                out.append(",")
+            pending_comma = False
+
+        if ch == '"':
+            in_string = True
+        elif ch in _CLOSERS:
+            stack.append(_CLOSERS[ch])
+        elif ch in "}]" and stack:
+            stack.pop()
+        out.append(ch)
+
+    if in_string:
+        if escape:
+            out.pop()
+        out.append('"')
+    repaired = "".join(out).rstrip()
+    if repaired.endswith(":"):
+        repaired += " null"
+    return repaired + "".join(reversed(stack))
+
+
+def _balanced_end(text: str, start: int) -> int | None:
+    """Index just past the JSON value starting at `start`, or None if it never closes."""
+    depth = 0
+    in_string = False
+    escape = False
+    for index in range(start, len(text)):
+        ch = text[index]
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            depth += 1
+        elif ch in "}]":
+            depth -= 1
+            if depth == 0:
+                return index + 1
+    return None
+
+
+def extract_json(text: str) -> Any:
+    """
+    Decode the first JSON object or array in a model response.
+
+    Raises:
+        ValueError: if no JSON value can be recovered
+    """
+    cleaned = strip_code_fences(text).strip()
+    try:
+        return json.loads(cleaned)
+    except ValueError:
+        pass
+
+    starts = [index for index in (cleaned.find("{"), cleaned.find("[")) if index >= 0]
+    if not starts:
+        raise ValueError("No JSON value found in response.")
+    start = min(starts)
+    end = _balanced_end(cleaned, start)
+    candidate = cleaned[start:end] if end is not None else cleaned[start:]
+
+    try:
+        return json.loads(candidate)
+    except ValueError:
+        pass
+    try:
+        return json.loads(repair_json(candidate))
+    except ValueError as exc:
+        raise ValueError(f"Unable to recover JSON from response: {exc}") from exc
+
+
+class IncrementalJSONParser:
+    """
+    Feed response chunks as they stream in and get back completed values.
+
+    For a top-level array, each object or array element is returned as soon as
+    its closing bracket arrives. A top-level object is returned once it closes.
+    """
+
+    def __init__(self):
+        self._text: list[str] = []
+        self._length = 0
+        self._stack: list[str] = []
+        self._in_string = False
+        self._escape = False
+        self._root: str | None = None
+        self._item_start: int | None = None
+        self._done = False
+
+    def feed(self, chunk: str) -> list[Any]:
+        items: list[Any] = []
+        for ch in chunk:
+            position = self._length
+            self._text.append(ch)
+            self._length += 1
+            if self._done:
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in _CLOSERS:
+                if self._root is None:
+                    self._root = ch
+                    if ch == "{":
+                        self._item_start = position
+                elif self._root == "[" and len(self._stack) == 1:
+                    self._item_start = position
+                self._stack.append(ch)
+            elif ch in "}]" and self._stack:
+                self._stack.pop()
+                item_depth = 0 if self._root == "{" else 1
+                if self._item_start is not None and len(self._stack) == item_depth:
+                    fragment = "".join(self._text[self._item_start : position + 1])
+                    self._item_start = None
+                    try:
+                        items.append(json.loads(fragment))
+                    except ValueError:
+                        items.append(json.loads(repair_json(fragment)))
+                if not self._stack:
+                    self._done = True
+        return items
+
+    @property
+    def text(self) -> str:
+        return "".join(self._text)
+
+    @property
+    def complete(self) -> bool:
+        """True once the top-level value has closed."""
+        return self._done
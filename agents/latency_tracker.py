@@ -0,0 +1,84 @@
+"""
+Latency Tracker
+Purpose: Keep a rolling latency window per model so hedged requests can adapt.
+
+The gateway records the wall time of every successful network call. The
+fallback chain reads the configured percentile (p95 by default) of the primary
+model as its hedge delay: if the primary has not answered by then, the next
+model in the chain is fired as well.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import deque
+
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))
+HEDGE_DEFAULT_DELAY_SECONDS = float(os.getenv("HEDGE_DEFAULT_DELAY_SECONDS", "10"))
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "5"))
+WINDOW_SIZE = 200
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    rank = (len(ordered) - 1) * q / 100.0
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+class LatencyTracker:
+    """Thread-safe rolling window of call latencies per model."""
+
+    def __init__(
+        self,
+        window: int = WINDOW_SIZE,
+        min_samples: int = HEDGE_MIN_SAMPLES,
+        default_delay: float = HEDGE_DEFAULT_DELAY_SECONDS,
+    ):
+        self.window = window
+        self.min_samples = min_samples
+        self.default_delay = default_delay
+        self._samples: dict[str, deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, model: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.setdefault(model, deque(maxlen=self.window))
+            samples.append(seconds)
+
+    def percentile(self, model: str, q: float) -> float | None:
+        with self._lock:
+            samples = list(self._samples.get(model, ()))
+        if not samples:
+            return None
+        return _percentile(samples, q)
+
+    def hedge_delay(self, model: str, q: float = HEDGE_PERCENTILE) -> float:
+        """How long to wait for `model` before hedging; the default until enough samples exist."""
+        with self._lock:
+            samples = list(self._samples.get(model, ()))
+        if len(samples) < self.min_samples:
+            return self.default_delay
+        return _percentile(samples, q)
+
+    def snapshot(self) -> dict[str, dict]:
+        with self._lock:
+            models = {model: list(samples) for model, samples in self._samples.items()}
+        return {
+            model: {
+                "count": len(samples),
+                "p50": _percentile(samples, 50),
+                "p95": _percentile(samples, 95),
+            }
+            for model, samples in models.items()
+            if samples
+        }
+
+
+_tracker = LatencyTracker()
+
+
+def get_latency_tracker() -> LatencyTracker:
+    return _tracker
@@ -1,20 +1,16 @@
-import os
-
-from dotenv import load_dotenv
-from google import genai
-
-load_dotenv()
-api_key = os.getenv("GOOGLE_API_KEY")
+try:
+    from agents.llm_gateway import has_api_key, refresh_model_catalog
+except ImportError:  # pragma: no cover - supports direct script execution.
+    from llm_gateway import has_api_key, refresh_model_catalog  # type: ignore
 
-if not api_key:
+if not has_api_key():
     print("Error: GOOGLE_API_KEY not found in .env")
     exit(1)
 
-client = genai.Client(api_key=api_key)
-
 try:
     print("Available Models:")
-    for m in client.models.list():
-        print(m.name)
+    # Also refreshes the cached catalog the gateway uses to skip unknown models.
+    for name in refresh_model_catalog().names():
+        print(name)
 except Exception as e:
     print(f"Error listing models: {e}")
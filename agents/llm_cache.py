@@ -0,0 +1,195 @@
+"""
+LLM Response Cache
+Purpose: Persist model responses on disk so identical prompts are not paid for twice.
+
+Entries are content-addressed (model + prompt + generation config), expire after a
+per-agent TTL and are evicted least-recently-used once the store exceeds its size
+budget. SQLite in WAL mode keeps the file safe to share between threads and processes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any
+
+DEFAULT_CACHE_PATH = os.path.join(".cache", "llm_cache.sqlite3")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 24 * 3600
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# TTL per calling agent. 0 disables caching for that agent.
+AGENT_TTLS = {
+    "agent_a": 7 * DAY,  # Profile scoring is stable for a given dump
+    "agent_b": 7 * DAY,  # Deal sheets rarely change within a week
+    "agent_c": 1 * DAY,
+    "agent_d": 12 * HOUR,  # Slot prompt embeds today's date anyway
+    "agent_e": 1 * DAY,
+    "agent_f": 1 * DAY,
+    "agent_g": 1 * DAY,
+    "agent_i": 30 * DAY,  # Same contract text, same red flags
+    "agent_j": 7 * DAY,
+    "content_agent": 12 * HOUR,
+    "recruiting_agent": 12 * HOUR,
+    "reply_agent": 0,  # Users re-run this to get fresh variations
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    agent TEXT NOT NULL,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    last_accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_last_accessed ON responses(last_accessed);
+"""
+
+
+def _config_fingerprint(config: Any) -> Any:
+    if config is None:
+        return None
+    if hasattr(config, "model_dump"):
+        return config.model_dump(mode="json", exclude_none=True)
+    return config
+
+
+def make_cache_key(model: str, contents: Any, config: Any = None) -> str:
+    """Content address of a request: sha256 over model, prompt and generation config."""
+    payload = json.dumps(
+        {"model": model, "contents": contents, "config": _config_fingerprint(config)},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Size-bounded, TTL-aware SQLite store for LLM response texts."""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        agent_ttls: dict[str, int] | None = None,
+        default_ttl: int = DEFAULT_TTL_SECONDS,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.agent_ttls = dict(AGENT_TTLS if agent_ttls is None else agent_ttls)
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def ttl_for(self, agent: str) -> int:
+        return self.agent_ttls.get(agent, self.default_ttl)
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            response, expires_at = row
+            if expires_at <= now:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE responses SET last_accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return response
+
+    def put(self, key: str, response: str, *, agent: str, model: str) -> None:
+        ttl = self.ttl_for(agent)
+        if ttl <= 0 or not response:
+            return
+
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, agent, model, response, size, created_at, expires_at, last_accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, agent, model, response, size, now, now + ttl, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        """Forget one entry (e.g. a response that failed schema validation)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        """Drop expired rows, then least-recently-used rows until back under budget."""
+        self._conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+        (total,) = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+        if total <= self.max_bytes:
+            return
+
+        excess = total - self.max_bytes
+        freed = 0
+        victims: list[str] = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY last_accessed ASC"
+        ):
+            victims.append(key)
+            freed += size
+            if freed >= excess:
+                break
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", [(k,) for k in victims])
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {"entries": entries, "bytes": total, "max_bytes": self.max_bytes}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_cache: ResponseCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> ResponseCache | None:
+    """Process-wide cache configured from the environment (None when disabled)."""
+    global _cache
+    if os.getenv("LLM_CACHE_DISABLED", "").lower() in ("1", "true", "yes"):
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache(
+                    path=os.getenv("LLM_CACHE_PATH", DEFAULT_CACHE_PATH),
+                    max_bytes=int(os.getenv("LLM_CACHE_MAX_BYTES", str(DEFAULT_MAX_BYTES))),
+                )
+    return _cache
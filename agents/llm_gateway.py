@@ -0,0 +1,713 @@
+"""
+LLM Gateway
+Purpose: Own the single, pooled Gemini client that every agent shares.
+
+Agents call `generate_text` from synchronous code and `agenerate_text` from
+asyncio code. Both paths go through one `genai.Client`, so the sync pool
+(`client.models`) and the native async pool (`client.aio.models`) each keep
+one set of keep-alive connections for the whole process instead of one per
+agent module.
+
+Every call is served from the on-disk response cache first (see `llm_cache`),
+so re-runs of the same prompts cost neither latency nor quota. Concurrent cache
+misses for the same request are collapsed by `single_flight`, and the calls that
+do go out are admitted by the priority scheduler in `llm_scheduler` (recruiting
+ahead of dashboard, content and bulk work) and paced by the per-model token
+buckets in `rate_limiter`.
+
+`generate_with_fallback` / `agenerate_with_fallback` walk a model fallback chain.
+In hedging mode the next model is fired as soon as the current one is slower than
+its tracked latency percentile; the first valid answer wins and the rest are
+cancelled.
+
+Before a request goes out, `model_health` is consulted: models missing from the
+cached catalog or with an open circuit fail instantly with `ModelUnavailableError`,
+so fallback chains move past dead models without a round trip.
+
+Every call is also recorded in the `metrics` registry (latency, tokens, retries,
+cache hits, errors and which fallback model answered), labeled by agent.
+
+`generate_structured` / `agenerate_structured` request schema-constrained JSON
+(`response_mime_type="application/json"` plus the JSON schema of a `models.py`
+type) and validate the answer with Pydantic. `json_extract` is the local
+fallback for models that still wrap or truncate their JSON.
+`astream_structured` streams a JSON array instead and yields each validated
+item as soon as it closes, so downstream stages can start before the array ends.
+
+The client itself comes from `backends`: live, recording into fixtures, or an
+offline stand-in that replays fixtures or synthesizes schema-valid answers. The
+response cache is only used live, and offline runs skip the model catalog and
+circuit breaker.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import contextvars
+import importlib.util
+import os
+import threading
+import time
+from typing import Any, AsyncIterator, Callable
+
+import httpx
+from dotenv import load_dotenv
+from google import genai
+from google.genai import types
+from pydantic import TypeAdapter, ValidationError
+
+try:
+    from agents.backends import get_backend
+    from agents.executors import get_executor, run_in
+    from agents.json_extract import IncrementalJSONParser, extract_json
+    from agents.latency_tracker import get_latency_tracker
+    from agents.llm_cache import get_cache, make_cache_key
+    from agents.llm_scheduler import get_llm_scheduler
+    from agents.metrics import get_metrics
+    from agents.model_health import (
+        ModelCatalog,
+        get_circuit_breaker,
+        get_model_catalog,
+        is_model_failure,
+    )
+    from agents.rate_limiter import (
+        acall_with_rate_limit,
+        call_with_rate_limit,
+        estimate_tokens,
+        get_rate_limiter,
+    )
+    from agents.single_flight import get_single_flight
+except ImportError:  # pragma: no cover - supports direct script execution.
+    from backends import get_backend  # type: ignore
+    from executors import get_executor, run_in  # type: ignore
+    from json_extract import IncrementalJSONParser, extract_json  # type: ignore
+    from latency_tracker import get_latency_tracker  # type: ignore
+    from llm_cache import get_cache, make_cache_key  # type: ignore
+    from llm_scheduler import get_llm_scheduler  # type: ignore
+    from metrics import get_metrics  # type: ignore
+    from model_health import (  # type: ignore
+        ModelCatalog,
+        get_circuit_breaker,
+        get_model_catalog,
+        is_model_failure,
+    )
+    from rate_limiter import (  # type: ignore
+        acall_with_rate_limit,
+        call_with_rate_limit,
+        estimate_tokens,
+        get_rate_limiter,
+    )
+    from single_flight import get_single_flight  # type: ignore
+
+load_dotenv()
+
+POOL_MAX_CONNECTIONS = int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "64"))
+POOL_MAX_KEEPALIVE = int(os.getenv("LLM_POOL_MAX_KEEPALIVE", "32"))
+HEDGING_ENABLED = os.getenv("LLM_HEDGING", "1").lower() not in ("0", "false", "no")
+REQUEST_TIMEOUT_SECONDS = float(os.getenv("LLM_REQUEST_TIMEOUT", "120"))
+CATALOG_RETRY_SECONDS = 300.0
+
+_client: genai.Client | None = None
+_client_lock = threading.Lock()
+_catalog_lock = threading.Lock()
+_catalog_attempted_at = 0.0
+
+
+class LLMGatewayError(RuntimeError):
+    """Raised when the gateway cannot serve an LLM request."""
+
+
+class StructuredOutputError(LLMGatewayError):
+    """Raised when a response does not match the requested schema."""
+
+    def __init__(self, message: str, raw_response: str = ""):
+        super().__init__(message)
+        self.raw_response = raw_response
+
+
+class ModelUnavailableError(LLMGatewayError):
+    """Raised without a network call when a model is not in the catalog or its circuit is open."""
+
+
+def _http2_available() -> bool:
+    """HTTP/2 multiplexing needs the optional `h2` package; fall back to HTTP/1.1 without it."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def _build_http_options() -> types.HttpOptions:
+    """
+    Pin both SDK transports to httpx with an explicit connection pool.
+
+    Passing a transport also keeps the SDK from switching the async path to
+    aiohttp, so sync and async calls share the same pool semantics.
+    """
+    http2 = _http2_available()
+    limits = httpx.Limits(
+        max_connections=POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=POOL_MAX_KEEPALIVE,
+    )
+    return types.HttpOptions(
+        # No request may hang forever, including sync calls in worker threads
+        timeout=int(REQUEST_TIMEOUT_SECONDS * 1000),
+        client_args={"transport": httpx.HTTPTransport(http2=http2, limits=limits)},
+        async_client_args={"transport": httpx.AsyncHTTPTransport(http2=http2, limits=limits)},
+    )
+
+
+def has_api_key() -> bool:
+    """True if requests can be served: an API key is set or an offline backend is active."""
+    return bool(os.getenv("GOOGLE_API_KEY")) or get_backend().offline
+
+
+def _build_live_client() -> genai.Client:
+    api_key = os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        raise LLMGatewayError("GOOGLE_API_KEY not found in environment.")
+    return genai.Client(api_key=api_key, http_options=_build_http_options())
+
+
+def get_client() -> genai.Client:
+    """Return the process-wide client from the active backend, creating it on first use."""
+    global _client
+    if _client is not None:
+        return _client
+
+    with _client_lock:
+        if _client is None:
+            _client = get_backend().client(_build_live_client)
+    return _client
+
+
+def close_client() -> None:
+    """Close the shared sync pool (the async pool is closed by `aclose_client`)."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+
+async def aclose_client() -> None:
+    """Close both pools of the shared client from inside the running event loop."""
+    global _client
+    with _client_lock:
+        client, _client = _client, None
+    if client is not None:
+        await client.aio.aclose()
+        client.close()
+
+
+def refresh_model_catalog() -> ModelCatalog:
+    """Fetch `client.models.list()` into the on-disk model catalog."""
+    catalog = get_model_catalog()
+    catalog.refresh(lambda: get_client().models.list())
+    return catalog
+
+
+def ensure_model_catalog() -> ModelCatalog:
+    """Refresh a stale catalog at most once per retry window; keep the old one on failure."""
+    global _catalog_attempted_at
+    catalog = get_model_catalog()
+    if get_backend().offline or not catalog.is_stale() or not has_api_key():
+        return catalog
+
+    with _catalog_lock:
+        if catalog.is_stale() and time.monotonic() - _catalog_attempted_at > CATALOG_RETRY_SECONDS:
+            _catalog_attempted_at = time.monotonic()
+            try:
+                refresh_model_catalog()
+            except Exception as exc:
+                print(f"  ⚠️ Model catalog refresh failed: {exc}")
+    return catalog
+
+
+def _check_model_available(model: str) -> None:
+    if get_backend().offline:
+        return
+    if get_model_catalog().is_known(model) is False:
+        raise ModelUnavailableError(f"Model {model} is not in the model catalog.")
+    if not get_circuit_breaker().allow(model):
+        raise ModelUnavailableError(f"Circuit open for model {model}; skipping.")
+
+
+def _record_outcome(model: str, error: BaseException | None) -> None:
+    if get_backend().offline:
+        return  # Replayed or synthetic outcomes say nothing about the real model.
+    breaker = get_circuit_breaker()
+    if error is None:
+        breaker.record_success(model)
+    elif is_model_failure(error):
+        breaker.record_failure(model, error)
+
+
+def _response_cache() -> Any:
+    """The response cache, or None unless live (recordings must see every request)."""
+    return get_cache() if get_backend().mode == "live" else None
+
+
+def _record_success(model: str, agent: str, elapsed: float, response: Any) -> None:
+    _record_outcome(model, None)
+    get_latency_tracker().record(model, elapsed)
+    metrics = get_metrics()
+    metrics.observe("llm_request_duration_seconds", elapsed, agent=agent, model=model)
+    metrics.inc("llm_requests_total", agent=agent, model=model, outcome="ok")
+    usage = getattr(response, "usage_metadata", None)
+    if usage is not None:
+        prompt_tokens = getattr(usage, "prompt_token_count", None) or 0
+        completion_tokens = getattr(usage, "candidates_token_count", None) or 0
+        metrics.inc("llm_prompt_tokens_total", prompt_tokens, agent=agent, model=model)
+        metrics.inc("llm_completion_tokens_total", completion_tokens, agent=agent, model=model)
+
+
+def _record_failure(model: str, agent: str, error: BaseException) -> None:
+    _record_outcome(model, error)
+    get_metrics().inc("llm_requests_total", agent=agent, model=model, outcome="error")
+
+
+def _retry_recorder(model: str, agent: str) -> Callable[[float], None]:
+    return lambda delay: get_metrics().inc("llm_retries_total", agent=agent, model=model)
+
+
+def _record_cache_hit(model: str, agent: str) -> None:
+    get_metrics().inc("llm_requests_total", agent=agent, model=model, outcome="cache_hit")
+
+
+def generate_text(
+    model: str,
+    contents: Any,
+    *,
+    agent: str = "default",
+    config: types.GenerateContentConfig | None = None,
+) -> str:
+    """
+    Blocking text generation on the shared client.
+
+    Args:
+        model: Gemini model id
+        contents: Prompt string or SDK contents
+        agent: Name of the calling agent (selects the cache TTL)
+        config: Optional generation config
+
+    Returns:
+        The response text ("" if the model returned no text)
+    """
+    cache = _response_cache()
+    key = make_cache_key(model, contents, config)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            _record_cache_hit(model, agent)
+            return cached
+
+    def call() -> str:
+        ensure_model_catalog()
+        _check_model_available(model)
+        client = get_client()
+        with get_llm_scheduler().admit(agent):
+            started = time.monotonic()
+            try:
+                response = call_with_rate_limit(
+                    get_rate_limiter().for_model(model),
+                    lambda: client.models.generate_content(
+                        model=model, contents=contents, config=config
+                    ),
+                    tokens=estimate_tokens(contents),
+                    on_retry=_retry_recorder(model, agent),
+                )
+            except Exception as exc:
+                _record_failure(model, agent, exc)
+                raise
+        _record_success(model, agent, time.monotonic() - started, response)
+        text = response.text or ""
+        if cache is not None:
+            cache.put(key, text, agent=agent, model=model)
+        return text
+
+    return get_single_flight().do(("llm", key), call)
+
+
+async def agenerate_text(
+    model: str,
+    contents: Any,
+    *,
+    agent: str = "default",
+    config: types.GenerateContentConfig | None = None,
+) -> str:
+    """Native asyncio counterpart of `generate_text` (no worker thread per request)."""
+    cache = _response_cache()
+    key = make_cache_key(model, contents, config)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            _record_cache_hit(model, agent)
+            return cached
+
+    async def call() -> str:
+        if get_model_catalog().is_stale():
+            await run_in("llm_io", ensure_model_catalog)
+        _check_model_available(model)
+        client = get_client()
+        async with get_llm_scheduler().aadmit(agent):
+            started = time.monotonic()
+            try:
+                response = await acall_with_rate_limit(
+                    get_rate_limiter().for_model(model),
+                    lambda: client.aio.models.generate_content(
+                        model=model, contents=contents, config=config
+                    ),
+                    tokens=estimate_tokens(contents),
+                    on_retry=_retry_recorder(model, agent),
+                )
+            except Exception as exc:
+                _record_failure(model, agent, exc)
+                raise
+        _record_success(model, agent, time.monotonic() - started, response)
+        text = response.text or ""
+        if cache is not None:
+            cache.put(key, text, agent=agent, model=model)
+        return text
+
+    return await get_single_flight().ado(("llm", key), call)
+
+
+async def astream_text(
+    model: str,
+    contents: Any,
+    *,
+    agent: str = "default",
+    config: types.GenerateContentConfig | None = None,
+) -> AsyncIterator[str]:
+    """
+    Stream the response text chunk by chunk on the shared async client.
+
+    A cached response is yielded as one chunk. A completed stream is cached and
+    recorded like `agenerate_text`; concurrent identical streams are not collapsed.
+    """
+    cache = _response_cache()
+    key = make_cache_key(model, contents, config)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            _record_cache_hit(model, agent)
+            yield cached
+            return
+
+    if get_model_catalog().is_stale():
+        await run_in("llm_io", ensure_model_catalog)
+    _check_model_available(model)
+    client = get_client()
+    parts: list[str] = []
+    last_chunk = None
+    try:
+        # Admission covers opening the stream only: a consumer held up by back-pressure
+        # must not keep a slot that the stages it feeds are waiting for.
+        async with get_llm_scheduler().aadmit(agent):
+            started = time.monotonic()
+            stream = await acall_with_rate_limit(
+                get_rate_limiter().for_model(model),
+                lambda: client.aio.models.generate_content_stream(
+                    model=model, contents=contents, config=config
+                ),
+                tokens=estimate_tokens(contents),
+                on_retry=_retry_recorder(model, agent),
+            )
+        async for chunk in stream:
+            last_chunk = chunk
+            if chunk.text:
+                parts.append(chunk.text)
+                paused = time.monotonic()
+                yield chunk.text
+                started += time.monotonic() - paused  # Consumer time is not model latency.
+    except Exception as exc:
+        _record_failure(model, agent, exc)
+        raise
+    _record_success(model, agent, time.monotonic() - started, last_chunk)
+    if cache is not None:
+        cache.put(key, "".join(parts), agent=agent, model=model)
+
+
+def _non_empty(text: str) -> bool:
+    return bool(text.strip())
+
+
+def _dedupe_chain(models: list[str]) -> list[str]:
+    return list(dict.fromkeys(models))
+
+
+def _record_fallback(chain: list[str], model: str, agent: str) -> None:
+    position = str(chain.index(model))
+    get_metrics().inc("llm_fallback_total", agent=agent, model=model, position=position)
+
+
+def generate_with_fallback(
+    models: list[str],
+    contents: Any,
+    *,
+    agent: str = "default",
+    config: types.GenerateContentConfig | None = None,
+    hedge: bool = HEDGING_ENABLED,
+    validate: Callable[[str], bool] = _non_empty,
+) -> str:
+    """
+    Return the first valid response from a model fallback chain.
+
+    Without hedging the chain is tried strictly in order. With hedging, a model
+    that has not answered within its tracked latency percentile gets the next
+    model fired alongside it; a failure always launches the next model at once.
+
+    Raises:
+        LLMGatewayError: if every model fails or returns an invalid response
+    """
+    chain = _dedupe_chain(models)
+    tracker = get_latency_tracker()
+    pending: dict[concurrent.futures.Future, str] = {}
+    next_index = 0
+    launched_at = 0.0
+    last_error: Exception | None = None
+
+    def launch() -> None:
+        nonlocal next_index, launched_at
+        model = chain[next_index]
+        next_index += 1
+        launched_at = time.monotonic()
+        # Copy the context so the worker keeps the caller's pipeline label.
+        future = get_executor("llm_hedge").submit(
+            contextvars.copy_context().run,
+            generate_text,
+            model,
+            contents,
+            agent=agent,
+            config=config,
+        )
+        pending[future] = model
+
+    launch()
+    try:
+        while pending:
+            timeout = None
+            if hedge and next_index < len(chain):
+                delay = tracker.hedge_delay(chain[next_index - 1])
+                timeout = max(0.0, launched_at + delay - time.monotonic())
+
+            done, _ = concurrent.futures.wait(
+                pending, timeout=timeout, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            if not done:
+                print(f"  ⏱️ {chain[next_index - 1]} slow, hedging with {chain[next_index]}")
+                launch()
+                continue
+
+            for future in done:
+                model = pending.pop(future)
+                try:
+                    text = future.result()
+                except Exception as exc:
+                    last_error = exc
+                    print(f"  ⚠️ Model {model} failed: {exc}")
+                else:
+                    if validate(text):
+                        _record_fallback(chain, model, agent)
+                        return text
+                    last_error = LLMGatewayError(f"Model {model} returned an invalid response.")
+                    print(f"  ⚠️ {last_error}")
+                if next_index < len(chain):
+                    launch()
+    finally:
+        # Threads cannot be interrupted; losers that already started finish and are ignored.
+        for future in pending:
+            future.cancel()
+
+    raise LLMGatewayError("All models in fallback chain failed.") from last_error
+
+
+async def agenerate_with_fallback(
+    models: list[str],
+    contents: Any,
+    *,
+    agent: str = "default",
+    config: types.GenerateContentConfig | None = None,
+    hedge: bool = HEDGING_ENABLED,
+    validate: Callable[[str], bool] = _non_empty,
+) -> str:
+    """Asyncio counterpart of `generate_with_fallback`; losing requests are cancelled."""
+    chain = _dedupe_chain(models)
+    tracker = get_latency_tracker()
+    pending: dict[asyncio.Task, str] = {}
+    next_index = 0
+    launched_at = 0.0
+    last_error: Exception | None = None
+
+    def launch() -> None:
+        nonlocal next_index, launched_at
+        model = chain[next_index]
+        next_index += 1
+        launched_at = time.monotonic()
+        task = asyncio.create_task(agenerate_text(model, contents, agent=agent, config=config))
+        pending[task] = model
+
+    launch()
+    try:
+        while pending:
+            timeout = None
+            if hedge and next_index < len(chain):
+                delay = tracker.hedge_delay(chain[next_index - 1])
+                timeout = max(0.0, launched_at + delay - time.monotonic())
+
+            done, _ = await asyncio.wait(
+                pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                print(f"  ⏱️ {chain[next_index - 1]} slow, hedging with {chain[next_index]}")
+                launch()
+                continue
+
+            for task in done:
+                model = pending.pop(task)
+                try:
+                    text = task.result()
+                except Exception as exc:
+                    last_error = exc
+                    print(f"  ⚠️ Model {model} failed: {exc}")
+                else:
+                    if validate(text):
+                        _record_fallback(chain, model, agent)
+                        return text
+                    last_error = LLMGatewayError(f"Model {model} returned an invalid response.")
+                    print(f"  ⚠️ {last_error}")
+                if next_index < len(chain):
+                    launch()
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    raise LLMGatewayError("All models in fallback chain failed.") from last_error
+
+
+def parse_json_response(text: str) -> Any:
+    """Decode the JSON payload of a response, tolerating fences, prose and truncation."""
+    return extract_json(text)
+
+
+def structured_config(
+    schema: Any, config: types.GenerateContentConfig | None = None
+) -> types.GenerateContentConfig:
+    """Copy of `config` that asks the model for JSON matching `schema`."""
+    json_schema = TypeAdapter(schema).json_schema(by_alias=True)
+    base = config.model_copy() if config is not None else types.GenerateContentConfig()
+    base.response_mime_type = "application/json"
+    base.response_json_schema = json_schema
+    return base
+
+
+def parse_structured(text: str, schema: Any) -> Any:
+    """
+    Validate a response against `schema` and return it as plain JSON data.
+
+    Raises:
+        StructuredOutputError: if no JSON can be recovered or it fails validation
+    """
+    adapter = TypeAdapter(schema)
+    try:
+        value = adapter.validate_python(extract_json(text))
+    except (ValueError, ValidationError) as exc:
+        raise StructuredOutputError(str(exc), raw_response=text) from exc
+    return adapter.dump_python(value, mode="json", by_alias=True)
+
+
+def _forget_response(model: str, contents: Any, config: types.GenerateContentConfig) -> None:
+    cache = _response_cache()
+    if cache is not None:
+        cache.delete(make_cache_key(model, contents, config))
+
+
+def generate_structured(
+    model: str,
+    contents: Any,
+    schema: Any,
+    *,
+    agent: str = "default",
+    config: types.GenerateContentConfig | None = None,
+) -> Any:
+    """
+    Schema-constrained generation, validated against a Pydantic type.
+
+    Args:
+        model: Gemini model id
+        contents: Prompt string or SDK contents
+        schema: Pydantic model (or e.g. `list[Model]`) the response must match
+        agent: Name of the calling agent (selects the cache TTL)
+        config: Optional generation config to extend
+
+    Returns:
+        The validated response as dicts/lists keyed by the schema's aliases
+    """
+    config = structured_config(schema, config)
+    text = generate_text(model, contents, agent=agent, config=config)
+    try:
+        return parse_structured(text, schema)
+    except StructuredOutputError:
+        _forget_response(model, contents, config)
+        raise
+
+
+async def agenerate_structured(
+    model: str,
+    contents: Any,
+    schema: Any,
+    *,
+    agent: str = "default",
+    config: types.GenerateContentConfig | None = None,
+) -> Any:
+    """Asyncio counterpart of `generate_structured`."""
+    config = structured_config(schema, config)
+    text = await agenerate_text(model, contents, agent=agent, config=config)
+    try:
+        return parse_structured(text, schema)
+    except StructuredOutputError:
+        _forget_response(model, contents, config)
+        raise
+
+
+def _validate_item(adapter: TypeAdapter, value: Any, raw_response: str) -> Any:
+    try:
+        return adapter.dump_python(adapter.validate_python(value), mode="json", by_alias=True)
+    except ValidationError as exc:
+        raise StructuredOutputError(str(exc), raw_response=raw_response) from exc
+
+
+async def astream_structured(
+    model: str,
+    contents: Any,
+    item_schema: Any,
+    *,
+    agent: str = "default",
+    config: types.GenerateContentConfig | None = None,
+) -> AsyncIterator[Any]:
+    """
+    Stream a JSON array of `item_schema` and yield each item as soon as it closes.
+
+    Items are validated one by one as the incremental parser completes them. If
+    the stream ends without a closed array (truncated or wrapped output), the
+    full text goes through `parse_structured` and the remaining items follow.
+
+    Raises:
+        StructuredOutputError: if an item fails validation or no array can be recovered
+    """
+    config = structured_config(list[item_schema], config)
+    adapter = TypeAdapter(item_schema)
+    parser = IncrementalJSONParser()
+    yielded = 0
+    try:
+        async for chunk in astream_text(model, contents, agent=agent, config=config):
+            for value in parser.feed(chunk):
+                item = _validate_item(adapter, value, parser.text)
+                yielded += 1
+                yield item
+        if not parser.complete:
+            for item in parse_structured(parser.text, list[item_schema])[yielded:]:
+                yield item
+    except StructuredOutputError:
+        _forget_response(model, contents, config)
+        raise
@@ -0,0 +1,309 @@
+"""
+LLM Scheduler
+Purpose: Admit every LLM request through one process-wide quota with pipeline priorities.
+
+The rate limiter paces requests per model, but on its own it serves whoever asks
+first: a bulk content run can fill the Gemini quota while a recruiting pipeline
+waits behind it. Every gateway call is therefore admitted here first.
+
+Quota model: at most `LLM_MAX_IN_FLIGHT` requests are admitted at once (0 turns
+admission off). Admitted requests still draw from the RPM/TPM buckets in
+`rate_limiter`, so both limits hold.
+
+Priority classes (`DEFAULT_CLASSES`, overridable via `LLM_PRIORITY_CLASSES`):
+
+- `weight`: share of admissions under contention. Free slots go to the waiting
+  class with the lowest virtual time (weighted fair queuing), so recruiting gets
+  8 of every 15 slots against content and bulk but nobody is starved.
+- `share`: fraction of the quota a class may hold at once. Lower classes leave
+  headroom, so a recruiting request is admitted at once even while content is
+  backed up.
+
+A call's class comes from `llm_priority(...)` if set, else from its metrics
+pipeline label (`PIPELINE_PRIORITIES`). Inside a class, requests queue per flow
+(the `llm_flow` name, e.g. an orchestrator run id, plus the calling agent) and
+flows take turns, so one agent's burst does not delay another agent's first call.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterator
+
+try:
+    from agents.deadlines import check_cancelled
+    from agents.metrics import current_pipeline, get_metrics
+except ImportError:  # pragma: no cover - supports direct script execution.
+    from deadlines import check_cancelled  # type: ignore
+    from metrics import current_pipeline, get_metrics  # type: ignore
+
+DEFAULT_MAX_IN_FLIGHT = 16
+
+
+@dataclass(frozen=True)
+class PriorityClass:
+    name: str
+    weight: float
+    share: float = 1.0
+
+
+DEFAULT_CLASSES = {
+    "recruiting": PriorityClass("recruiting", weight=8),
+    "dashboard": PriorityClass("dashboard", weight=4),
+    "content": PriorityClass("content", weight=2, share=0.75),
+    "bulk": PriorityClass("bulk", weight=1, share=0.5),  # Backfills and re-scoring runs
+}
+PIPELINE_PRIORITIES = {
+    "recruiting": "recruiting",
+    "dashboard": "dashboard",
+    "signals": "dashboard",  # The shared signal scan feeds the dashboard
+    "content": "content",
+}
+DEFAULT_PRIORITY = "content"
+
+_priority: contextvars.ContextVar[str | None] = contextvars.ContextVar("llm_priority", default=None)
+_flow: contextvars.ContextVar[str] = contextvars.ContextVar("llm_flow", default="")
+
+
+@contextmanager
+def llm_priority(name: str | None) -> Iterator[None]:
+    """Admit every LLM call inside the block (and tasks it spawns) in class `name`."""
+    token = _priority.set(name)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+@contextmanager
+def llm_flow(name: str) -> Iterator[None]:
+    """Queue LLM calls inside the block as flow `name` within their class."""
+    token = _flow.set(name)
+    try:
+        yield
+    finally:
+        _flow.reset(token)
+
+
+def current_priority() -> str:
+    return _priority.get() or PIPELINE_PRIORITIES.get(current_pipeline(), DEFAULT_PRIORITY)
+
+
+class _Waiter:
+    """One queued request: woken through an Event (threads) or a Future (asyncio)."""
+
+    __slots__ = ("priority", "flow", "queued_at", "granted", "event", "loop", "future")
+
+    def __init__(self, priority: str, flow: str, future: asyncio.Future | None = None):
+        self.priority = priority
+        self.flow = flow
+        self.queued_at = time.monotonic()
+        self.granted = False
+        self.future = future
+        self.loop = future.get_loop() if future is not None else None
+        self.event = threading.Event() if future is None else None
+
+    def grant(self) -> None:
+        self.granted = True
+        if self.future is None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self) -> None:
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+class _ClassQueue:
+    def __init__(self, spec: PriorityClass, capacity: int):
+        self.spec = spec
+        self.limit = max(1, int(spec.share * capacity))
+        self.flows: OrderedDict[str, deque[_Waiter]] = OrderedDict()
+        self.waiting = 0
+        self.in_flight = 0
+        self.vtime = 0.0
+
+    def push(self, waiter: _Waiter) -> None:
+        self.flows.setdefault(waiter.flow, deque()).append(waiter)
+        self.waiting += 1
+
+    def pop(self) -> _Waiter:
+        # Round robin: the flow that was just served goes to the back.
+        flow, queue = next(iter(self.flows.items()))
+        waiter = queue.popleft()
+        del self.flows[flow]
+        if queue:
+            self.flows[flow] = queue
+        self.waiting -= 1
+        return waiter
+
+    def remove(self, waiter: _Waiter) -> None:
+        queue = self.flows.get(waiter.flow)
+        if queue is not None and waiter in queue:
+            queue.remove(waiter)
+            if not queue:
+                del self.flows[waiter.flow]
+            self.waiting -= 1
+
+
+class AdmissionScheduler:
+    """Weighted fair admission of LLM requests to a shared in-flight quota."""
+
+    def __init__(
+        self,
+        capacity: int = DEFAULT_MAX_IN_FLIGHT,
+        classes: dict[str, PriorityClass] | None = None,
+    ):
+        self.capacity = capacity
+        self._classes = {
+            name: _ClassQueue(spec, capacity)
+            for name, spec in (DEFAULT_CLASSES if classes is None else classes).items()
+        }
+        self._in_flight = 0
+        self._vclock = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def _queue(self, priority: str) -> _ClassQueue:
+        queue = self._classes.get(priority) or self._classes.get(DEFAULT_PRIORITY)
+        if queue is None:
+            raise ValueError(f"Unknown priority class {priority!r}")
+        return queue
+
+    def _enqueue(self, waiter: _Waiter) -> None:
+        queue = self._queue(waiter.priority)
+        if not queue.waiting:
+            # A class that was idle does not bank credit for the time it had no work.
+            queue.vtime = max(queue.vtime, self._vclock)
+        queue.push(waiter)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self._in_flight < self.capacity:
+            ready = [q for q in self._classes.values() if q.waiting and q.in_flight < q.limit]
+            if not ready:
+                break
+            queue = min(ready, key=lambda q: (q.vtime, -q.spec.weight))
+            waiter = queue.pop()
+            self._vclock = queue.vtime
+            queue.vtime += 1.0 / queue.spec.weight
+            queue.in_flight += 1
+            self._in_flight += 1
+            waiter.grant()
+            get_metrics().observe(
+                "llm_admission_wait_seconds",
+                time.monotonic() - waiter.queued_at,
+                priority=queue.spec.name,
+            )
+        self._publish()
+
+    def _publish(self) -> None:
+        metrics = get_metrics()
+        for queue in self._classes.values():
+            labels = {"priority": queue.spec.name}
+            metrics.set_gauge("llm_admission_queue_depth", queue.waiting, **labels)
+            metrics.set_gauge("llm_admission_in_flight", queue.in_flight, **labels)
+
+    def _release(self, waiter: _Waiter) -> None:
+        with self._lock:
+            self._queue(waiter.priority).in_flight -= 1
+            self._in_flight -= 1
+            self._dispatch()
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        """Drop a waiter whose caller gave up; give its slot back if it was granted meanwhile."""
+        with self._lock:
+            if not waiter.granted:
+                self._queue(waiter.priority).remove(waiter)
+                self._publish()
+                return
+        self._release(waiter)
+
+    def _waiter(self, priority: str | None, flow: str, future=None) -> _Waiter:
+        return _Waiter(priority or current_priority(), f"{_flow.get()}/{flow}", future)
+
+    @contextmanager
+    def admit(self, flow: str = "", priority: str | None = None) -> Iterator[None]:
+        """Hold one admission slot for the block (blocking; for worker threads)."""
+        if not self.enabled:
+            yield
+            return
+        waiter = self._waiter(priority, flow)
+        with self._lock:
+            self._enqueue(waiter)
+        try:
+            while not waiter.event.wait(0.1):
+                check_cancelled()
+        except BaseException:
+            self._abandon(waiter)
+            raise
+        try:
+            yield
+        finally:
+            self._release(waiter)
+
+    @asynccontextmanager
+    async def aadmit(self, flow: str = "", priority: str | None = None) -> AsyncIterator[None]:
+        """Asyncio counterpart of `admit`."""
+        if not self.enabled:
+            yield
+            return
+        future = asyncio.get_running_loop().create_future()
+        waiter = self._waiter(priority, flow, future)
+        with self._lock:
+            self._enqueue(waiter)
+        try:
+            await future
+        except BaseException:
+            self._abandon(waiter)
+            raise
+        try:
+            yield
+        finally:
+            self._release(waiter)
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        with self._lock:
+            return {
+                name: {"waiting": queue.waiting, "in_flight": queue.in_flight}
+                for name, queue in self._classes.items()
+            }
+
+
+def _load_classes() -> dict[str, PriorityClass]:
+    classes = dict(DEFAULT_CLASSES)
+    raw = os.getenv("LLM_PRIORITY_CLASSES")
+    if raw:
+        for name, spec in json.loads(raw).items():
+            classes[name] = PriorityClass(
+                name, weight=float(spec["weight"]), share=float(spec.get("share", 1.0))
+            )
+    return classes
+
+
+_scheduler: AdmissionScheduler | None = None
+_scheduler_lock = threading.Lock()
+
+
+def get_llm_scheduler() -> AdmissionScheduler:
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = AdmissionScheduler(
+                    int(os.getenv("LLM_MAX_IN_FLIGHT", str(DEFAULT_MAX_IN_FLIGHT))),
+                    _load_classes(),
+                )
+    return _scheduler
@@ -0,0 +1,271 @@
+"""
+Metrics
+Purpose: Process-wide registry of counters and latency histograms for LLM and search calls.
+
+The gateways record every call labeled by agent and pipeline: latency, prompt and
+completion tokens, rate-limit retries, cache hits and misses, errors, and which
+model of a fallback chain actually answered. The pipeline label comes from
+`pipeline_context`, which the orchestrator sets around each pipeline; it follows
+the call through asyncio tasks, `asyncio.to_thread` and the `executors` pools via
+contextvars.
+
+Export with `to_prometheus()` (Prometheus text exposition format) or
+`snapshot()` / `write_metrics()` (JSON).
+"""
+
+from __future__ import annotations
+
+import contextvars
+import functools
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+HELP = {
+    "llm_request_duration_seconds": "Wall time of LLM network calls.",
+    "llm_requests_total": "LLM requests by outcome (ok, error, cache_hit).",
+    "llm_prompt_tokens_total": "Prompt tokens reported by the API.",
+    "llm_completion_tokens_total": "Completion tokens reported by the API.",
+    "llm_retries_total": "LLM calls retried after a 429.",
+    "llm_fallback_total": "Fallback-chain answers by serving model and position.",
+    "search_request_duration_seconds": "Wall time of search provider calls.",
+    "search_requests_total": "Search requests by outcome (ok, error).",
+    "search_retries_total": "Search calls retried after a rate limit.",
+    "pipeline_duration_seconds": "Wall time of whole orchestrator pipeline runs.",
+    "dag_node_duration_seconds": "Wall time of orchestrator DAG nodes.",
+    "stage_duration_seconds": "Wall time of per-item agent steps (Agent B for one candidate).",
+    "executor_queue_depth": "Blocking calls waiting for a worker, per executor.",
+    "executor_active": "Blocking calls currently running, per executor.",
+    "executor_queue_wait_seconds": "Time blocking calls waited for an executor worker.",
+    "llm_admission_queue_depth": "LLM requests waiting for admission, per priority class.",
+    "llm_admission_in_flight": "LLM requests admitted and not yet finished, per priority class.",
+    "llm_admission_wait_seconds": "Time LLM requests waited for admission, per priority class.",
+    "prescreen_total": "Recruiting pre-screen verdicts by step and decision.",
+}
+
+_pipeline: contextvars.ContextVar[str] = contextvars.ContextVar("pipeline", default="none")
+
+LabelKey = tuple[tuple[str, str], ...]
+
+
+def current_pipeline() -> str:
+    return _pipeline.get()
+
+
+@contextmanager
+def pipeline_context(name: str) -> Iterator[None]:
+    """Label every call made inside the block (and tasks it spawns) with `pipeline=name`."""
+    token = _pipeline.set(name)
+    try:
+        yield
+    finally:
+        _pipeline.reset(token)
+
+
+def _label_key(labels: dict[str, str], pipeline: bool = True) -> LabelKey:
+    if pipeline:
+        labels.setdefault("pipeline", current_pipeline())
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _render_labels(key: LabelKey, extra: tuple[tuple[str, str], ...] = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class _Histogram:
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the q-th quantile (q in 0..1); max if it overflows."""
+        if not self.count:
+            return None
+        rank = math.ceil(q * self.count)
+        running = 0
+        for index, count in enumerate(self.counts):
+            running += count
+            if running >= rank:
+                return self.buckets[index] if index < len(self.buckets) else self.max
+        return self.max
+
+
+class MetricsRegistry:
+    """Thread-safe labeled counters, gauges and histograms."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._counters: dict[str, dict[LabelKey, float]] = {}
+        self._gauges: dict[str, dict[LabelKey, float]] = {}
+        self._histograms: dict[str, dict[LabelKey, _Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, amount: float = 1.0, **labels: str) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + amount
+
+    def set_gauge(self, name: str, value: float, **labels: str) -> None:
+        """Set a point-in-time value. Gauges describe the process, so no pipeline label."""
+        key = _label_key(labels, pipeline=False)
+        with self._lock:
+            self._gauges.setdefault(name, {})[key] = value
+
+    def gauge_value(self, name: str, **labels: str) -> float | None:
+        key = _label_key(labels, pipeline=False)
+        with self._lock:
+            return self._gauges.get(name, {}).get(key)
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(self.buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(name, time.monotonic() - started, **labels)
+
+    def counter_value(self, name: str, **labels: str) -> float:
+        """Sum of every series of `name` whose labels include `labels`."""
+        wanted = {(key, str(value)) for key, value in labels.items()}
+        with self._lock:
+            return sum(
+                value for key, value in self._counters.get(name, {}).items() if wanted <= set(key)
+            )
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = {
+                name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                for name, series in self._counters.items()
+            }
+            gauges = {
+                name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                for name, series in self._gauges.items()
+            }
+            histograms = {
+                name: [
+                    {
+                        "labels": dict(key),
+                        "count": histogram.count,
+                        "sum": round(histogram.sum, 6),
+                        "p50": histogram.quantile(0.5),
+                        "p95": histogram.quantile(0.95),
+                    }
+                    for key, histogram in series.items()
+                ]
+                for name, series in self._histograms.items()
+            }
+        return {"counters": counters, "gauges": gauges, "histograms": histograms}
+
+    def to_prometheus(self) -> str:
+        lines: list[str] = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# HELP {name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{_render_labels(key)} {value:g}")
+            for name, series in sorted(self._gauges.items()):
+                lines.append(f"# HELP {name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} gauge")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{_render_labels(key)} {value:g}")
+            for name, histograms in sorted(self._histograms.items()):
+                lines.append(f"# HELP {name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, histogram in sorted(histograms.items(), key=lambda item: item[0]):
+                    running = 0
+                    bounds = [f"{bound:g}" for bound in histogram.buckets] + ["+Inf"]
+                    for bound, count in zip(bounds, histogram.counts, strict=True):
+                        running += count
+                        labels = _render_labels(key, (("le", bound),))
+                        lines.append(f"{name}_bucket{labels} {running}")
+                    lines.append(f"{name}_sum{_render_labels(key)} {histogram.sum:g}")
+                    lines.append(f"{name}_count{_render_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+_registry = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    return _registry
+
+
+def write_metrics(directory: str = ".", prefix: str = "orchestrator_metrics") -> tuple[str, str]:
+    """
+    Write `<prefix>.json` and `<prefix>.prom` into `directory`.
+
+    Returns:
+        The (json_path, prometheus_path) that were written
+    """
+    registry = get_metrics()
+    json_path = os.path.join(directory, f"{prefix}.json")
+    prom_path = os.path.join(directory, f"{prefix}.prom")
+    with open(json_path, "w", encoding="utf-8") as handle:
+        json.dump(registry.snapshot(), handle, indent=2, default=str)
+    with open(prom_path, "w", encoding="utf-8") as handle:
+        handle.write(registry.to_prometheus())
+    return json_path, prom_path
+
+
+def instrument_pipeline(name: str) -> Callable[[F], F]:
+    """Decorator for async pipeline methods: sets `pipeline_context(name)` and times the run."""
+
+    def decorator(fn: F) -> F:
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with (
+                pipeline_context(name),
+                get_metrics().timer("pipeline_duration_seconds"),
+            ):
+                return await fn(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
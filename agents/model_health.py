@@ -0,0 +1,291 @@
+"""
+Model Health
+Purpose: Skip dead models immediately instead of paying a round trip to rediscover them.
+
+Two pieces:
+- `ModelCatalog`: the model list from `client.models.list()`, cached on disk and
+  refreshed once it is older than its TTL. Models missing from the catalog are
+  treated as unavailable without a request.
+- `CircuitBreaker`: per-model closed / open / half-open state persisted in SQLite,
+  so every process (orchestrator runs, agent.py, reply_agent.py) shares what the
+  others already learned. A model opens after N consecutive failures, stays open
+  for a cooldown, then lets a single half-open probe through.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Iterable
+
+import httpx
+
+DEFAULT_HEALTH_PATH = os.path.join(".cache", "model_health.sqlite3")
+DEFAULT_CATALOG_PATH = os.path.join(".cache", "model_catalog.json")
+
+FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "3"))
+COOLDOWN_SECONDS = float(os.getenv("CIRCUIT_COOLDOWN_SECONDS", "300"))
+MAX_COOLDOWN_SECONDS = float(os.getenv("CIRCUIT_MAX_COOLDOWN_SECONDS", "3600"))
+PROBE_TIMEOUT_SECONDS = 60.0
+CATALOG_TTL_SECONDS = float(os.getenv("MODEL_CATALOG_TTL_SECONDS", str(24 * 3600)))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS breakers (
+    model TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    failures INTEGER NOT NULL,
+    cooldown REAL NOT NULL,
+    open_until REAL NOT NULL,
+    probe_until REAL NOT NULL,
+    last_error TEXT,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+def normalize_model_name(name: str) -> str:
+    return name.split("/", 1)[1] if name.startswith("models/") else name
+
+
+def is_model_failure(exc: BaseException) -> bool:
+    """
+    Whether an error says something about the model rather than the request.
+
+    404 (unknown model), 5xx and transport errors (including HTTP-layer timeouts)
+    count; 429 is the rate limiter's job and other 4xx responses are caused by the
+    prompt, not the model. Errors raised locally (our own deadlines, cancellation,
+    parsing) never count.
+    """
+    code = getattr(exc, "code", None)
+    if isinstance(code, int):
+        return code == 404 or code >= 500
+    return isinstance(exc, (httpx.TransportError, ConnectionError))
+
+
+class ModelCatalog:
+    """Disk-cached set of model ids the API currently serves."""
+
+    def __init__(self, path: str = DEFAULT_CATALOG_PATH, ttl: float = CATALOG_TTL_SECONDS):
+        self.path = path
+        self.ttl = ttl
+        self._models: dict[str, dict] | None = None
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, encoding="utf-8") as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            return
+        self._models = data.get("models")
+        self._fetched_at = data.get("fetched_at", 0.0)
+
+    def is_stale(self) -> bool:
+        return self._models is None or time.time() - self._fetched_at > self.ttl
+
+    def refresh(self, list_models: Callable[[], Iterable]) -> None:
+        """Replace the catalog with the result of `client.models.list()`."""
+        models = {}
+        for model in list_models():
+            models[normalize_model_name(model.name)] = {
+                "display_name": getattr(model, "display_name", None),
+                "input_token_limit": getattr(model, "input_token_limit", None),
+                "output_token_limit": getattr(model, "output_token_limit", None),
+            }
+        with self._lock:
+            self._models = models
+            self._fetched_at = time.time()
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as handle:
+                json.dump({"fetched_at": self._fetched_at, "models": models}, handle, indent=2)
+
+    def is_known(self, model: str) -> bool | None:
+        """True/False when the catalog is loaded, None when it has never been fetched."""
+        if self._models is None:
+            return None
+        return normalize_model_name(model) in self._models
+
+    def input_token_limit(self, model: str) -> int | None:
+        if self._models is None:
+            return None
+        return (self._models.get(normalize_model_name(model)) or {}).get("input_token_limit")
+
+    def names(self) -> list[str]:
+        return sorted(self._models or {})
+
+
+class CircuitBreaker:
+    """Per-model circuit breaker whose state lives in a shared SQLite file."""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_HEALTH_PATH,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        cooldown: float = COOLDOWN_SECONDS,
+        max_cooldown: float = MAX_COOLDOWN_SECONDS,
+    ):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, timeout=30, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def _row(self, model: str) -> dict:
+        row = self._conn.execute(
+            "SELECT state, failures, cooldown, open_until, probe_until FROM breakers "
+            "WHERE model = ?",
+            (model,),
+        ).fetchone()
+        if row is None:
+            return {
+                "state": CLOSED,
+                "failures": 0,
+                "cooldown": self.cooldown,
+                "open_until": 0.0,
+                "probe_until": 0.0,
+            }
+        state, failures, cooldown, open_until, probe_until = row
+        return {
+            "state": state,
+            "failures": failures,
+            "cooldown": cooldown,
+            "open_until": open_until,
+            "probe_until": probe_until,
+        }
+
+    def _save(self, model: str, row: dict, last_error: str | None = None) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO breakers "
+            "(model, state, failures, cooldown, open_until, probe_until, last_error, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                model,
+                row["state"],
+                row["failures"],
+                row["cooldown"],
+                row["open_until"],
+                row["probe_until"],
+                last_error,
+                time.time(),
+            ),
+        )
+
+    def allow(self, model: str) -> bool:
+        """Whether a request to `model` may go out now (claims the probe when half-open)."""
+        now = time.time()
+        with self._lock:
+            if self._row(model)["state"] == CLOSED:
+                return True  # Fast path: no write transaction for healthy models
+
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._row(model)
+                if row["state"] == CLOSED:
+                    allowed = True
+                elif row["state"] == OPEN and now < row["open_until"]:
+                    allowed = False
+                elif row["probe_until"] > now:
+                    allowed = False  # Another caller is already probing
+                else:
+                    row["state"] = HALF_OPEN
+                    row["probe_until"] = now + PROBE_TIMEOUT_SECONDS
+                    self._save(model, row)
+                    allowed = True
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return allowed
+
+    def record_success(self, model: str) -> None:
+        with self._lock:
+            row = self._row(model)
+            if row["state"] == CLOSED and row["failures"] == 0:
+                return
+            self._save(
+                model,
+                {
+                    "state": CLOSED,
+                    "failures": 0,
+                    "cooldown": self.cooldown,
+                    "open_until": 0.0,
+                    "probe_until": 0.0,
+                },
+            )
+
+    def record_failure(self, model: str, error: BaseException | str | None = None) -> None:
+        now = time.time()
+        with self._lock:
+            row = self._row(model)
+            row["failures"] += 1
+            if row["state"] == HALF_OPEN:
+                # Failed probe: back off harder before the next one.
+                row["cooldown"] = min(row["cooldown"] * 2, self.max_cooldown)
+                row["state"] = OPEN
+            elif row["failures"] >= self.failure_threshold:
+                row["state"] = OPEN
+            if row["state"] == OPEN:
+                row["open_until"] = now + row["cooldown"]
+                row["probe_until"] = 0.0
+            self._save(model, row, last_error=str(error) if error else None)
+
+    def state(self, model: str) -> str:
+        with self._lock:
+            return self._row(model)["state"]
+
+    def snapshot(self) -> dict[str, dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT model, state, failures, open_until, last_error FROM breakers"
+            ).fetchall()
+        return {
+            model: {
+                "state": state,
+                "failures": failures,
+                "open_until": open_until,
+                "last_error": last_error,
+            }
+            for model, state, failures, open_until, last_error in rows
+        }
+
+
+_catalog: ModelCatalog | None = None
+_breaker: CircuitBreaker | None = None
+_init_lock = threading.Lock()
+
+
+def get_model_catalog() -> ModelCatalog:
+    global _catalog
+    if _catalog is None:
+        with _init_lock:
+            if _catalog is None:
+                _catalog = ModelCatalog(os.getenv("MODEL_CATALOG_PATH", DEFAULT_CATALOG_PATH))
+    return _catalog
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    global _breaker
+    if _breaker is None:
+        with _init_lock:
+            if _breaker is None:
+                _breaker = CircuitBreaker(os.getenv("MODEL_HEALTH_PATH", DEFAULT_HEALTH_PATH))
+    return _breaker
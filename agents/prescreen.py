@@ -0,0 +1,195 @@
+"""
+Pre-screen
+Purpose: Decide obvious recruiting cases with the deterministic scorers before any LLM stage.
+
+Two cheap checks wrap the manual scorers that Agents A and B already ship:
+
+- `screen_profile` runs `score_candidate_manual` on a structured profile (title,
+  firm, years in role, deals). A score above Agent A's threshold is final; the
+  rest are sent to Agent A's model, unless rejection is opted into with
+  `frustration_reject_at`.
+- `screen_revenue` bounds a scored candidate's portable revenue. With structured
+  `clients` it uses `estimate_portable_revenue_manual`. Otherwise it reads the
+  gross book from `Estimated_Book_of_Business` and assumes everything is
+  institutional (lowest portability) or everything is relationship (highest).
+  A candidate whose whole range is clearly below €200k is dropped, one whose
+  whole range is clearly above is accepted without calling Agent B, and
+  everything in between goes to Agent B's model as before.
+
+"Clearly" is the `margin` around each threshold. Defaults are in
+`DEFAULT_PRESCREEN`; override them with a JSON mapping in `PRESCREEN`, e.g.
+`{"revenue_margin": 0.5}`, or set `{"enabled": false}` to send every candidate
+to the LLM stages.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+from dataclasses import dataclass
+
+try:
+    from agents.agent_a_glass_ceiling_scout import score_candidate_manual
+    from agents.agent_b_rainmaker_profiler import (
+        INSTITUTIONAL_DISCOUNT,
+        MIN_PORTABLE_REVENUE,
+        RELATIONSHIP_DISCOUNT,
+        estimate_portable_revenue_manual,
+    )
+    from agents.metrics import get_metrics
+except ImportError:  # pragma: no cover - supports direct script execution.
+    from agent_a_glass_ceiling_scout import score_candidate_manual  # type: ignore
+    from agent_b_rainmaker_profiler import (  # type: ignore
+        INSTITUTIONAL_DISCOUNT,
+        MIN_PORTABLE_REVENUE,
+        RELATIONSHIP_DISCOUNT,
+        estimate_portable_revenue_manual,
+    )
+    from metrics import get_metrics  # type: ignore
+
+ACCEPT = "accept"
+REJECT = "reject"
+UNCERTAIN = "uncertain"
+
+FRUSTRATION_THRESHOLD = 70  # Agent A's cut-off: candidates must score above it
+
+DEFAULT_PRESCREEN = {
+    "enabled": True,
+    # score_candidate_manual only sees hard evidence, so its scores are lower bounds
+    # on what the model finds: a 0 often means "no evidence in the profile", not "not
+    # frustrated". Set a score to drop profiles at or below it without a model call.
+    "frustration_reject_at": None,
+    "revenue_margin": 0.25,  # Accept above threshold × 1.25, reject below threshold × 0.75
+}
+
+
+def _load_config() -> dict:
+    config = dict(DEFAULT_PRESCREEN)
+    raw = os.getenv("PRESCREEN")
+    if raw:
+        config.update(json.loads(raw))
+    return config
+
+
+_config = _load_config()
+
+
+def prescreen_enabled() -> bool:
+    return bool(_config["enabled"])
+
+
+@dataclass
+class Screen:
+    """A pre-screen verdict; `result` is the deterministic output for decided cases."""
+
+    decision: str
+    reason: str
+    result: dict | None = None
+
+
+def _record(step: str, screen: Screen) -> Screen:
+    get_metrics().inc("prescreen_total", step=step, decision=screen.decision)
+    return screen
+
+
+def screen_profile(profile: dict) -> Screen:
+    """
+    Score a structured profile without the model.
+
+    Returns:
+        accept with Agent A's candidate dict when the manual score already clears
+        the threshold, reject at or below `frustration_reject_at` (when set), else
+        uncertain
+    """
+    scored = score_candidate_manual(profile)
+    if profile.get("clients"):
+        scored["clients"] = profile["clients"]  # Lets `screen_revenue` use the exact estimate
+    score = scored["Frustration_Score"]
+    if score > FRUSTRATION_THRESHOLD:
+        return _record("agent_a", Screen(ACCEPT, f"manual score {score}", scored))
+    reject_at = _config["frustration_reject_at"]
+    if reject_at is not None and score <= reject_at:
+        return _record("agent_a", Screen(REJECT, f"manual score {score}", scored))
+    return _record("agent_a", Screen(UNCERTAIN, f"manual score {score}", scored))
+
+
+_AMOUNT = re.compile(r"(\d+(?:\.\d+)?)\s*(k|m|mn|mio|million|millionen)?\b", re.IGNORECASE)
+_SCALE = {"k": 1e3, "m": 1e6, "mn": 1e6, "mio": 1e6, "million": 1e6, "millionen": 1e6}
+MIN_BOOK_AMOUNT = 1_000  # Smaller numbers are counts or labels, not a book of business
+
+
+def parse_book(value) -> tuple[float, float] | None:
+    """
+    Gross book range from Agent A's `Estimated_Book_of_Business`, or None if it has no amount.
+
+    Accepts numbers and strings like "€450k", "EUR 1.2M", "€300k-500k", "2 Mio" or
+    German notation ("€0,8 Mio", "1.200.000 €").
+    A suffix on the last amount applies to bare ones before it ("300-500k"). Stray
+    numbers only widen the range, which sends the candidate to the model; amounts
+    under `MIN_BOOK_AMOUNT` are ignored.
+    """
+    if isinstance(value, (int, float)):
+        return (float(value), float(value)) if value > 0 else None
+    if not isinstance(value, str):
+        return None
+    text = re.sub(r"(?<=\d),(?=\d{1,2}\b)", ".", value)  # German decimal comma: "0,8 Mio"
+    text = re.sub(r"(?<=\d)[,.](?=\d{3}\b)", "", text)  # Thousands separators
+    matches = _AMOUNT.findall(text)
+    suffix = next((s for _, s in reversed(matches) if s), "")
+    amounts = [float(number) * _SCALE.get((s or suffix).lower(), 1.0) for number, s in matches]
+    amounts = [amount for amount in amounts if amount >= MIN_BOOK_AMOUNT]
+    if not amounts:
+        return None
+    return min(amounts), max(amounts)
+
+
+def _revenue_analysis(candidate: dict, gross: float, portable: float, reasoning: str) -> dict:
+    return {
+        "candidate_name": candidate.get("Name", "Unknown"),
+        "clients": [],
+        "total_gross_revenue": gross,
+        "total_portable_revenue": portable,
+        "recommendation": "GO" if portable >= MIN_PORTABLE_REVENUE else "NO GO",
+        "reasoning": reasoning,
+    }
+
+
+def screen_revenue(candidate: dict) -> Screen:
+    """
+    Bound a scored candidate's portable revenue without the model.
+
+    Returns:
+        accept with a revenue analysis in Agent B's format, reject, or uncertain
+    """
+    margin = _config["revenue_margin"]
+    accept_at = MIN_PORTABLE_REVENUE * (1 + margin)
+    reject_below = MIN_PORTABLE_REVENUE * (1 - margin)
+
+    clients = candidate.get("clients")
+    if clients:
+        analysis = estimate_portable_revenue_manual([dict(c) for c in clients])
+        portable = analysis["total_portable_revenue"]
+        analysis["candidate_name"] = candidate.get("Name", "Unknown")
+        low = high = portable
+    else:
+        book = parse_book(candidate.get("Estimated_Book_of_Business"))
+        if book is None:
+            return _record("agent_b", Screen(UNCERTAIN, "no book estimate"))
+        gross_low, gross_high = book
+        low = gross_low * (1 - INSTITUTIONAL_DISCOUNT)
+        high = gross_high * (1 - RELATIONSHIP_DISCOUNT)
+        analysis = _revenue_analysis(
+            candidate,
+            gross_low,
+            low,
+            f"Pre-screen: a gross book of at least €{gross_low:,.0f} is worth €{low:,.0f} "
+            "portable even if every client is institutional.",
+        )
+
+    reason = f"portable €{low:,.0f}–€{high:,.0f}"
+    if low >= accept_at:
+        return _record("agent_b", Screen(ACCEPT, reason, analysis))
+    if high < reject_below:
+        return _record("agent_b", Screen(REJECT, reason))
+    return _record("agent_b", Screen(UNCERTAIN, reason))
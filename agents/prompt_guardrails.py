@@ -1,10 +1,24 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+import math
 import re
-from typing import Callable
+import threading
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Union
 
 SPEAKER_PATTERN = re.compile(r"^\s*[A-Za-zÄÖÜäöüß][^:\n]{0,80}:\s*")
+WORD_PATTERN = re.compile(r"[^\W\d_]+|\d+|[^\w\s]", re.UNICODE)
+GERMAN_MARKERS = re.compile(r"[äöüßÄÖÜ]|\b(?:und|der|die|das|nicht|mit|ist)\b")
+
+# Average characters per token for word pieces, measured against the Gemini
+# tokenizer on sample transcripts. German compounds split into more pieces.
+CHARS_PER_TOKEN = {"EN": 4.2, "DE": 3.4}
+DEFAULT_INPUT_TOKEN_LIMIT = 32_768
+OUTPUT_TOKEN_RESERVE = 8_192
+PROMPT_TEMPLATE_RESERVE_TOKENS = 1_500
+
+TextMeasure = Callable[[str], int]
 
 
 @dataclass(frozen=True)
@@ -13,6 +27,124 @@ class PromptBudget:
     raw_chunk_size_chars: int = 3_000
     reduction_batch_size_chars: int = 6_000
 
+    unit = "chars"
+    evidence_margin = 200
+
+    @property
+    def input_budget(self) -> int:
+        return self.input_budget_chars
+
+    @property
+    def raw_chunk_size(self) -> int:
+        return self.raw_chunk_size_chars
+
+    @property
+    def reduction_batch_size(self) -> int:
+        return self.reduction_batch_size_chars
+
+    def measure(self, text: str) -> int:
+        return len(text)
+
+
+class TokenEstimator:
+    """Local token counter: word pieces scaled by a per-language calibration factor."""
+
+    def __init__(self, chars_per_token: dict[str, float] | None = None):
+        self.chars_per_token = dict(CHARS_PER_TOKEN if chars_per_token is None else chars_per_token)
+        self._scale = {language: 1.0 for language in self.chars_per_token}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def detect_language(text: str) -> str:
+        sample = text[:4_000]
+        return "DE" if len(GERMAN_MARKERS.findall(sample)) >= 3 else "EN"
+
+    def count(self, text: str, language: str | None = None) -> int:
+        language = language or self.detect_language(text)
+        chars_per_token = self.chars_per_token.get(language, self.chars_per_token["EN"])
+        raw = _raw_token_count(text, chars_per_token)
+        return math.ceil(raw * self._scale.get(language, 1.0))
+
+    def calibrate(self, text: str, actual_tokens: int, language: str | None = None) -> None:
+        """Blend a real token count (e.g. from `count_tokens`) into the language's scale."""
+        language = language or self.detect_language(text)
+        chars_per_token = self.chars_per_token.get(language, self.chars_per_token["EN"])
+        raw = _raw_token_count(text, chars_per_token)
+        if raw <= 0 or actual_tokens <= 0:
+            return
+        with self._lock:
+            current = self._scale.get(language, 1.0)
+            self._scale[language] = 0.8 * current + 0.2 * (actual_tokens / raw)
+
+
+@lru_cache(maxsize=4_096)
+def _raw_token_count(text: str, chars_per_token: float) -> int:
+    total = 0
+    for piece in WORD_PATTERN.findall(text):
+        if piece[0].isalpha():
+            total += max(1, math.ceil(len(piece) / chars_per_token))
+        elif piece.isdigit():
+            total += math.ceil(len(piece) / 3)
+        else:
+            total += 1
+    return total
+
+
+_estimator = TokenEstimator()
+
+
+def get_token_estimator() -> TokenEstimator:
+    return _estimator
+
+
+@dataclass(frozen=True)
+class TokenBudget:
+    input_budget_tokens: int = DEFAULT_INPUT_TOKEN_LIMIT - OUTPUT_TOKEN_RESERVE
+    raw_chunk_size_tokens: int = (
+        DEFAULT_INPUT_TOKEN_LIMIT - OUTPUT_TOKEN_RESERVE - PROMPT_TEMPLATE_RESERVE_TOKENS
+    )
+    reduction_batch_size_tokens: int = (
+        DEFAULT_INPUT_TOKEN_LIMIT - OUTPUT_TOKEN_RESERVE - PROMPT_TEMPLATE_RESERVE_TOKENS
+    )
+    estimator: TokenEstimator = field(default_factory=get_token_estimator, compare=False)
+
+    unit = "tokens"
+    evidence_margin = 64
+
+    @classmethod
+    def for_context_window(
+        cls,
+        input_token_limit: int | None,
+        output_reserve: int = OUTPUT_TOKEN_RESERVE,
+    ) -> TokenBudget:
+        """Budget that fills a model's input window, minus room for the answer and template."""
+        limit = input_token_limit or DEFAULT_INPUT_TOKEN_LIMIT
+        input_budget = max(limit - output_reserve, 2 * PROMPT_TEMPLATE_RESERVE_TOKENS)
+        payload_budget = input_budget - PROMPT_TEMPLATE_RESERVE_TOKENS
+        return cls(
+            input_budget_tokens=input_budget,
+            raw_chunk_size_tokens=payload_budget,
+            reduction_batch_size_tokens=payload_budget,
+        )
+
+    @property
+    def input_budget(self) -> int:
+        return self.input_budget_tokens
+
+    @property
+    def raw_chunk_size(self) -> int:
+        return self.raw_chunk_size_tokens
+
+    @property
+    def reduction_batch_size(self) -> int:
+        return self.reduction_batch_size_tokens
+
+    def measure(self, text: str) -> int:
+        return self.estimator.count(text)
+
+
+Budget = Union[PromptBudget, TokenBudget]
+
 
 @dataclass(frozen=True)
 class TranscriptChunk:
@@ -99,32 +231,48 @@ def hard_wrap_text(text: str, max_chars: int) -> list[str]:
     return [piece for piece in wrapped if piece]
 
 
-def chunk_transcript(transcript: str, max_chars: int) -> list[TranscriptChunk]:
+def wrap_to_size(text: str, max_size: int, measure: TextMeasure = len) -> list[str]:
+    size = measure(text)
+    if size <= max_size:
+        return hard_wrap_text(text, max(len(text), 1))
+
+    max_chars = max(1, len(text) * max_size // size)
+    while True:
+        pieces = hard_wrap_text(text, max_chars)
+        if max_chars == 1 or all(measure(piece) <= max_size for piece in pieces):
+            return pieces
+        max_chars = max(1, int(max_chars * 0.9))
+
+
+def chunk_transcript(
+    transcript: str, max_size: int, measure: TextMeasure = len
+) -> list[TranscriptChunk]:
     raw_blocks = split_transcript_blocks(transcript)
     if not raw_blocks:
         return []
 
     blocks: list[str] = []
     for block in raw_blocks:
-        if len(block) <= max_chars:
+        if measure(block) <= max_size:
             blocks.append(block)
             continue
-        blocks.extend(hard_wrap_text(block, max_chars))
+        blocks.extend(wrap_to_size(block, max_size, measure))
 
     chunk_texts: list[str] = []
     current_blocks: list[str] = []
     current_len = 0
 
     for block in blocks:
-        separator_len = 2 if current_blocks else 0
-        if current_blocks and current_len + separator_len + len(block) > max_chars:
+        block_len = measure(block)
+        separator_len = measure("\n\n") if current_blocks else 0
+        if current_blocks and current_len + separator_len + block_len > max_size:
             chunk_texts.append("\n\n".join(current_blocks).strip())
             current_blocks = [block]
-            current_len = len(block)
+            current_len = block_len
             continue
 
         current_blocks.append(block)
-        current_len += separator_len + len(block)
+        current_len += separator_len + block_len
 
     if current_blocks:
         chunk_texts.append("\n\n".join(current_blocks).strip())
@@ -168,11 +316,13 @@ def render_summary_payloads(payloads: list[SummaryPayload]) -> str:
     return "\n\n".join(rendered).strip()
 
 
-def normalize_payload_sizes(payloads: list[SummaryPayload], max_chars: int) -> list[SummaryPayload]:
+def normalize_payload_sizes(
+    payloads: list[SummaryPayload], max_size: int, measure: TextMeasure = len
+) -> list[SummaryPayload]:
     normalized: list[SummaryPayload] = []
     next_index = 1
     for payload in payloads:
-        if payload.char_count <= max_chars:
+        if measure(payload.text) <= max_size:
             normalized.append(
                 SummaryPayload(
                     index=next_index,
@@ -185,7 +335,7 @@ def normalize_payload_sizes(payloads: list[SummaryPayload], max_chars: int) -> l
             next_index += 1
             continue
 
-        for piece in hard_wrap_text(payload.text, max_chars):
+        for piece in wrap_to_size(payload.text, max_size, measure):
             normalized.append(
                 SummaryPayload(
                     index=next_index,
@@ -199,16 +349,18 @@ def normalize_payload_sizes(payloads: list[SummaryPayload], max_chars: int) -> l
     return normalized
 
 
-def group_summary_payloads(payloads: list[SummaryPayload], max_chars: int) -> list[list[SummaryPayload]]:
-    normalized = normalize_payload_sizes(payloads, max_chars)
+def group_summary_payloads(
+    payloads: list[SummaryPayload], max_size: int, measure: TextMeasure = len
+) -> list[list[SummaryPayload]]:
+    normalized = normalize_payload_sizes(payloads, max_size, measure)
     groups: list[list[SummaryPayload]] = []
     current_group: list[SummaryPayload] = []
     current_len = 0
 
     for payload in normalized:
-        payload_len = len(render_summary_payloads([payload]))
-        separator_len = 2 if current_group else 0
-        if current_group and current_len + separator_len + payload_len > max_chars:
+        payload_len = measure(render_summary_payloads([payload]))
+        separator_len = measure("\n\n") if current_group else 0
+        if current_group and current_len + separator_len + payload_len > max_size:
             groups.append(current_group)
             current_group = [payload]
             current_len = payload_len
@@ -226,15 +378,16 @@ def group_summary_payloads(payloads: list[SummaryPayload], max_chars: int) -> li
 def reduce_summary_payloads(
     payloads: list[SummaryPayload],
     reducer: SummaryReducer,
-    max_chars: int,
+    max_size: int,
+    measure: TextMeasure = len,
 ) -> list[SummaryPayload]:
     current = payloads[:]
     while True:
         rendered = render_summary_payloads(current)
-        if rendered and len(rendered) <= max_chars:
+        if rendered and measure(rendered) <= max_size:
             return current
 
-        groups = group_summary_payloads(current, max_chars)
+        groups = group_summary_payloads(current, max_size, measure)
         if len(groups) == 1 and len(current) == 1:
             return current
 
@@ -258,13 +411,14 @@ def reduce_summary_payloads(
 
 def build_hierarchical_summary(
     transcript: str,
-    budgets: PromptBudget,
+    budgets: Budget,
     summarize_chunk: ChunkSummarizer,
     reducer: SummaryReducer,
     target_chars: int | None = None,
 ) -> tuple[list[TranscriptChunk], list[SummaryPayload], str]:
-    chunks = chunk_transcript(transcript, budgets.raw_chunk_size_chars)
+    # target_chars is expressed in the budget's unit (characters or tokens).
+    chunks = chunk_transcript(transcript, budgets.raw_chunk_size, budgets.measure)
     payloads = summarize_chunks(chunks, summarize_chunk)
-    max_chars = target_chars or budgets.reduction_batch_size_chars
-    reduced_payloads = reduce_summary_payloads(payloads, reducer, max_chars)
+    max_size = target_chars or budgets.reduction_batch_size
+    reduced_payloads = reduce_summary_payloads(payloads, reducer, max_size, budgets.measure)
     return chunks, reduced_payloads, render_summary_payloads(reduced_payloads)
@@ -0,0 +1,236 @@
+"""
+Rate Limiter
+Purpose: Process-wide token buckets per model and per search provider.
+
+Every LLM and search call acquires from its bucket before going out, so all
+threads and coroutines together run at the configured quota and only wait when
+the bucket is empty. A 429 response blocks the bucket for the server's
+Retry-After delay and the call is retried once the block expires.
+
+Limits are configured in requests (RPM) and tokens (TPM) per minute. Override the
+defaults with a JSON mapping in `RATE_LIMITS`, e.g.
+`{"gemini-3-pro": {"rpm": 150, "tpm": 2000000}, "ddgs": {"rpm": 30}}`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, TypeVar
+
+try:
+    from agents.deadlines import check_cancelled
+except ImportError:  # pragma: no cover - supports direct script execution.
+    from deadlines import check_cancelled  # type: ignore
+
+T = TypeVar("T")
+
+MAX_RATE_LIMIT_RETRIES = int(os.getenv("RATE_LIMIT_MAX_RETRIES", "3"))
+DEFAULT_RETRY_AFTER_SECONDS = 10.0
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    rpm: float
+    tpm: float | None = None
+
+
+DEFAULT_LIMITS = {
+    "llm:default": RateLimit(rpm=60, tpm=1_000_000),
+    "search:default": RateLimit(rpm=30),
+}
+
+
+class TokenBucket:
+    """Thread-safe bucket that hands out reservations instead of blocking under the lock."""
+
+    def __init__(self, rate_per_second: float, capacity: float):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1.0) -> float:
+        """Take `amount` tokens now and return how long the caller must wait before using them."""
+        amount = min(amount, self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+class Limiter:
+    """RPM and optional TPM buckets for one model or provider, plus a Retry-After block."""
+
+    def __init__(self, key: str, limit: RateLimit):
+        self.key = key
+        self.limit = limit
+        self._requests = TokenBucket(limit.rpm / 60.0, max(1.0, limit.rpm))
+        self._tokens = TokenBucket(limit.tpm / 60.0, limit.tpm) if limit.tpm else None
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: int = 0) -> float:
+        wait = self._requests.reserve(1)
+        if self._tokens is not None and tokens > 0:
+            wait = max(wait, self._tokens.reserve(tokens))
+        with self._lock:
+            blocked_for = self._blocked_until - time.monotonic()
+        return max(wait, blocked_for, 0.0)
+
+    def acquire(self, tokens: int = 0) -> None:
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def aacquire(self, tokens: int = 0) -> None:
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def penalize(self, seconds: float) -> None:
+        """Block every caller of this bucket until the server's Retry-After has passed."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+
+def _load_limits() -> dict[str, RateLimit]:
+    limits = dict(DEFAULT_LIMITS)
+    raw = os.getenv("RATE_LIMITS")
+    if raw:
+        for name, spec in json.loads(raw).items():
+            prefix = "search" if name in ("ddgs", "brave") else "llm"
+            key = name if ":" in name else f"{prefix}:{name}"
+            limits[key] = RateLimit(rpm=float(spec["rpm"]), tpm=spec.get("tpm"))
+    return limits
+
+
+class RateLimiter:
+    """Registry of limiters keyed by `llm:<model>` or `search:<provider>`."""
+
+    def __init__(self, limits: dict[str, RateLimit] | None = None):
+        self.limits = dict(DEFAULT_LIMITS if limits is None else limits)
+        self._limiters: dict[str, Limiter] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key: str, default_key: str) -> Limiter:
+        with self._lock:
+            limiter = self._limiters.get(key)
+            if limiter is None:
+                limit = self.limits.get(key) or self.limits[default_key]
+                limiter = Limiter(key, limit)
+                self._limiters[key] = limiter
+            return limiter
+
+    def for_model(self, model: str) -> Limiter:
+        return self._get(f"llm:{model}", "llm:default")
+
+    def for_provider(self, provider: str) -> Limiter:
+        return self._get(f"search:{provider}", "search:default")
+
+
+_limiter: RateLimiter | None = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RateLimiter(_load_limits())
+    return _limiter
+
+
+def estimate_tokens(contents: Any) -> int:
+    """Cheap prompt-size estimate (~4 characters per token) for TPM accounting."""
+    return max(1, len(str(contents)) // 4)
+
+
+_RETRY_DELAY_PATTERN = re.compile(r"'retryDelay':\s*'(\d+(?:\.\d+)?)s'")
+
+
+def retry_after_seconds(exc: BaseException) -> float | None:
+    """
+    Return the back-off a rate-limit error asks for, or None if `exc` is not a 429.
+
+    Checks the HTTP Retry-After header first, then Gemini's RetryInfo detail.
+    """
+    code = getattr(exc, "code", None)
+    if code != 429 and type(exc).__name__ != "RatelimitException":
+        return None
+
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    header = headers.get("retry-after") or headers.get("Retry-After")
+    if header:
+        try:
+            return float(header)
+        except ValueError:
+            pass
+
+    match = _RETRY_DELAY_PATTERN.search(str(getattr(exc, "details", "")))
+    if match:
+        return float(match.group(1))
+    return DEFAULT_RETRY_AFTER_SECONDS
+
+
+def call_with_rate_limit(
+    limiter: Limiter,
+    fn: Callable[[], T],
+    tokens: int = 0,
+    on_retry: Callable[[float], None] | None = None,
+) -> T:
+    """
+    Acquire from `limiter`, run `fn`, and retry after Retry-After on 429s.
+
+    `on_retry` is called with the delay before each retry (used for metrics).
+    In a worker thread, a call whose deadline passed while it waited for the
+    limiter raises `DeadlineExceeded` instead of going out.
+    """
+    for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+        limiter.acquire(tokens)
+        check_cancelled()
+        try:
+            return fn()
+        except Exception as exc:
+            delay = retry_after_seconds(exc)
+            if delay is None or attempt == MAX_RATE_LIMIT_RETRIES:
+                raise
+            print(f"  ⏳ {limiter.key} rate limited, retrying in {delay:.0f}s")
+            if on_retry is not None:
+                on_retry(delay)
+            limiter.penalize(delay)
+    raise AssertionError("unreachable")
+
+
+async def acall_with_rate_limit(
+    limiter: Limiter,
+    fn: Callable[[], Awaitable[T]],
+    tokens: int = 0,
+    on_retry: Callable[[float], None] | None = None,
+) -> T:
+    """Asyncio counterpart of `call_with_rate_limit`."""
+    for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+        await limiter.aacquire(tokens)
+        try:
+            return await fn()
+        except Exception as exc:
+            delay = retry_after_seconds(exc)
+            if delay is None or attempt == MAX_RATE_LIMIT_RETRIES:
+                raise
+            print(f"  ⏳ {limiter.key} rate limited, retrying in {delay:.0f}s")
+            if on_retry is not None:
+                on_retry(delay)
+            limiter.penalize(delay)
+    raise AssertionError("unreachable")
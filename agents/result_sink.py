@@ -0,0 +1,187 @@
+"""
+Result Sink
+Purpose: Stream orchestrator results to an append-only JSONL file as they complete.
+
+Each finished candidate, signal, post and risk alert is written as one JSON line
+(`{"ts", "run_id", "kind", "key", "data"}`) the moment it completes. Nothing
+accumulates in memory, and dashboards or the newsletter step can tail the file
+while a run is still going. Lines are flushed on every write; the file is
+fsynced every `RESULTS_FSYNC_EVERY` records or `RESULTS_FSYNC_INTERVAL` seconds,
+whichever comes first, and on `close()`.
+
+`compact_view()` (or `python -m agents.result_sink --run RUN_ID`) builds the
+per-run summary on demand, keeping the latest record per (kind, key), so a resumed
+run that re-emits completed items is not double counted.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import threading
+import time
+from typing import Any, Iterable, Iterator, TextIO
+
+DEFAULT_RESULTS_PATH = "orchestrator_results.jsonl"
+DEFAULT_FSYNC_EVERY = 50
+DEFAULT_FSYNC_INTERVAL = 1.0
+
+
+class ResultSink:
+    """Thread-safe JSONL appender with periodic fsync."""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_RESULTS_PATH,
+        fsync_every: int = DEFAULT_FSYNC_EVERY,
+        fsync_interval: float = DEFAULT_FSYNC_INTERVAL,
+    ):
+        self.path = path
+        self.fsync_every = max(1, fsync_every)
+        self.fsync_interval = fsync_interval
+        self._lock = threading.Lock()
+        self._handle: TextIO | None = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def write(self, kind: str, key: str, data: Any, run_id: str | None = None) -> None:
+        line = json.dumps(
+            {"ts": time.time(), "run_id": run_id, "kind": kind, "key": key, "data": data},
+            ensure_ascii=False,
+            default=str,
+        )
+        with self._lock:
+            if self._handle is None:
+                # Opened on first write, so constructing a sink never touches disk.
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._handle = open(self.path, "a", encoding="utf-8")
+            self._handle.write(line + "\n")
+            self._handle.flush()
+            self._unsynced += 1
+            if (
+                self._unsynced >= self.fsync_every
+                or time.monotonic() - self._last_sync >= self.fsync_interval
+            ):
+                self._sync()
+
+    def _sync(self) -> None:
+        os.fsync(self._handle.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def flush(self) -> None:
+        """Force everything written so far to disk."""
+        with self._lock:
+            if self._handle is not None and self._unsynced:
+                self._sync()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._handle is not None:
+                if self._unsynced:
+                    self._sync()
+                self._handle.close()
+                self._handle = None
+
+
+class NullSink(ResultSink):
+    """Discards records: for shard workers, whose results the coordinator streams."""
+
+    def __init__(self):
+        super().__init__(os.devnull)
+
+    def write(self, kind: str, key: str, data: Any, run_id: str | None = None) -> None:
+        pass
+
+
+def read_results(
+    path: str = DEFAULT_RESULTS_PATH,
+    run_id: str | None = None,
+    kinds: Iterable[str] | None = None,
+) -> Iterator[dict]:
+    """
+    Records in file order, optionally filtered by run id and kind.
+
+    A partial last line (a run still writing, or one that crashed mid-write) is skipped.
+    """
+    wanted = set(kinds) if kinds is not None else None
+    if not os.path.exists(path):
+        return
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if run_id is not None and record.get("run_id") != run_id:
+                continue
+            if wanted is not None and record.get("kind") not in wanted:
+                continue
+            yield record
+
+
+def latest_run_id(path: str = DEFAULT_RESULTS_PATH) -> str | None:
+    run_id = None
+    for record in read_results(path):
+        run_id = record.get("run_id") or run_id
+    return run_id
+
+
+def compact_view(path: str = DEFAULT_RESULTS_PATH, run_id: str | None = None) -> dict:
+    """
+    Per-run view: counts and items per kind, latest record per (kind, key).
+
+    Defaults to the most recent run in the file.
+    """
+    run_id = run_id or latest_run_id(path)
+    latest: dict[tuple[str, str], Any] = {}
+    for record in read_results(path, run_id=run_id):
+        latest[(record["kind"], record["key"])] = record["data"]
+
+    items: dict[str, list] = {}
+    for (kind, _), data in latest.items():
+        items.setdefault(kind, []).append(data)
+    return {
+        "run_id": run_id,
+        "counts": {kind: len(values) for kind, values in items.items()},
+        "items": items,
+    }
+
+
+_sink: ResultSink | None = None
+_sink_lock = threading.Lock()
+
+
+def get_result_sink() -> ResultSink:
+    """Process-wide sink configured from the environment."""
+    global _sink
+    if _sink is None:
+        with _sink_lock:
+            if _sink is None:
+                _sink = ResultSink(
+                    os.getenv("RESULTS_PATH", DEFAULT_RESULTS_PATH),
+                    fsync_every=int(os.getenv("RESULTS_FSYNC_EVERY", DEFAULT_FSYNC_EVERY)),
+                    fsync_interval=float(
+                        os.getenv("RESULTS_FSYNC_INTERVAL", DEFAULT_FSYNC_INTERVAL)
+                    ),
+                )
+    return _sink
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compact view of streamed orchestrator results.")
+    parser.add_argument("--path", default=os.getenv("RESULTS_PATH", DEFAULT_RESULTS_PATH))
+    parser.add_argument("--run", metavar="RUN_ID", help="Defaults to the most recent run")
+    parser.add_argument("--out", help="Write the view to this file instead of stdout")
+    args = parser.parse_args()
+
+    view = json.dumps(compact_view(args.path, args.run), indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(view)
+        print(f"💾 View of run {args.run or 'latest'} saved to {args.out}")
+    else:
+        print(view)
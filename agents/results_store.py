@@ -0,0 +1,134 @@
+"""
+Results Store
+Purpose: Keep large batch results out of memory: summaries in RAM, full payloads on disk.
+
+Every stored result is JSON-encoded, zlib-compressed and appended to one segment
+file per run. Memory holds only an offset index entry and a few summary fields
+per result. A `StoredResult` reads its payload back from the segment on access
+(`payload()`, or item access like `result["candidate"]`), so report code that
+only needs names and totals never loads the multi-kilobyte dossiers at all.
+
+The segment is scratch space (the streamed JSONL results are the durable record):
+it lives in `RESULTS_SPILL_DIR` and is deleted by `close()`.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import zlib
+from collections.abc import Mapping
+from typing import Any, BinaryIO, Callable, Iterator
+
+DEFAULT_SPILL_DIR = os.path.join(".cache", "results")
+
+
+class StoredResult(Mapping):
+    """Index entry of one spilled result; behaves like the (lazily loaded) payload dict."""
+
+    __slots__ = ("store", "kind", "key", "summary", "offset", "length")
+
+    def __init__(
+        self, store: ResultsStore, kind: str, key: str, summary: dict, offset: int, length: int
+    ):
+        self.store = store
+        self.kind = kind
+        self.key = key
+        self.summary = summary
+        self.offset = offset
+        self.length = length
+
+    def payload(self) -> Any:
+        return self.store.load(self)
+
+    def __getitem__(self, name: str) -> Any:
+        return self.payload()[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.payload())
+
+    def __len__(self) -> int:
+        return len(self.payload())
+
+    def __repr__(self) -> str:
+        return f"StoredResult({self.kind!r}, {self.key!r}, {self.summary!r})"
+
+
+class ResultsStore:
+    """Append-only compressed segment file plus an in-memory offset index."""
+
+    def __init__(self, path: str, level: int = 6):
+        self.path = path
+        self.level = level
+        self._lock = threading.Lock()
+        self._handle: BinaryIO | None = None
+        self._size = 0
+        self._index: dict[str, list[StoredResult]] = {}
+
+    def add(
+        self,
+        kind: str,
+        key: str,
+        payload: Any,
+        summarize: Callable[[Any], dict] | None = None,
+    ) -> StoredResult:
+        """Spill `payload` to disk and return its index entry (holding `summarize(payload)`)."""
+        blob = zlib.compress(
+            json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8"), self.level
+        )
+        summary = summarize(payload) if summarize else {}
+        with self._lock:
+            if self._handle is None:
+                # Created on first add; a fresh run (or a resumed one) starts an empty segment.
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._handle = open(self.path, "w+b")
+            self._handle.seek(0, os.SEEK_END)
+            self._handle.write(blob)
+            ref = StoredResult(self, kind, key, summary, self._size, len(blob))
+            self._size += len(blob)
+            self._index.setdefault(kind, []).append(ref)
+        return ref
+
+    def load(self, ref: StoredResult) -> Any:
+        with self._lock:
+            if self._handle is None:
+                raise ValueError(f"Results store {self.path} is closed.")
+            self._handle.flush()
+            self._handle.seek(ref.offset)
+            blob = self._handle.read(ref.length)
+        return json.loads(zlib.decompress(blob))
+
+    def refs(self, kind: str) -> list[StoredResult]:
+        return list(self._index.get(kind, ()))
+
+    def summaries(self, kind: str) -> list[dict]:
+        return [ref.summary for ref in self._index.get(kind, ())]
+
+    def count(self, kind: str) -> int:
+        return len(self._index.get(kind, ()))
+
+    def iter_payloads(self, kind: str) -> Iterator[Any]:
+        """Payloads of `kind` in insertion order, one at a time."""
+        for ref in self.refs(kind):
+            yield ref.payload()
+
+    @property
+    def disk_bytes(self) -> int:
+        return self._size
+
+    def close(self) -> None:
+        """Drop the index and delete the segment file."""
+        with self._lock:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+                os.remove(self.path)
+            self._index.clear()
+            self._size = 0
+
+
+def spill_path(run_id: str) -> str:
+    return os.path.join(os.getenv("RESULTS_SPILL_DIR", DEFAULT_SPILL_DIR), f"{run_id}.seg")
@@ -0,0 +1,207 @@
+"""
+Search Gateway
+Purpose: Shared entry point for DuckDuckGo (DDGS) news and text searches.
+
+Scanners call `search_news` / `search_text` (or their async variants) instead of
+opening their own `DDGS()` session, so identical queries issued concurrently by
+different pipelines are collapsed into one request by `single_flight`. Requests
+that do go out are paced by the shared "ddgs" bucket in `rate_limiter` and
+recorded in `metrics` under the calling agent. The active `backends` mode decides
+whether a search really goes to DDGS, is recorded, replayed or synthesized.
+
+Every request also passes its provider's politeness gate: at most `concurrency`
+requests in flight, and starts at least `min_interval` seconds apart, however
+many scanners fan out at once. Defaults are in `DEFAULT_POLITENESS`; override
+them with a JSON mapping in `SEARCH_POLITENESS`, e.g.
+`{"ddgs": {"concurrency": 2, "min_interval": 1.0}}`.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import TypedDict
+
+from ddgs import DDGS
+
+try:
+    from agents.backends import get_backend
+    from agents.deadlines import check_cancelled, remaining
+    from agents.executors import run_in
+    from agents.metrics import get_metrics
+    from agents.rate_limiter import call_with_rate_limit, get_rate_limiter
+    from agents.single_flight import get_single_flight
+except ImportError:  # pragma: no cover - supports direct script execution.
+    from backends import get_backend  # type: ignore
+    from deadlines import check_cancelled, remaining  # type: ignore
+    from executors import run_in  # type: ignore
+    from metrics import get_metrics  # type: ignore
+    from rate_limiter import call_with_rate_limit, get_rate_limiter  # type: ignore
+    from single_flight import get_single_flight  # type: ignore
+
+PROVIDER = "ddgs"
+SEARCH_TIMEOUT = float(os.getenv("SEARCH_TIMEOUT", "10"))
+
+
+@dataclass(frozen=True)
+class PolitenessPolicy:
+    concurrency: int  # Requests in flight at once
+    min_interval: float  # Seconds between request starts
+
+
+DEFAULT_POLITENESS = {
+    "ddgs": PolitenessPolicy(concurrency=4, min_interval=0.25),
+}
+FALLBACK_POLITENESS = PolitenessPolicy(concurrency=2, min_interval=1.0)
+
+
+class PolitenessGate:
+    """Bounds one provider's concurrent requests and spaces out their starts."""
+
+    def __init__(self, provider: str, policy: PolitenessPolicy):
+        self.provider = provider
+        self.policy = policy
+        self._slots = threading.BoundedSemaphore(max(1, policy.concurrency))
+        self._next_start = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Claim the next start time and return how long to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.policy.min_interval
+        return start - now
+
+    def __enter__(self) -> PolitenessGate:
+        started = time.monotonic()
+        while not self._slots.acquire(timeout=0.1):
+            check_cancelled()  # Give up the wait once the caller's deadline has passed
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        get_metrics().observe(
+            "search_politeness_wait_seconds", time.monotonic() - started, provider=self.provider
+        )
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._slots.release()
+
+
+def _load_politeness() -> dict[str, PolitenessPolicy]:
+    policies = dict(DEFAULT_POLITENESS)
+    raw = os.getenv("SEARCH_POLITENESS")
+    if raw:
+        for provider, spec in json.loads(raw).items():
+            base = policies.get(provider, FALLBACK_POLITENESS)
+            policies[provider] = PolitenessPolicy(
+                concurrency=int(spec.get("concurrency", base.concurrency)),
+                min_interval=float(spec.get("min_interval", base.min_interval)),
+            )
+    return policies
+
+
+_policies = _load_politeness()
+_gates: dict[str, PolitenessGate] = {}
+_gates_lock = threading.Lock()
+
+
+def politeness_gate(provider: str) -> PolitenessGate:
+    """Process-wide gate shared by every caller of `provider`."""
+    with _gates_lock:
+        gate = _gates.get(provider)
+        if gate is None:
+            gate = PolitenessGate(provider, _policies.get(provider, FALLBACK_POLITENESS))
+            _gates[provider] = gate
+        return gate
+
+
+class _SearchLabels(TypedDict):
+    """Metric labels of one search; typed so they cannot fill `inc`'s amount."""
+
+    agent: str
+    provider: str
+    kind: str
+
+
+def _ddgs_call(kind: str, query: str, region: str, max_results: int) -> list[dict]:
+    # Per-request timeout, capped by what is left of the caller's deadline
+    left = remaining(SEARCH_TIMEOUT)
+    timeout = SEARCH_TIMEOUT if left is None else left
+    with DDGS(timeout=max(1, math.ceil(timeout))) as ddgs:
+        if kind == "news":
+            return list(ddgs.news(query, region=region, max_results=max_results) or [])
+        return list(ddgs.text(query, region=region, max_results=max_results) or [])
+
+
+def _run_search(kind: str, query: str, region: str, max_results: int, agent: str) -> list[dict]:
+    metrics = get_metrics()
+    labels: _SearchLabels = {"agent": agent, "provider": PROVIDER, "kind": kind}
+    check_cancelled()
+    started = time.monotonic()
+    try:
+        with politeness_gate(PROVIDER):
+            results = call_with_rate_limit(
+                get_rate_limiter().for_provider(PROVIDER),
+                lambda: get_backend().search(
+                    kind,
+                    query,
+                    region,
+                    max_results,
+                    lambda: _ddgs_call(kind, query, region, max_results),
+                ),
+                on_retry=lambda delay: metrics.inc("search_retries_total", **labels),
+            )
+    except Exception:
+        metrics.inc("search_requests_total", outcome="error", **labels)
+        raise
+    metrics.observe("search_request_duration_seconds", time.monotonic() - started, **labels)
+    metrics.inc("search_requests_total", outcome="ok", **labels)
+    return results
+
+
+def _search(kind: str, query: str, region: str, max_results: int, agent: str) -> list[dict]:
+    key = ("search", kind, query, region, max_results)
+    results = get_single_flight().do(
+        key, lambda: _run_search(kind, query, region, max_results, agent)
+    )
+    return list(results)
+
+
+async def _asearch(kind: str, query: str, region: str, max_results: int, agent: str) -> list[dict]:
+    key = ("search", kind, query, region, max_results)
+    results = await get_single_flight().ado(
+        key, lambda: run_in("web_io", _run_search, kind, query, region, max_results, agent)
+    )
+    return list(results)
+
+
+def search_news(
+    query: str, region: str = "de-de", max_results: int = 3, *, agent: str = "default"
+) -> list[dict]:
+    """DDGS news search (items carry title, body, url, date)."""
+    return _search("news", query, region, max_results, agent)
+
+
+def search_text(
+    query: str, region: str = "de-de", max_results: int = 3, *, agent: str = "default"
+) -> list[dict]:
+    """DDGS web search (items carry title, body, href)."""
+    return _search("text", query, region, max_results, agent)
+
+
+async def asearch_news(
+    query: str, region: str = "de-de", max_results: int = 3, *, agent: str = "default"
+) -> list[dict]:
+    return await _asearch("news", query, region, max_results, agent)
+
+
+async def asearch_text(
+    query: str, region: str = "de-de", max_results: int = 3, *, agent: str = "default"
+) -> list[dict]:
+    return await _asearch("text", query, region, max_results, agent)
@@ -0,0 +1,469 @@
+"""
+Sharding
+Purpose: Spread a run's per-item work across worker processes and hosts through a broker.
+
+The coordinator (an ordinary `GunnercookeOrchestrator` with a `ShardDispatcher`)
+still runs Agent A, Agent E, the ledger and the pre-screen itself. It publishes
+each remaining work item to the broker instead of running it in-process:
+
+- `candidate`: Agents B → C → D for one scored candidate
+- `post`: Agent F for one signal
+
+An item goes to shard `shard_of(key, shards)`, a stable hash of its candidate or
+signal key, so the same entity always lands on the same shard (and the same
+worker's warm caches) across runs. Workers (`orchestrator_shards.py worker`)
+claim the tasks of the shards they serve, run them with the coordinator's run id
+(so checkpoints resume across workers) and store the result in the broker. The
+coordinator's stage awaits each result and continues exactly as an in-process
+run would: results are spilled, streamed to its sink and summarized by one
+writer, so the run still produces one result set.
+
+A worker that dies holding a task loses its lease after `SHARD_LEASE` seconds
+and the task is queued again for any worker serving that shard. Run more than
+one worker per shard for failover.
+
+Brokers are chosen by `BROKER_URL`. The default `sqlite:///.cache/broker.sqlite3`
+needs no service: processes on one host (or hosts sharing the file system)
+coordinate through the file, with claims inside `BEGIN IMMEDIATE`, as in the job
+queue. Register other transports with `register_broker(scheme, factory)`.
+Sharding is off unless `SHARDS` is set above 0.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterable, Mapping
+from urllib.parse import urlsplit
+
+try:
+    from agents.metrics import get_metrics
+except ImportError:  # pragma: no cover - supports direct script execution.
+    from metrics import get_metrics  # type: ignore
+
+DEFAULT_BROKER_URL = "sqlite:///" + os.path.join(".cache", "broker.sqlite3")
+DEFAULT_LEASE_SECONDS = 600.0
+DEFAULT_WORKER_CONCURRENCY = 8  # Tasks one worker process runs at once
+POLL_INTERVAL = float(os.getenv("SHARD_POLL_INTERVAL", "0.2"))
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    batch TEXT NOT NULL,
+    shard INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    worker TEXT,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    claimed_at REAL
+);
+CREATE INDEX IF NOT EXISTS tasks_ready ON tasks (status, shard, id);
+"""
+
+_TASK_COLUMNS = "id, batch, shard, kind, key, payload, status, worker, result, error"
+
+
+def shard_of(key: str, shards: int) -> int:
+    """Stable shard for `key`: the same in every process, on every host, in every run."""
+    digest = hashlib.sha1(key.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % max(1, shards)
+
+
+class ShardTaskError(RuntimeError):
+    """A worker failed the task; the message is the worker's error."""
+
+
+@dataclass
+class Task:
+    id: int
+    batch: str  # The coordinator's run id
+    shard: int
+    kind: str
+    key: str
+    payload: Any
+    status: str
+    worker: str | None
+    result: Any
+    error: str | None
+
+    @classmethod
+    def from_row(cls, row: tuple) -> Task:
+        values = list(row)
+        values[5] = json.loads(values[5])
+        values[8] = json.loads(values[8]) if values[8] is not None else None
+        return cls(*values)
+
+
+# ── Brokers ─────────────────────────────────────────────────────────────
+
+
+class Broker:
+    """
+    Transport between a coordinator and its workers.
+
+    Coordinator side: `publish`, `collect`, `cancel`, `requeue_expired`.
+    Worker side: `claim`, `complete`, `fail`.
+    """
+
+    def publish(self, batch: str, shard: int, kind: str, key: str, payload: Any) -> int:
+        raise NotImplementedError
+
+    def claim(self, worker: str, shards: Iterable[int], limit: int = 1) -> list[Task]:
+        """Take up to `limit` queued tasks of `shards`, oldest first."""
+        raise NotImplementedError
+
+    def complete(self, task_id: int, worker: str, result: Any) -> None:
+        """
+        Store `worker`'s result. Ignored once the task's lease expired and it was
+        queued again, so a slow worker cannot overwrite its successor's claim.
+        """
+        raise NotImplementedError
+
+    def fail(self, task_id: int, worker: str, error: str) -> None:
+        """Store `worker`'s error (ignored like `complete` for a lost claim)."""
+        raise NotImplementedError
+
+    def collect(self, task_ids: Iterable[int]) -> list[Task]:
+        """Finished tasks among `task_ids`; they are removed from the broker."""
+        raise NotImplementedError
+
+    def cancel(self, task_id: int) -> None:
+        """Drop a task whose result is no longer awaited."""
+        raise NotImplementedError
+
+    def requeue_expired(self, lease: float) -> int:
+        """Queue again tasks claimed more than `lease` seconds ago. Returns how many."""
+        raise NotImplementedError
+
+    def pending(self, shards: Iterable[int] | None = None) -> int:
+        """Tasks queued or running, optionally only of `shards`."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteBroker(Broker):
+    """Broker in a SQLite file, shared by every process that can open it."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, timeout=30, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    @classmethod
+    def from_url(cls, url: str) -> SQLiteBroker:
+        # sqlite:///relative/path or sqlite:////absolute/path
+        return cls(url.split("://", 1)[1][1:])
+
+    def publish(self, batch: str, shard: int, kind: str, key: str, payload: Any) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO tasks (batch, shard, kind, key, payload, status, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    batch,
+                    shard,
+                    kind,
+                    key,
+                    json.dumps(payload, ensure_ascii=False, default=str),
+                    QUEUED,
+                    time.time(),
+                ),
+            )
+        return cursor.lastrowid
+
+    def claim(self, worker: str, shards: Iterable[int], limit: int = 1) -> list[Task]:
+        shards = list(shards)
+        if not shards or limit < 1:
+            return []
+        marks = ", ".join("?" * len(shards))
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    f"SELECT {_TASK_COLUMNS} FROM tasks WHERE status = ? AND shard IN ({marks}) "
+                    "ORDER BY id LIMIT ?",
+                    (QUEUED, *shards, limit),
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE tasks SET status = ?, worker = ?, claimed_at = ? WHERE id = ?",
+                    [(RUNNING, worker, time.time(), row[0]) for row in rows],
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        tasks = [Task.from_row(row) for row in rows]
+        for task in tasks:
+            task.status, task.worker = RUNNING, worker
+        return tasks
+
+    def _finish(
+        self, task_id: int, worker: str, status: str, result: Any, error: str | None
+    ) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE tasks SET status = ?, result = ?, error = ? "
+                "WHERE id = ? AND worker = ? AND status = ?",
+                (
+                    status,
+                    json.dumps(result, ensure_ascii=False, default=str),
+                    error,
+                    task_id,
+                    worker,
+                    RUNNING,
+                ),
+            )
+
+    def complete(self, task_id: int, worker: str, result: Any) -> None:
+        self._finish(task_id, worker, DONE, result, None)
+
+    def fail(self, task_id: int, worker: str, error: str) -> None:
+        self._finish(task_id, worker, FAILED, None, error)
+
+    def collect(self, task_ids: Iterable[int]) -> list[Task]:
+        task_ids = list(task_ids)
+        finished: list[Task] = []
+        with self._lock:
+            for start in range(0, len(task_ids), 500):  # Stay under SQLite's parameter limit
+                chunk = task_ids[start : start + 500]
+                marks = ", ".join("?" * len(chunk))
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    rows = self._conn.execute(
+                        f"SELECT {_TASK_COLUMNS} FROM tasks "
+                        f"WHERE id IN ({marks}) AND status IN (?, ?)",
+                        (*chunk, DONE, FAILED),
+                    ).fetchall()
+                    self._conn.executemany(
+                        "DELETE FROM tasks WHERE id = ?", [(row[0],) for row in rows]
+                    )
+                    self._conn.execute("COMMIT")
+                except BaseException:
+                    self._conn.execute("ROLLBACK")
+                    raise
+                finished.extend(Task.from_row(row) for row in rows)
+        return finished
+
+    def cancel(self, task_id: int) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+
+    def requeue_expired(self, lease: float) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE tasks SET status = ?, worker = NULL, claimed_at = NULL "
+                "WHERE status = ? AND claimed_at < ?",
+                (QUEUED, RUNNING, time.time() - lease),
+            )
+        return cursor.rowcount
+
+    def pending(self, shards: Iterable[int] | None = None) -> int:
+        query = "SELECT COUNT(*) FROM tasks WHERE status IN (?, ?)"
+        args: tuple = (QUEUED, RUNNING)
+        if shards is not None:
+            shards = list(shards)
+            query += f" AND shard IN ({', '.join('?' * len(shards))})"
+            args += tuple(shards)
+        with self._lock:
+            return self._conn.execute(query, args).fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_BROKERS: dict[str, Callable[[str], Broker]] = {"sqlite": SQLiteBroker.from_url}
+
+
+def register_broker(scheme: str, factory: Callable[[str], Broker]) -> None:
+    """Make `BROKER_URL`s with `scheme` (e.g. "redis") open through `factory(url)`."""
+    _BROKERS[scheme] = factory
+
+
+def open_broker(url: str | None = None) -> Broker:
+    resolved = url or os.getenv("BROKER_URL") or DEFAULT_BROKER_URL
+    scheme = urlsplit(resolved).scheme
+    if scheme not in _BROKERS:
+        raise ValueError(f"No broker registered for {scheme!r} (BROKER_URL={resolved!r})")
+    return _BROKERS[scheme](resolved)
+
+
+# ── Coordinator side ────────────────────────────────────────────────────
+
+
+class ShardDispatcher:
+    """
+    Publishes a run's work items and awaits their results.
+
+    One poller task per event loop collects finished tasks for every waiting
+    item, so a thousand in-flight items cost one query per poll, not a thousand.
+    """
+
+    def __init__(
+        self,
+        broker: Broker,
+        shards: int,
+        worker_concurrency: int = DEFAULT_WORKER_CONCURRENCY,
+        lease: float = DEFAULT_LEASE_SECONDS,
+        poll_interval: float = POLL_INTERVAL,
+    ):
+        self.broker = broker
+        self.shards = max(1, shards)
+        self.worker_concurrency = max(1, worker_concurrency)
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self._waiting: dict[int, asyncio.Future] = {}
+        self._poller: asyncio.Task | None = None
+
+    @property
+    def capacity(self) -> int:
+        """Items the workers can run at once: the coordinator's stage limit for dispatch."""
+        return self.shards * self.worker_concurrency
+
+    async def submit(self, kind: str, key: str, payload: Any, run_id: str) -> Any:
+        """Run one item on its shard's worker and return the worker's result."""
+        loop = asyncio.get_running_loop()
+        shard = shard_of(key, self.shards)
+        task_id = self.broker.publish(run_id, shard, kind, key, payload)
+        get_metrics().inc("shard_tasks_published_total", kind=kind, shard=str(shard))
+        future = loop.create_future()
+        self._waiting[task_id] = future
+        if self._poller is None or self._poller.done():
+            self._poller = loop.create_task(self._poll(), name="shard-poller")
+        try:
+            return await future
+        except asyncio.CancelledError:
+            # Deadline or shutdown: nobody will read this result
+            self.broker.cancel(task_id)
+            raise
+        finally:
+            self._waiting.pop(task_id, None)
+
+    async def _poll(self) -> None:
+        while self._waiting:
+            await asyncio.sleep(self.poll_interval)
+            requeued = self.broker.requeue_expired(self.lease)
+            if requeued:
+                get_metrics().inc("shard_tasks_requeued_total", amount=requeued)
+            for task in self.broker.collect(list(self._waiting)):
+                future = self._waiting.get(task.id)
+                if future is None or future.done():
+                    continue
+                if task.status == DONE:
+                    future.set_result(task.result)
+                else:
+                    future.set_exception(ShardTaskError(f"{task.kind} {task.key}: {task.error}"))
+
+
+_dispatcher: ShardDispatcher | None = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_shard_dispatcher() -> ShardDispatcher | None:
+    """Process-wide dispatcher configured from the environment (None unless `SHARDS` > 0)."""
+    global _dispatcher
+    shards = int(os.getenv("SHARDS", "0") or 0)
+    if shards <= 0:
+        return None
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                _dispatcher = ShardDispatcher(
+                    open_broker(),
+                    shards,
+                    worker_concurrency=int(
+                        os.getenv("SHARD_WORKER_CONCURRENCY", DEFAULT_WORKER_CONCURRENCY)
+                    ),
+                    lease=float(os.getenv("SHARD_LEASE", DEFAULT_LEASE_SECONDS)),
+                )
+    return _dispatcher
+
+
+# ── Worker side ─────────────────────────────────────────────────────────
+
+
+async def serve_shards(
+    broker: Broker,
+    shards: Iterable[int],
+    handlers: Mapping[str, Callable[[Task], Awaitable[Any]]],
+    *,
+    name: str = "shard-worker",
+    concurrency: int = DEFAULT_WORKER_CONCURRENCY,
+    stopping: asyncio.Event | None = None,
+    idle_exit: float | None = None,
+    poll_interval: float = POLL_INTERVAL,
+) -> int:
+    """
+    Claim and run tasks of `shards` until `stopping` is set (or, with `idle_exit`,
+    until nothing has been claimed for that many seconds).
+
+    `handlers` maps a task kind to a coroutine taking the task and returning a
+    JSON-serializable result. Returns the number of tasks run.
+    """
+    shards = list(shards)
+    stopping = stopping or asyncio.Event()
+    running: set[asyncio.Task] = set()
+    handled = 0
+    idle_since = time.monotonic()
+
+    async def run(task: Task) -> None:
+        try:
+            handler = handlers.get(task.kind)
+            if handler is None:
+                raise ValueError(f"Unknown task kind {task.kind!r}")
+            result = await handler(task)
+        except Exception as e:
+            broker.fail(task.id, name, f"{type(e).__name__}: {e}")
+            get_metrics().inc("shard_tasks_total", kind=task.kind, status=FAILED)
+        else:
+            broker.complete(task.id, name, result)
+            get_metrics().inc("shard_tasks_total", kind=task.kind, status=DONE)
+
+    while not stopping.is_set():
+        claimed = broker.claim(name, shards, concurrency - len(running))
+        for task in claimed:
+            running.add(asyncio.create_task(run(task)))
+        handled += len(claimed)
+        if running or claimed:
+            idle_since = time.monotonic()
+        elif idle_exit is not None and time.monotonic() - idle_since >= idle_exit:
+            break
+
+        if running:
+            _, running = await asyncio.wait(
+                running, timeout=poll_interval, return_when=asyncio.FIRST_COMPLETED
+            )
+        else:
+            try:
+                await asyncio.wait_for(stopping.wait(), poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    if running:
+        await asyncio.gather(*running)
+    return handled
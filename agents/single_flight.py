@@ -0,0 +1,110 @@
+"""
+Single-Flight
+Purpose: Collapse concurrent identical requests onto one in-flight execution.
+
+The first caller for a key (the leader) does the work; every caller that arrives
+while it is running waits for the same result instead of sending a duplicate
+request. Threads and coroutines share one table, so a `to_thread` worker and a
+native asyncio task asking for the same prompt or search still make one call.
+
+Cancelling a caller only affects that caller. A cancelled follower stops
+waiting and the others keep going. A cancelled leader releases the key, and
+its followers retry: one of them becomes the new leader.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import threading
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class _Abandoned(Exception):
+    """The leader was cancelled before finishing; its followers retry."""
+
+
+class SingleFlight:
+    """Keyed table of in-flight calls shared by threads and event loops."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, concurrent.futures.Future] = {}
+
+    def _claim(self, key: Hashable) -> tuple[concurrent.futures.Future, bool]:
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                return future, False
+            future = concurrent.futures.Future()
+            self._calls[key] = future
+            return future, True
+
+    def _release(self, key: Hashable, future: concurrent.futures.Future) -> None:
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """Run `fn` once for all threads that ask for `key` at the same time."""
+        while True:
+            future, leader = self._claim(key)
+            if leader:
+                break
+            try:
+                return future.result()
+            except _Abandoned:
+                continue
+
+        try:
+            result = fn()
+        except BaseException as exc:
+            self._release(key, future)
+            future.set_exception(exc)
+            raise
+        else:
+            self._release(key, future)
+            future.set_result(result)
+            return result
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Asyncio counterpart of `do`; followers await without blocking the loop."""
+        while True:
+            future, leader = self._claim(key)
+            if leader:
+                break
+            try:
+                # Shielded: cancelling this follower must not cancel the shared future
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except _Abandoned:
+                continue
+
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            # Release first, so the followers woken by `_Abandoned` can claim the key
+            self._release(key, future)
+            future.set_exception(_Abandoned())
+            raise
+        except BaseException as exc:
+            self._release(key, future)
+            future.set_exception(exc)
+            raise
+        else:
+            self._release(key, future)
+            future.set_result(result)
+            return result
+
+
+_default = SingleFlight()
+
+
+def get_single_flight() -> SingleFlight:
+    """Process-wide single-flight table used by the LLM and search gateways."""
+    return _default
@@ -0,0 +1,185 @@
+"""
+Stage Queue
+Purpose: Move a batch of items through async stages with bounded concurrency per stage.
+
+Every stage owns a bounded `asyncio.Queue` and a fixed pool of worker tasks, so
+at most `concurrency` items are inside a stage at once. An item moves on to the
+next stage as soon as it finishes the current one. A slow stage backs up its own
+queue, and that back-pressure reaches the earlier stages, instead of every item
+being launched at once. Items can also come from an async iterable (e.g. a
+streamed model response); each one enters the first stage as soon as it arrives.
+
+Per-stage limits come from `DEFAULT_CONCURRENCY` and can be overridden with a
+JSON mapping in `STAGE_CONCURRENCY`, e.g. `{"agent_b": 4, "agent_d": 2}`.
+
+Each item gets the stage's step deadline (`deadlines.step_timeout`), and a batch
+can have an overall `deadline`. Pass a `timed_out` list for partial results:
+items that hit a deadline are listed there and the batch returns everything that
+finished. Without it, a deadline fails the batch like any other error.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, Sequence
+
+try:
+    from agents.deadlines import DeadlineExceeded, deadline_scope, step_timeout
+except ImportError:  # pragma: no cover - supports direct script execution.
+    from deadlines import DeadlineExceeded, deadline_scope, step_timeout  # type: ignore
+
+DEFAULT_CONCURRENCY = {
+    "agent_b": 8,  # One structured Gemini call per candidate
+    "agent_c": 8,
+    "agent_d": 4,  # Slot generation plus dossier rendering
+    "agent_f": 3,
+    "agent_k": 8,  # Runs on the `cpu` executor
+}
+FALLBACK_CONCURRENCY = 4
+
+
+def _load_concurrency() -> dict[str, int]:
+    limits = dict(DEFAULT_CONCURRENCY)
+    raw = os.getenv("STAGE_CONCURRENCY")
+    if raw:
+        limits.update({name: int(value) for name, value in json.loads(raw).items()})
+    return limits
+
+
+_concurrency = _load_concurrency()
+
+
+def stage_concurrency(name: str) -> int:
+    """Configured worker count for stage `name` (at least 1)."""
+    return max(1, _concurrency.get(name, FALLBACK_CONCURRENCY))
+
+
+@dataclass
+class Stage:
+    """
+    One step of a staged batch.
+
+    `fn` takes the item from the previous stage and returns the item for the next
+    one; returning None drops the item (e.g. a candidate below threshold).
+    `timeout` limits one item (default: the configured step timeout; 0 for none).
+    """
+
+    name: str
+    fn: Callable[[Any], Awaitable[Any]]
+    concurrency: int | None = None
+    timeout: float | None = None
+
+    @property
+    def workers(self) -> int:
+        return max(1, self.concurrency or stage_concurrency(self.name))
+
+    @property
+    def item_timeout(self) -> float | None:
+        return step_timeout(self.name) if self.timeout is None else (self.timeout or None)
+
+
+async def _aiter(items: Iterable[Any] | AsyncIterable[Any]) -> AsyncIterator[Any]:
+    if isinstance(items, AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+async def run_stages(
+    items: Iterable[Any] | AsyncIterable[Any],
+    stages: Sequence[Stage],
+    *,
+    deadline: float | None = None,
+    timed_out: list[dict] | None = None,
+    name: str = "batch",
+) -> list[Any]:
+    """
+    Push `items` through `stages` in order.
+
+    Args:
+        deadline: Seconds for the whole batch; in-flight items are cancelled when it passes
+        timed_out: Partial-result mode: items that hit a deadline are appended here as
+            `{"stage", "item", "reason"}` and come back as None instead of failing the batch
+        name: Batch name used in deadline errors
+
+    Returns:
+        One entry per input item, in input order: the last stage's result, or
+        None if a stage dropped the item (or it timed out, in partial-result mode)
+
+    Raises:
+        The first exception raised by any stage, after the rest of the batch has
+        drained (other items are not abandoned because one of them failed)
+    """
+    if not stages:
+        return [item async for item in _aiter(items)]
+    results: dict[int, Any] = {}
+    in_flight: dict[int, tuple[str, Any]] = {}  # position -> (stage, item), for the deadline
+    count = 0
+
+    queues: list[asyncio.Queue] = [asyncio.Queue(maxsize=2 * stage.workers) for stage in stages]
+    errors: list[BaseException] = []
+
+    async def worker(index: int) -> None:
+        stage, inbox = stages[index], queues[index]
+        outbox = queues[index + 1] if index + 1 < len(stages) else None
+        while True:
+            position, item = await inbox.get()
+            try:
+                async with deadline_scope(stage.item_timeout, stage.name):
+                    value = await stage.fn(item)
+                if value is None:
+                    in_flight.pop(position, None)
+                elif outbox is None:
+                    results[position] = value
+                    in_flight.pop(position, None)
+                else:
+                    in_flight[position] = (stages[index + 1].name, value)
+                    await outbox.put((position, value))
+            except DeadlineExceeded as exc:
+                in_flight.pop(position, None)
+                if timed_out is None:
+                    errors.append(exc)
+                else:
+                    timed_out.append({"stage": stage.name, "item": item, "reason": str(exc)})
+            except Exception as exc:
+                in_flight.pop(position, None)
+                errors.append(exc)
+            finally:
+                # Only after the hand-off, so joining the stages in order drains the batch.
+                inbox.task_done()
+
+    workers: list[asyncio.Task] = []
+    try:
+        async with deadline_scope(deadline, name):
+            # Started inside the scope, so their threads see the batch deadline too
+            workers.extend(
+                asyncio.create_task(worker(index), name=f"stage-{stage.name}-{slot}")
+                for index, stage in enumerate(stages)
+                for slot in range(stage.workers)
+            )
+            async for item in _aiter(items):
+                in_flight[count] = (stages[0].name, item)
+                await queues[0].put((count, item))
+                count += 1
+            for queue in queues:
+                await queue.join()
+    except DeadlineExceeded as exc:
+        if timed_out is None:
+            raise
+        timed_out.extend(
+            {"stage": stage, "item": item, "reason": str(exc)}
+            for _, (stage, item) in sorted(in_flight.items())
+        )
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    if errors:
+        raise errors[0]
+    return [results.get(position) for position in range(count)]
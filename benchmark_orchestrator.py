@@ -0,0 +1,179 @@
+"""
+ORCHESTRATOR BENCHMARK
+Runs the orchestrator pipelines against an offline backend (see agents/backends.py)
+and reports their throughput, so changes can be measured without network or quota.
+
+Examples:
+    python benchmark_orchestrator.py --candidates 50
+    python benchmark_orchestrator.py --backend replay --llm-latency lognormal:1.5:0.5
+    python benchmark_orchestrator.py --profile
+    python benchmark_orchestrator.py --structured     # structured profiles, pre-screened first
+    python benchmark_orchestrator.py --shards 4       # B → C → D and F on 4 worker processes
+"""
+
+import argparse
+import asyncio
+import contextlib
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from agents.backends import DEFAULT_FIXTURES_DIR, Backend, set_backend
+from agents.metrics import get_metrics, write_metrics
+from master_orchestrator import GunnercookeOrchestrator
+from orchestrator_shards import spawn_workers, stop_workers
+
+
+def _sample_profiles(count: int, structured: bool = False) -> str | list[dict]:
+    if not structured:
+        return "\n".join(
+            f"Candidate {i}: Senior Associate, Restructuring, Firm {i % 7}, "
+            f"{4 + i % 9} years in role."
+            for i in range(1, count + 1)
+        )
+    # A mix of clear and borderline cases for the pre-screen
+    firms = ("Freshfields", "Noerr", "Kanzlei Schmidt")
+    books = ("€1.5M", "€500k", "€150k")
+    return [
+        {
+            "name": f"Candidate {i}",
+            "firm": firms[i % 3],
+            "title": "Senior Associate",
+            "years_in_role": 4 + i % 9,
+            "practice_area": "Restructuring",
+            "deals": [{"role": "Lead", "value": 30_000_000}] if i % 2 else [],
+            "estimated_book": books[i % 4 % 3],
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+async def _run(candidates: int, structured: bool = False) -> dict:
+    orchestrator = GunnercookeOrchestrator()
+    timings = {}
+
+    started = time.monotonic()
+    recruiting = await orchestrator.run_recruiting_pipeline(
+        _sample_profiles(candidates, structured)
+    )
+    timings["recruiting_s"] = round(time.monotonic() - started, 3)
+
+    started = time.monotonic()
+    content = await orchestrator.run_content_pipeline()
+    timings["content_s"] = round(time.monotonic() - started, 3)
+
+    # Both pipelines as one DAG run: the nodes overlap instead of running back to back
+    started = time.monotonic()
+    combined = GunnercookeOrchestrator()
+    await combined.run_all(profiles_text=_sample_profiles(candidates, structured))
+    timings["combined_s"] = round(time.monotonic() - started, 3)
+
+    timings["candidates_in"] = candidates
+    timings["candidates_out"] = len(recruiting) if isinstance(recruiting, list) else 0
+    timings["signals"] = len(content.get("signals", []))
+    timings["posts"] = len(content.get("posts", []))
+    timings["spilled_bytes"] = orchestrator.results.disk_bytes
+    orchestrator.results.close()
+    combined.results.close()
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the orchestrator on recorded or synthetic backends.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("--backend", choices=("synthetic", "replay"), default="synthetic")
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES_DIR)
+    parser.add_argument("--llm-latency", default="lognormal:1.5:0.5")
+    parser.add_argument("--search-latency", default="lognormal:0.8:0.4")
+    parser.add_argument("--latency-scale", type=float, default=1.0)
+    parser.add_argument("--seed", default="0")
+    parser.add_argument(
+        "--candidates", type=int, default=20, help="Profiles fed to Agent A (synthetic mode)"
+    )
+    parser.add_argument(
+        "--structured", action="store_true", help="Feed structured profiles through the pre-screen"
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=0,
+        help="Run per-item work on this many local shard workers (0: in-process)",
+    )
+    parser.add_argument("--profile", action="store_true", help="Print the top cProfile entries")
+    parser.add_argument("--verbose", action="store_true", help="Show the pipelines' own output")
+    args = parser.parse_args()
+
+    # Every benchmark run is fresh; don't fill the checkpoint store with throwaway runs.
+    os.environ.setdefault("CHECKPOINTS_DISABLED", "1")
+    # Nor skip work because an earlier run (or the run before it) already did it.
+    os.environ.setdefault("ENTITY_LEDGER_DISABLED", "1")
+    # Results are still streamed (their writes are part of the cost), just not into the repo.
+    os.environ.setdefault("RESULTS_PATH", os.path.join(tempfile.mkdtemp(), "results.jsonl"))
+    set_backend(
+        Backend(
+            mode=args.backend,
+            fixtures_dir=args.fixtures,
+            llm_latency=args.llm_latency,
+            search_latency=args.search_latency,
+            latency_scale=args.latency_scale,
+            seed=args.seed,
+            on_miss="synthetic",
+            array_items=args.candidates,
+        )
+    )
+    workers = []
+    if args.shards > 0:
+        # Shard workers are separate processes: they build the same backend from the environment
+        os.environ.update(
+            AGENT_BACKEND=args.backend,
+            BACKEND_FIXTURES_DIR=args.fixtures,
+            BACKEND_LLM_LATENCY=args.llm_latency,
+            BACKEND_SEARCH_LATENCY=args.search_latency,
+            BACKEND_LATENCY_SCALE=str(args.latency_scale),
+            BACKEND_SEED=args.seed,
+            REPLAY_ON_MISS="synthetic",
+            SYNTHETIC_ARRAY_ITEMS=str(args.candidates),
+            SHARDS=str(args.shards),
+            BROKER_URL="sqlite:///" + os.path.join(tempfile.mkdtemp(), "broker.sqlite3"),
+        )
+        workers = spawn_workers(args.shards, args.shards, os.environ["BROKER_URL"])
+
+    profiler = cProfile.Profile() if args.profile else None
+    output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    started = time.monotonic()
+    with output:
+        if profiler:
+            profiler.enable()
+        try:
+            timings = asyncio.run(_run(args.candidates, args.structured))
+        finally:
+            stop_workers(workers)
+        if profiler:
+            profiler.disable()
+    timings["total_s"] = round(time.monotonic() - started, 3)
+    timings["shards"] = args.shards
+
+    metrics = get_metrics()
+    # This process only: with --shards, the workers' requests are counted in their own metrics
+    timings["llm_requests"] = metrics.counter_value("llm_requests_total", outcome="ok")
+    timings["search_requests"] = metrics.counter_value("search_requests_total", outcome="ok")
+    print(json.dumps(timings, indent=2))
+
+    json_path, prom_path = write_metrics(".", prefix="benchmark_metrics")
+    print(f"📈 Metrics saved to {json_path} and {prom_path}")
+
+    if profiler:
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+
+
+if __name__ == "__main__":
+    main()
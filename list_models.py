@@ -1,13 +1,8 @@
-import os
-
-from dotenv import load_dotenv
-from google import genai
-
-load_dotenv()
-client = genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
+from agents.llm_gateway import refresh_model_catalog
 
 try:
-    for m in client.models.list():
-        print(m.name)
+    # Also refreshes the cached catalog the gateway uses to skip unknown models.
+    for name in refresh_model_catalog().names():
+        print(name)
 except Exception as e:
     print(e)
@@ -2,7 +2,7 @@
 MASTER ORCHESTRATOR
 Chains all Gunnercooke agents into automated pipelines.
 
-Pipelines:
+Pipelines (nodes of one DAG; `run_all` runs several with a shared signal scan):
 1. RECRUITING: A → B → C → D (Scout → Profile → Outreach → Schedule)
 2. CONTENT: E → F (Signal → Ghostwrite)
 3. ENGAGEMENT: G (Authority Amplifier)
@@ -11,30 +11,137 @@ Pipelines:
 6. RISK: K (Revenue Monitor)
 """
 
+import argparse
 import asyncio
+import dataclasses
 import json
 import os
 import sys
+import time
 from datetime import datetime
+from typing import Any
 
 # Add agents directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from agents.agent_a_glass_ceiling_scout import analyze_profiles
-from agents.agent_b_rainmaker_profiler import analyze_book_of_business
-from agents.agent_c_outreach_architect import generate_outreach
+from agents.agent_a_glass_ceiling_scout import stream_profiles_async
+from agents.agent_b_rainmaker_profiler import analyze_book_of_business_async
+from agents.agent_c_outreach_architect import generate_outreach_async
 from agents.agent_d_scheduling_concierge import SchedulingConcierge
-from agents.agent_e_signal_hunter import run_signal_hunter
-from agents.agent_f_thought_leader_ghostwriter import format_post_preview, generate_linkedin_post
-from agents.agent_k_revenue_predictor import assess_risk
+from agents.agent_e_signal_hunter import run_signal_hunter_async
+from agents.agent_f_thought_leader_ghostwriter import (
+    format_post_preview,
+    generate_linkedin_post_async,
+)
+from agents.agent_k_revenue_predictor import PartnerFinancials, assess_risk
+from agents.checkpoints import CheckpointStore, RunCheckpointer, get_checkpoint_store, new_run_id
+from agents.dag import DAG
+from agents.deadlines import DeadlineExceeded, deadline_scope, pipeline_timeout, step_timeout
+from agents.entity_ledger import (
+    KNOWN,
+    STALE,
+    EntityLedger,
+    candidate_identity,
+    canonical_url,
+    content_hash,
+    get_entity_ledger,
+)
+from agents.executors import run_in
+from agents.llm_gateway import aclose_client
+from agents.llm_scheduler import llm_flow
+from agents.metrics import get_metrics, instrument_pipeline, write_metrics
+from agents.prescreen import (
+    ACCEPT,
+    REJECT,
+    UNCERTAIN,
+    prescreen_enabled,
+    screen_profile,
+    screen_revenue,
+)
+from agents.result_sink import ResultSink, get_result_sink
+from agents.results_store import ResultsStore, StoredResult, spill_path
+from agents.sharding import ShardDispatcher, get_shard_dispatcher
+from agents.stage_queue import Stage, run_stages
+
+
+class AgentStepError(RuntimeError):
+    """An agent returned an error result instead of its output."""
+
+
+def _check_agent(agent: str, value):
+    """Raise for an agent's error result, so its checkpoint step is recorded as failed."""
+    if isinstance(value, dict) and "error" in value:
+        raise AgentStepError(f"{agent}: {value['error']}")
+    return value
+
+
+def _candidate_key(candidate: dict) -> str:
+    return f"{candidate.get('Name')}|{candidate.get('Current_Firm')}"
+
+
+def _candidate_hash(candidate: dict) -> str:
+    """What Agent B's analysis depends on; a change means the candidate is profiled again."""
+    return content_hash(
+        candidate.get("Years_in_Role"),
+        candidate.get("Estimated_Book_of_Business"),
+        candidate.get("Reason_for_Score"),
+    )
+
+
+def _post_key(signal: dict) -> str:
+    return canonical_url(signal.get("source_url")) or content_hash(signal.get("headline"))
+
+
+def _candidate_summary(result: dict) -> dict:
+    """Fields of a recruiting result kept in memory; the rest stays in the spill file."""
+    candidate = result["candidate"]
+    revenue = result.get("revenue_analysis", {})
+    return {
+        "Name": candidate.get("Name"),
+        "Current_Firm": candidate.get("Current_Firm"),
+        "Frustration_Score": candidate.get("Frustration_Score"),
+        "total_portable_revenue": revenue.get("total_portable_revenue", 0),
+        "recommendation": revenue.get("recommendation"),
+    }
+
+
+def _signal_key(signal: dict) -> str:
+    return signal.get("source_url") or signal.get("headline", "")
 
 
 class GunnercookeOrchestrator:
     """Master orchestrator for all Gunnercooke automation agents."""
 
-    def __init__(self):
-        self.results = {}
-        self.log = []
+    def __init__(
+        self,
+        run_id: str | None = None,
+        store: CheckpointStore | None = None,
+        sink: ResultSink | None = None,
+        partial: bool | None = None,
+        ledger: EntityLedger | None = None,
+        dispatcher: ShardDispatcher | None = None,
+        results: ResultsStore | None = None,
+    ):
+        # Finished items are streamed to the sink; only their counts are kept for the summary.
+        self.counts: dict[str, int] = {}
+        self.sink = sink or get_result_sink()
+        self.log: list[dict] = []
+        self._step_started: dict[tuple[str, str], float] = {}
+        self.dag = self._build_dag()
+        # Pass an existing run_id to resume it: completed steps come from the checkpoint store.
+        self.run_id = run_id or new_run_id()
+        # Recruiting results: summaries in memory, full payloads spilled to disk
+        self.results = results or ResultsStore(spill_path(self.run_id))
+        self.checkpoint = RunCheckpointer(store or get_checkpoint_store(), self.run_id)
+        # Partial results: a step or pipeline that runs out of time is listed, not fatal
+        if partial is None:
+            partial = os.getenv("PARTIAL_RESULTS", "1") != "0"
+        self.partial = partial
+        self.timed_out: list[dict] = []
+        # Entities processed by earlier runs (None when ENTITY_LEDGER_DISABLED is set)
+        self.ledger = ledger or get_entity_ledger()
+        # Shard workers run B → C → D and F when set (None unless SHARDS is set)
+        self.dispatcher = dispatcher or get_shard_dispatcher()
 
     def _log(self, pipeline: str, step: str, status: str):
         entry = {
@@ -43,6 +150,17 @@ class GunnercookeOrchestrator:
             "step": step,
             "status": status,
         }
+        # RUNNING starts the step's clock; the next status for the same step stops it.
+        now = time.monotonic()
+        if status == "RUNNING":
+            self._step_started[(pipeline, step)] = now
+        elif (pipeline, step) in self._step_started:
+            duration = now - self._step_started.pop((pipeline, step))
+            entry["duration_s"] = round(duration, 3)
+            stage = step.split(" (")[0]  # "Agent B (Name)" -> "Agent B"
+            get_metrics().observe(
+                "stage_duration_seconds", duration, pipeline=pipeline, stage=stage
+            )
         self.log.append(entry)
         print(f"  [{status}] {step}")
 
@@ -50,8 +168,81 @@ class GunnercookeOrchestrator:
     # PIPELINE 1: RECRUITING (A → B → C → D)
     # ═══════════════════════════════════════════════════════════════════════
 
-    async def process_candidate(self, candidate, sender_name):
-        """Async wrapper to process a single candidate through B->C->D."""
+    async def _score_profiles(self, profiles):
+        """
+        Agent A: yield scored candidates. Structured profiles (dicts) are pre-screened
+        with the manual scorer; only the uncertain ones are sent to the model.
+        """
+        uncertain = profiles
+        if not isinstance(profiles, str) and prescreen_enabled():
+            uncertain = []
+            counts = {ACCEPT: 0, REJECT: 0, UNCERTAIN: 0}
+            for profile in profiles:
+                screen = screen_profile(profile)
+                counts[screen.decision] += 1
+                if screen.decision == ACCEPT:
+                    yield screen.result
+                elif screen.decision == UNCERTAIN:
+                    uncertain.append(profile)
+            self._log(
+                "recruiting",
+                "Pre-screen (Agent A)",
+                f"DONE - {counts[ACCEPT]} accepted, {counts[REJECT]} rejected, "
+                f"{counts[UNCERTAIN]} to the model",
+            )
+        if not uncertain:
+            return
+        if not isinstance(uncertain, str):
+            uncertain = "\n".join(json.dumps(p, ensure_ascii=False) for p in uncertain)
+        async for candidate in stream_profiles_async(uncertain):
+            yield candidate
+
+    async def _prescreen_candidate(self, candidate):
+        """Pre-screen stage: settle clear revenue cases without Agent B's model call."""
+        if "revenue_analysis" in candidate:
+            return candidate  # Refreshed from the ledger
+        screen = screen_revenue(candidate)
+        if screen.decision == REJECT:
+            self._log("recruiting", f"Pre-screen ({candidate['Name']})", f"NO GO - {screen.reason}")
+            return None
+        if screen.decision == ACCEPT:
+            self._log("recruiting", f"Pre-screen ({candidate['Name']})", f"GO - {screen.reason}")
+            return {"candidate": candidate, "revenue_analysis": screen.result}
+        return candidate
+
+    def _remember_candidate(self, candidate, status, revenue_analysis):
+        """Record a settled candidate; error results are never remembered as outcomes."""
+        if self.ledger is not None and "error" not in revenue_analysis:
+            self.ledger.record(
+                "candidate",
+                candidate_identity(candidate),
+                _candidate_hash(candidate),
+                {"revenue_analysis": revenue_analysis},
+                status=status,
+                run_id=self.run_id,
+            )
+
+    async def _recall_candidate(self, candidate):
+        """Ledger stage: skip candidates processed recently; refresh stale ones without Agent B."""
+        recall = self.ledger.recall(
+            "candidate", candidate_identity(candidate), _candidate_hash(candidate), self.run_id
+        )
+        step = f"Ledger ({candidate['Name']})"
+        if recall.state == KNOWN:
+            processed = datetime.fromtimestamp(recall.entry.processed_at).strftime("%Y-%m-%d")
+            self._log("recruiting", step, f"KNOWN - {recall.entry.status} on {processed}")
+            self.counts["known"] = self.counts.get("known", 0) + 1
+            return None
+        if recall.state == STALE and recall.entry.status == "done":
+            # Same book and reasons as last time: keep the revenue analysis, redo C and D
+            self._log("recruiting", step, "STALE - refreshing outreach and scheduling")
+            return {"candidate": candidate, **recall.entry.data}
+        return candidate
+
+    async def _profile_candidate(self, candidate):
+        """Stage B: estimate portable revenue; drops candidates below the GO threshold."""
+        if "revenue_analysis" in candidate:
+            return candidate  # Already decided by the pre-screen or the ledger
         print(f"\n{'─' * 50}")
         print(f"👤 Processing: {candidate['Name']}")
 
@@ -65,9 +256,9 @@ class GunnercookeOrchestrator:
         Reason for Score: {candidate["Reason_for_Score"]}
         """
 
-        # Run blocking call in thread
-        revenue_analysis = await asyncio.to_thread(
-            analyze_book_of_business, deal_sheet, candidate["Name"]
+        # Native async call on the shared gateway client (no worker thread)
+        revenue_analysis = _check_agent(
+            "Agent B", await analyze_book_of_business_async(deal_sheet, candidate["Name"])
         )
         portable_revenue = revenue_analysis.get("total_portable_revenue", 0)
         recommendation = revenue_analysis.get("recommendation", "UNKNOWN")
@@ -80,157 +271,466 @@ class GunnercookeOrchestrator:
 
         if recommendation != "GO":
             print(f"  ⚠️ {candidate['Name']}: Skipping (below threshold)")
+            if recommendation == "NO GO":  # Only a real verdict is worth remembering
+                self._remember_candidate(candidate, "rejected", revenue_analysis)
             return None
+        return {"candidate": candidate, "revenue_analysis": revenue_analysis}
 
-        # Step 3: Agent C - Outreach Architect
+    async def _draft_outreach(self, result, sender_name):
+        """Stage C: draft the outreach message."""
+        candidate = result["candidate"]
         self._log("recruiting", f"Agent C ({candidate['Name']})", "RUNNING")
 
-        outreach = await asyncio.to_thread(
-            generate_outreach,
-            candidate_name=candidate["Name"],
-            current_firm=candidate["Current_Firm"],
-            recent_achievement=candidate["Reason_for_Score"],
-            practice_area="Legal",
-            sender_name=sender_name,
+        result["outreach"] = _check_agent(
+            "Agent C",
+            await generate_outreach_async(
+                candidate_name=candidate["Name"],
+                current_firm=candidate["Current_Firm"],
+                recent_achievement=candidate["Reason_for_Score"],
+                practice_area="Legal",
+                sender_name=sender_name,
+            ),
         )
         self._log("recruiting", f"Agent C ({candidate['Name']})", "DONE")
+        return result
 
-        # Step 4: Agent D - Scheduling Concierge
+    async def _schedule_interview(self, result):
+        """Stage D: match an interviewer and prepare scheduling."""
+        candidate = result["candidate"]
         self._log("recruiting", f"Agent D ({candidate['Name']})", "RUNNING")
 
         concierge = SchedulingConcierge()
-        scheduling = await asyncio.to_thread(
-            concierge.process_acceptance,
-            candidate_name=candidate["Name"],
-            candidate_email=f"{candidate['Name'].lower().replace(' ', '.')}@example.com",
-            current_firm=candidate["Current_Firm"],
-            practice_area="Restructuring",
-            frustration_score=candidate["Frustration_Score"],
-            frustration_reasons=candidate["Reason_for_Score"],
-            portable_revenue=portable_revenue,
+        result["scheduling"] = _check_agent(
+            "Agent D",
+            await concierge.process_acceptance_async(
+                candidate_name=candidate["Name"],
+                candidate_email=f"{candidate['Name'].lower().replace(' ', '.')}@example.com",
+                current_firm=candidate["Current_Firm"],
+                practice_area="Restructuring",
+                frustration_score=candidate["Frustration_Score"],
+                frustration_reasons=candidate["Reason_for_Score"],
+                portable_revenue=result["revenue_analysis"].get("total_portable_revenue", 0),
+            ),
         )
         self._log("recruiting", f"Agent D ({candidate['Name']})", "DONE")
+        return result
+
+    def _emit(self, kind: str, key: str, data):
+        self.sink.write(kind, key, data, run_id=self.run_id)
+
+    def _note_timeouts(self, pipeline: str, entries, key_fn):
+        """Record items that hit a deadline (from `run_stages`) and stream them to the sink."""
+        for entry in entries:
+            key = key_fn(entry["item"])
+            record = {
+                "pipeline": pipeline,
+                "stage": entry["stage"],
+                "key": key,
+                "reason": entry["reason"],
+            }
+            self.timed_out.append(record)
+            self._log(pipeline, f"{entry['stage']} ({key})", f"TIMED OUT - {entry['reason']}")
+            self._emit("timeout", f"{entry['stage']}|{key}", record)
+
+    def _checkpointed(self, stage, fn, emit: str | None = None):
+        """
+        Serve a candidate's completed stage from the checkpoint store, else run and record it.
+        With `emit`, the stage's result is also streamed to the result sink. A candidate
+        whose agent fails is dropped from this run; its step is retried on resume.
+        """
 
-        return {
-            "candidate": candidate,
-            "revenue_analysis": revenue_analysis,
-            "outreach": outreach,
-            "scheduling": scheduling,
-        }
+        agent = "Agent " + stage.removeprefix("agent_").upper()  # As logged by the stage
 
-    async def run_recruiting_pipeline(
-        self, profiles_text: str, sender_name: str = "Managing Partner"
-    ):
+        async def run(item):
+            candidate = item.get("candidate", item)
+            key = _candidate_key(candidate)
+            try:
+                value = await self.checkpoint.step(stage, key, lambda: fn(item))
+            except AgentStepError as exc:
+                self._log("recruiting", f"{agent} ({candidate['Name']})", f"FAILED - {exc}")
+                self.counts["failed"] = self.counts.get("failed", 0) + 1
+                return None
+            if emit and value is not None:
+                self._emit(emit, key, value)
+            return value
+
+        return run
+
+    async def _dispatch_candidate(self, candidate, sender_name):
+        """B → C → D on the candidate's shard worker; the merged result is streamed here."""
+        key = _candidate_key(candidate)
+        result = await self.dispatcher.submit(
+            "candidate",
+            key,
+            {"candidate": candidate, "sender_name": sender_name},
+            run_id=self.run_id,
+        )
+        if result is not None:
+            self._emit("candidate", key, result)
+        return result
+
+    def _candidate_stages(self, sender_name, screened=False):
+        """B → C → D, after the ledger and pre-screen unless `screened` already applied them."""
+        stages = []
+        if self.ledger is not None and not screened:
+            stages.append(Stage("ledger", self._recall_candidate))
+        if prescreen_enabled() and not screened:
+            stages.append(Stage("prescreen", self._prescreen_candidate))
+        if self.dispatcher is not None:
+            return stages + [
+                Stage(
+                    "shard",
+                    lambda candidate: self._dispatch_candidate(candidate, sender_name),
+                    concurrency=self.dispatcher.capacity,
+                )
+            ]
+        return stages + [
+            Stage("agent_b", self._checkpointed("agent_b", self._profile_candidate)),
+            Stage(
+                "agent_c",
+                self._checkpointed(
+                    "agent_c", lambda result: self._draft_outreach(result, sender_name)
+                ),
+            ),
+            Stage(
+                "agent_d",
+                self._checkpointed("agent_d", self._schedule_interview, emit="candidate"),
+            ),
+        ]
+
+    async def _spill_candidate(self, result) -> StoredResult:
+        self._remember_candidate(result["candidate"], "done", result["revenue_analysis"])
+        return self.results.add(
+            "candidate", _candidate_key(result["candidate"]), result, _candidate_summary
+        )
+
+    async def process_candidate(self, candidate, sender_name, screened=False):
+        """Process a single candidate through B->C->D (None if skipped after B)."""
+        [result] = await run_stages([candidate], self._candidate_stages(sender_name, screened))
+        return result
+
+    async def _recruit(self, profiles_text, sender_name):
         """
-        Full recruiting pipeline (Async):
-        1. Agent A: Score candidates (Frustration Score) - Single batch
-        2. Agent B/C/D: Parallel execution per candidate
+        DAG node: A → B → C → D.
+        1. Agent A: Score candidates (Frustration Score) - one streamed request
+        2. Agent B/C/D: Each candidate enters the queued stages as soon as A emits it
         """
-        print("\n" + "═" * 70)
-        print("🎯 RECRUITING PIPELINE (ASYNC)")
-        print("═" * 70)
-
         # Step 1: Agent A - Glass Ceiling Scout
         print("\n📊 STEP 1: Agent A - Glass Ceiling Scout")
         self._log("recruiting", "Agent A", "RUNNING")
+        high_potential = []
+        agent_a_error = None
+        agent_a_done = False
+
+        async def scored_candidates():
+            # Stream A's JSON array; hand each high-potential candidate to B right away.
+            nonlocal agent_a_error, agent_a_done
+            found, stored = self.checkpoint.load("agent_a", "candidates")
+            if found:
+                high_potential.extend(stored)
+                self._log("recruiting", "Agent A", f"DONE - {len(stored)} from checkpoint")
+                for candidate in stored:
+                    yield candidate
+                agent_a_done = True
+                return
+            try:
+                async for candidate in self._score_profiles(profiles_text):
+                    if candidate.get("Frustration_Score", 0) > 70:
+                        high_potential.append(candidate)
+                        yield candidate
+            except Exception as e:
+                agent_a_error = e
+                self._log("recruiting", "Agent A", f"FAILED - {e}")
+                return
+            agent_a_done = True
+            self.checkpoint.save("agent_a", "candidates", high_potential)
+            self._log(
+                "recruiting", "Agent A", f"DONE - {len(high_potential)} candidates scored >70"
+            )
 
-        # Agent A is fast enough to run in one go usually, but let's thread it too
-        candidates = await asyncio.to_thread(analyze_profiles, profiles_text)
-
-        if isinstance(candidates, dict) and "error" in candidates:
-            self._log("recruiting", "Agent A", "FAILED")
-            return {"error": candidates["error"]}
-
-        # Filter high-potential only
-        high_potential = [c for c in candidates if c.get("Frustration_Score", 0) > 70]
-        self._log("recruiting", "Agent A", f"DONE - {len(high_potential)} candidates scored >70")
+        # B -> C -> D as queued stages, each with its own worker limit (STAGE_CONCURRENCY).
+        # The last stage swaps each full result for its spilled index entry, so the batch
+        # holds only summaries in memory.
+        print("\n🚀 Streaming candidates into B → C → D as Agent A scores them...")
+        stages = self._candidate_stages(sender_name)
+        stages.append(Stage("spill", self._spill_candidate, concurrency=1))
+        timed_out = [] if self.partial else None
+        results = await run_stages(
+            scored_candidates(),
+            stages,
+            deadline=pipeline_timeout("recruiting"),
+            timed_out=timed_out,
+            name="recruiting",
+        )
+        if timed_out is not None:
+            if not agent_a_done and agent_a_error is None:
+                # The deadline stopped the scoring stream itself: later profiles were never scored
+                timed_out.append({"stage": "agent_a", "item": {}, "reason": "recruiting timed out"})
+            self._note_timeouts(
+                "recruiting", timed_out, lambda item: _candidate_key(item.get("candidate", item))
+            )
 
         if not high_potential:
+            if agent_a_error is not None:
+                return {"error": str(agent_a_error)}
             print("  ⚠️ No high-potential candidates found.")
             return {"candidates": [], "message": "No candidates above threshold"}
 
-        # Parallel Execution for B -> C -> D
-        print(f"\n🚀 Launching parallel processing for {len(high_potential)} candidates...")
-        tasks = [self.process_candidate(c, sender_name) for c in high_potential]
-        results = await asyncio.gather(*tasks)
-
         # Filter out None results (skipped candidates)
         valid_results = [r for r in results if r is not None]
 
-        self.results["recruiting"] = valid_results
         return valid_results
 
-    # ═══════════════════════════════════════════════════════════════════════
-    # PIPELINE 2: CONTENT (E → F)
-    # ═══════════════════════════════════════════════════════════════════════
+    @instrument_pipeline("recruiting")
+    async def run_recruiting_pipeline(
+        self, profiles_text: str | list[dict], sender_name: str = "Managing Partner"
+    ):
+        """
+        Full recruiting pipeline (Async): the `recruiting` node of the DAG.
 
-    async def run_content_pipeline(self, partner_name: str = "Senior Partner"):
-        """Content pipeline (Async)"""
+        `profiles_text` is free text for Agent A, or a list of structured profiles
+        (`score_candidate_manual` fields, optionally with `clients`) to pre-screen first.
+        """
         print("\n" + "═" * 70)
-        print("📝 CONTENT PIPELINE")
+        print("🎯 RECRUITING PIPELINE (ASYNC)")
         print("═" * 70)
+        return await self._run_target(
+            "recruiting", profiles_text=profiles_text, sender_name=sender_name
+        )
 
-        # Step 1: Agent E - Signal Hunter
-        print("\n📡 STEP 1: Agent E - Signal Hunter")
-        self._log("content", "Agent E", "RUNNING")
-        signals = await asyncio.to_thread(run_signal_hunter)
-        self._log("content", "Agent E", f"DONE - {len(signals)} signals found")
+    # ═══════════════════════════════════════════════════════════════════════
+    # PIPELINE 2: CONTENT (E → F)
+    # ═══════════════════════════════════════════════════════════════════════
 
-        if not signals:
-            return {"signals": [], "posts": [], "message": "No signals found"}
+    async def _hunt_signals(self):
+        """DAG node shared by content and dashboard: one signal scan per run."""
+        print("\n📡 Agent E - Signal Hunter")
+        self._log("signals", "Agent E", "RUNNING")
+        try:
+            async with deadline_scope(step_timeout("agent_e"), "agent_e"):
+                signals = await self.checkpoint.step("agent_e", "signals", run_signal_hunter_async)
+        except DeadlineExceeded as exc:
+            if not self.partial:
+                raise
+            self._note_timeouts(
+                "signals",
+                [{"stage": "agent_e", "item": "signals", "reason": str(exc)}],
+                lambda item: item,
+            )
+            return []
+        for signal in signals:
+            self._emit("signal", _signal_key(signal), signal)
+        self._log("signals", "Agent E", f"DONE - {len(signals)} signals found")
+        return signals
 
-        # Step 2: Agent F - Thought Leader Ghostwriter
-        print("\n✍️ STEP 2: Agent F - Thought Leader Ghostwriter")
+    async def _write_posts(self, signals, partner_name):
+        if not signals:
+            return []
+
+        # Agent F - Thought Leader Ghostwriter
+        print("\n✍️ Agent F - Thought Leader Ghostwriter")
+        if self.ledger is not None:
+            # An article that already has a post is not written about again
+            unposted = [
+                signal
+                for signal in signals
+                if self.ledger.recall("post", _post_key(signal), run_id=self.run_id).state != KNOWN
+            ]
+            if len(unposted) < len(signals):
+                self._log(
+                    "content", "Agent F", f"SKIPPED - {len(signals) - len(unposted)} already posted"
+                )
+                self.counts["known"] = self.counts.get("known", 0) + len(signals) - len(unposted)
+            signals = unposted
 
         async def process_signal(signal):
-            self._log("content", f"Agent F ({signal.get('headline', '')[:10]})", "RUNNING")
-            post = await asyncio.to_thread(generate_linkedin_post, signal, partner_name)
+            step = f"Agent F ({signal.get('headline', '')[:10]})"
+            self._log("content", step, "RUNNING")
+            key = _signal_key(signal)
+            post = await self._ghostwrite(signal, partner_name)
+            self._log("content", step, "DONE")
+            self._emit("post", key, {"signal": signal, "post": post})
+            if self.ledger is not None:
+                self.ledger.record("post", _post_key(signal), data=post, run_id=self.run_id)
             return {"signal": signal, "post": post}
 
-        # Process top 3 signals concurrently
-        tasks = [process_signal(s) for s in signals[:3]]
-        posts = await asyncio.gather(*tasks)
+        # Process top 3 signals on the bounded Agent F stage
+        timed_out = [] if self.partial else None
+        workers = self.dispatcher.capacity if self.dispatcher is not None else None
+        posts = await run_stages(
+            signals[:3],
+            [Stage("agent_f", process_signal, concurrency=workers)],
+            deadline=pipeline_timeout("content"),
+            timed_out=timed_out,
+            name="content",
+        )
+        self._note_timeouts("content", timed_out or [], _signal_key)
+        posts = [p for p in posts if p is not None]
 
         self._log("content", "Agent F", f"DONE - {len(posts)} posts generated")
+        return posts
+
+    async def _ghostwrite(self, signal, partner_name):
+        """Agent F for one signal, on its shard worker when sharded."""
+        key = _signal_key(signal)
+        if self.dispatcher is not None:
+            return await self.dispatcher.submit(
+                "post", key, {"signal": signal, "partner_name": partner_name}, run_id=self.run_id
+            )
+        return await self.checkpoint.step(
+            "agent_f", key, lambda: generate_linkedin_post_async(signal, partner_name)
+        )
 
-        self.results["content"] = {"signals": signals, "posts": posts}
-        return self.results["content"]
+    async def _collect_content(self, signals, posts):
+        if not signals:
+            return {"signals": [], "posts": [], "message": "No signals found"}
+        self.counts["posts"] = len(posts)
+        content = {"signals": signals, "posts": posts}
+        timed_out = [t for t in self.timed_out if t["pipeline"] == "content"]
+        if timed_out:
+            content["timed_out"] = timed_out
+        return content
+
+    @instrument_pipeline("content")
+    async def run_content_pipeline(self, partner_name: str = "Senior Partner"):
+        """Content pipeline (Async): the `content` node of the DAG."""
+        print("\n" + "═" * 70)
+        print("📝 CONTENT PIPELINE")
+        print("═" * 70)
+        return await self._run_target("content", partner_name=partner_name)
 
     # ═══════════════════════════════════════════════════════════════════════
     # PIPELINE 3: DAILY DASHBOARD
     # ═══════════════════════════════════════════════════════════════════════
 
-    async def run_daily_dashboard(self, partners: list):
-        """Daily dashboard (Async)"""
-        print("\n" + "═" * 70)
-        print("📊 DAILY DASHBOARD")
-        print(f"   Date: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
-        print("═" * 70)
-
-        dashboard = {"date": datetime.now().isoformat(), "risk_alerts": [], "signals": []}
-
+    async def _check_revenue_risk(self, partners):
         # Parallel Revenue Check
         print("\n💰 REVENUE RISK CHECK (Agent K)")
 
         async def check_partner(p):
-            assessment = await asyncio.to_thread(assess_risk, p)
+            assessment = await run_in("cpu", assess_risk, p)
             if assessment["at_risk"]:
                 print(f"  🔴 {p.name}: AT RISK")
+                self._emit("alert", p.name, assessment)
                 return assessment
             else:
                 print(f"  🟢 {p.name}: Healthy")
                 return None
 
-        risk_results = await asyncio.gather(*[check_partner(p) for p in partners])
-        dashboard["risk_alerts"] = [r for r in risk_results if r]
+        # Bounded worker pool: each check holds a `cpu` executor thread
+        timed_out = [] if self.partial else None
+        risk_results = await run_stages(
+            partners,
+            [Stage("agent_k", check_partner)],
+            deadline=pipeline_timeout("dashboard"),
+            timed_out=timed_out,
+            name="dashboard",
+        )
+        self._note_timeouts("dashboard", timed_out or [], lambda p: p.name)
+        return [r for r in risk_results if r]
+
+    async def _collect_dashboard(self, risk_alerts, signals):
+        dashboard = {
+            "date": datetime.now().isoformat(),
+            "risk_alerts": risk_alerts,
+            "signals": signals[:5],
+        }
+        self.counts["risk_alerts"] = len(risk_alerts)
+        return dashboard
+
+    @instrument_pipeline("dashboard")
+    async def run_daily_dashboard(self, partners: list):
+        """Daily dashboard (Async): the `dashboard` node of the DAG."""
+        print("\n" + "═" * 70)
+        print("📊 DAILY DASHBOARD")
+        print(f"   Date: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
+        print("═" * 70)
+        return await self._run_target("dashboard", partners=partners)
 
-        # Signal Scan
-        print("\n📡 SIGNAL SCAN (Agent E)")
-        signals = await asyncio.to_thread(run_signal_hunter)
-        dashboard["signals"] = signals[:5]
+    # ═══════════════════════════════════════════════════════════════════════
+    # DAG: ALL PIPELINES IN ONE RUN
+    # ═══════════════════════════════════════════════════════════════════════
 
-        self.results["dashboard"] = dashboard
-        return dashboard
+    def _build_dag(self) -> DAG:
+        dag = DAG()
+        dag.add("signal_hunter", self._hunt_signals, outputs=["signals"], pipeline="signals")
+        dag.add(
+            "ghostwriter",
+            self._write_posts,
+            inputs=["signals", "partner_name"],
+            outputs=["posts"],
+            pipeline="content",
+        )
+        dag.add("content", self._collect_content, inputs=["signals", "posts"], pipeline="content")
+        dag.add(
+            "recruiting",
+            self._recruit,
+            inputs=["profiles_text", "sender_name"],
+            pipeline="recruiting",
+        )
+        dag.add(
+            "revenue_risk",
+            self._check_revenue_risk,
+            inputs=["partners"],
+            outputs=["risk_alerts"],
+            pipeline="dashboard",
+        )
+        dag.add(
+            "dashboard",
+            self._collect_dashboard,
+            inputs=["risk_alerts", "signals"],
+            pipeline="dashboard",
+        )
+        return dag
+
+    async def _run_target(self, target: str, **params):
+        # LLM calls of this run queue as one flow, so concurrent runs of a class take turns
+        with llm_flow(self.run_id):
+            result = await self.dag.run([target], params)
+        if result.errors:
+            raise next(iter(result.errors.values()))  # The most upstream failure
+        return result[target]
+
+    async def run_all(
+        self,
+        partner_name: str = "Senior Partner",
+        profiles_text: str | list[dict] | None = None,
+        sender_name: str = "Managing Partner",
+        partners: list[PartnerFinancials] | None = None,
+    ):
+        """
+        Run content, plus recruiting and the dashboard when their inputs are given,
+        as one DAG: independent nodes overlap and the signal scan runs only once.
+
+        Returns:
+            DAGResult with each pipeline's output, and the errors of failed nodes
+        """
+        targets = ["content"]
+        params: dict[str, Any] = {"partner_name": partner_name}
+        if profiles_text is not None:
+            targets.append("recruiting")
+            params.update(profiles_text=profiles_text, sender_name=sender_name)
+        if partners is not None:
+            targets.append("dashboard")
+            params["partners"] = partners
+
+        # Everything `run_all` takes, so `main --resume` runs the same DAG targets again
+        self.checkpoint.start(
+            {
+                "partner_name": partner_name,
+                "profiles_text": profiles_text,
+                "sender_name": sender_name,
+                "partners": (
+                    None if partners is None else [dataclasses.asdict(p) for p in partners]
+                ),
+            }
+        )
+        with llm_flow(self.run_id):
+            result = await self.dag.run(targets, params)
+        for node, error in result.errors.items():
+            self._log("dag", node, f"FAILED - {error}")
+        self.checkpoint.finish("failed" if result.errors else "done")
+        return result
 
     # ═══════════════════════════════════════════════════════════════════════
     # SUMMARY REPORT
@@ -247,21 +747,39 @@ class GunnercookeOrchestrator:
 📋 EXECUTION LOG:
 """
         for entry in self.log[-20:]:  # Last 20 entries
-            summary += f"  [{entry['time'][11:19]}] {entry['pipeline']}: {entry['step']} → {entry['status']}\n"
+            duration = f" ({entry['duration_s']:.1f}s)" if "duration_s" in entry else ""
+            summary += f"  [{entry['time'][11:19]}] {entry['pipeline']}: {entry['step']} → {entry['status']}{duration}\n"
 
         summary += """
 ═══════════════════════════════════════════════════════════════════════════════
 
 📊 RESULTS SUMMARY:
 """
-        if "recruiting" in self.results:
-            summary += f"  • Recruiting: {len(self.results['recruiting'])} candidates processed\n"
-        if "content" in self.results:
-            summary += (
-                f"  • Content: {len(self.results['content'].get('posts', []))} posts generated\n"
+        if self.results.count("candidate"):
+            summary += f"  • Recruiting: {self.results.count('candidate')} candidates processed\n"
+            # Summaries only: the spilled outreach drafts and dossiers are not loaded
+            top = sorted(
+                self.results.summaries("candidate"),
+                key=lambda c: c["total_portable_revenue"] or 0,
+                reverse=True,
             )
-        if "dashboard" in self.results:
-            summary += f"  • Dashboard: {len(self.results['dashboard'].get('risk_alerts', []))} risk alerts\n"
+            for candidate in top[:5]:
+                summary += (
+                    f"      - {candidate['Name']} ({candidate['Current_Firm']}): "
+                    f"€{candidate['total_portable_revenue'] or 0:,.0f}\n"
+                )
+        if "posts" in self.counts:
+            summary += f"  • Content: {self.counts['posts']} posts generated\n"
+        if "risk_alerts" in self.counts:
+            summary += f"  • Dashboard: {self.counts['risk_alerts']} risk alerts\n"
+        if self.counts.get("known"):
+            summary += f"  • Skipped: {self.counts['known']} already processed in earlier runs\n"
+        if self.counts.get("failed"):
+            summary += f"  • Failed: {self.counts['failed']} candidates (retried on resume)\n"
+        if self.timed_out:
+            summary += f"  • Timed out: {len(self.timed_out)} items (partial results)\n"
+            for entry in self.timed_out[:5]:
+                summary += f"      - {entry['pipeline']}/{entry['stage']}: {entry['key']}\n"
 
         return summary
 
@@ -271,16 +789,33 @@ class GunnercookeOrchestrator:
 # ═══════════════════════════════════════════════════════════════════════════
 
 
-async def main():
-    orchestrator = GunnercookeOrchestrator()
+def resume_params(stored: dict) -> dict[str, Any]:
+    """`run_all` arguments from a run's stored parameters (partners are stored as dicts)."""
+    params = dict(stored)
+    if params.get("partners") is not None:
+        params["partners"] = [PartnerFinancials(**p) for p in params["partners"]]
+    return params
+
+
+async def main(resume: str | None = None):
+    orchestrator = GunnercookeOrchestrator(run_id=resume)
+    params: dict[str, Any] = {"partner_name": "Sebastian Förster"}
+    if resume:
+        stored = orchestrator.checkpoint.params()
+        if stored is None:
+            raise SystemExit(f"Unknown run id {resume!r}; nothing to resume.")
+        params = resume_params(stored)
 
     # Demo: Run Content Pipeline
     print("\n" + "█" * 70)
     print("█  GUNNERCOOKE MASTER ORCHESTRATOR (ASYNC)")
+    print(f"█  Run ID: {orchestrator.run_id} (resume with --resume {orchestrator.run_id})")
     print("█" * 70)
 
-    # Example 1: Content Pipeline
-    content_results = await orchestrator.run_content_pipeline("Sebastian Förster")
+    # Example 1: Content Pipeline (pass profiles_text= / partners= to add recruiting and the
+    # dashboard to the same DAG run; they share its signal scan)
+    run = await orchestrator.run_all(**params)
+    content_results = run.get("content", {})
 
     if content_results.get("posts"):
         print("\n" + "═" * 70)
@@ -294,12 +829,24 @@ async def main():
 
     # Print summary
     print(orchestrator.generate_summary())
+    await aclose_client()
+
+    # Results were streamed as they finished; make sure the tail is on disk
+    orchestrator.sink.flush()
+    orchestrator.results.close()
+    print(f"\n💾 Results streamed to {orchestrator.sink.path}")
+    print(f"   View: python -m agents.result_sink --run {orchestrator.run_id}")
 
-    # Save results
-    with open("orchestrator_results.json", "w", encoding="utf-8") as f:
-        json.dump(orchestrator.results, f, indent=2, ensure_ascii=False, default=str)
-    print("\n💾 Results saved to orchestrator_results.json")
+    json_path, prom_path = write_metrics(".")
+    print(f"📈 Metrics saved to {json_path} and {prom_path}")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Run the Gunnercooke agent pipelines.")
+    parser.add_argument(
+        "--resume",
+        metavar="RUN_ID",
+        help="Resume a previous run: completed steps are skipped, failed/pending ones retried",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(resume=args.resume))
@@ -1,6 +1,6 @@
-from typing import List, Optional
+from typing import List, Literal, Optional, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class CandidateProfile(BaseModel):
@@ -39,3 +39,103 @@ class OutreachMessage(BaseModel):
     platform: str = Field("LinkedIn", description="Platform for the message")
     subject: str
     body: str
+
+
+# Response schemas for schema-constrained LLM output (see agents/llm_gateway.py).
+# Field names and aliases mirror the JSON keys the agent prompts already use.
+
+RiskLevel = Literal["HIGH", "MEDIUM", "LOW"]
+
+
+class FrustrationAssessment(BaseModel):
+    """One scored candidate from Agent A (the Glass Ceiling Scout)."""
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    name: str = Field(..., alias="Name")
+    current_firm: str = Field(..., alias="Current_Firm")
+    years_in_role: Optional[Union[int, float]] = Field(None, alias="Years_in_Role")
+    estimated_book_of_business: Optional[Union[str, float]] = Field(
+        None, alias="Estimated_Book_of_Business"
+    )
+    frustration_score: int = Field(..., ge=0, le=100, alias="Frustration_Score")
+    reason_for_score: str = Field("", alias="Reason_for_Score")
+
+
+class ClientRevenue(BaseModel):
+    """A recurring client and its portable revenue estimate."""
+
+    name: str
+    type: Literal["Institutional", "Relationship"]
+    estimated_hours_per_year: float = 0
+    gross_revenue: float = 0
+    portability_factor: float = Field(0, ge=0, le=1)
+    portable_revenue: float = 0
+
+
+class RevenueAnalysis(BaseModel):
+    """Agent B's Portable Book of Business estimate."""
+
+    candidate_name: str
+    clients: List[ClientRevenue] = Field(default_factory=list)
+    total_gross_revenue: float = 0
+    total_portable_revenue: float = 0
+    recommendation: Literal["GO", "NO GO"]
+    reasoning: str = ""
+
+
+class OutreachDraft(BaseModel):
+    """Agent C's personalised outreach message."""
+
+    subject_line: str
+    message_body: str
+    ps_line: str = ""
+    character_count: Optional[int] = None
+
+
+class TopicBrief(BaseModel):
+    """Agent E's topic brief for a market signal."""
+
+    headline: str
+    regulation_or_event: str = ""
+    business_pain: str
+    target_audience: str = ""
+    suggested_angle: str = ""
+    urgency: RiskLevel = "MEDIUM"
+    source_url: Optional[str] = None
+
+
+class LinkedInPostDraft(BaseModel):
+    """Agent F's LinkedIn post."""
+
+    linkedin_post: str
+    character_count: Optional[int] = None
+    hashtags: List[str] = Field(default_factory=list)
+
+
+class EngagementComment(BaseModel):
+    """Agent G's drafted comment on a target CEO's post."""
+
+    sentiment_analysis: Literal["positive", "negative", "neutral"]
+    key_theme: str = ""
+    comment_draft: str
+    strategic_intent: str = ""
+
+
+class RedFlag(BaseModel):
+    """A single problematic clause found by Agent I."""
+
+    clause: str
+    risk_level: RiskLevel
+    current_text: str = ""
+    suggested_edit: str = ""
+    explanation: str = ""
+
+
+class RedFlagReport(BaseModel):
+    """Agent I's contract review against the standard playbook."""
+
+    document_type: str
+    red_flags: List[RedFlag] = Field(default_factory=list)
+    overall_risk: RiskLevel
+    summary: str = ""
@@ -0,0 +1,309 @@
+"""
+ORCHESTRATOR SERVICE
+Long-running service mode: pipelines are jobs in a durable SQLite queue
+(agents/job_queue.py), executed by a pool of async workers in one process, so
+imports and the shared Gemini client are set up once rather than per run.
+Recurring jobs (e.g. the daily dashboard) are scheduled inside the service.
+
+Every job runs on a fresh GunnercookeOrchestrator whose checkpoint run id is
+`job-<id>`, so a retried or recovered job resumes its completed steps. Results
+stream to the usual JSONL sink; the job row keeps only a short summary.
+
+Examples:
+    python orchestrator_service.py serve --workers 2
+    python orchestrator_service.py serve --once            # drain the queue, then exit (cron)
+    python orchestrator_service.py submit content --params '{"partner_name": "Sebastian Förster"}'
+    python orchestrator_service.py submit dashboard --params-file partners.json
+    python orchestrator_service.py submit content --llm-priority bulk   # backfill, yields quota
+    python orchestrator_service.py schedule daily-dashboard dashboard --daily 07:00 \\
+        --params-file partners.json
+    python orchestrator_service.py status [JOB_ID]
+    python orchestrator_service.py cancel JOB_ID
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from agents.agent_k_revenue_predictor import PartnerFinancials
+from agents.job_queue import DEFAULT_QUEUE_PATH, Job, JobQueue
+from agents.llm_gateway import aclose_client
+from agents.llm_scheduler import DEFAULT_CLASSES, llm_priority
+from master_orchestrator import GunnercookeOrchestrator
+
+DEFAULT_WORKERS = int(os.getenv("SERVICE_WORKERS", "2"))
+POLL_INTERVAL = float(os.getenv("SERVICE_POLL_INTERVAL", "1.0"))
+
+
+def _partners(params: dict) -> list[PartnerFinancials]:
+    return [PartnerFinancials(**p) for p in params.get("partners", [])]
+
+
+def _summarize(value) -> Any:
+    """Short job result; the full output is in the streamed results file."""
+    if isinstance(value, list):
+        return {"items": len(value)}
+    if isinstance(value, dict):
+        return {
+            key: len(item) if isinstance(item, list) else item
+            for key, item in value.items()
+            if isinstance(item, (list, str, int, float))
+        }
+    return value
+
+
+async def _content(orchestrator: GunnercookeOrchestrator, params: dict):
+    return await orchestrator.run_content_pipeline(params.get("partner_name", "Senior Partner"))
+
+
+async def _recruiting(orchestrator: GunnercookeOrchestrator, params: dict):
+    return await orchestrator.run_recruiting_pipeline(
+        params["profiles_text"], params.get("sender_name", "Managing Partner")
+    )
+
+
+async def _dashboard(orchestrator: GunnercookeOrchestrator, params: dict):
+    return await orchestrator.run_daily_dashboard(_partners(params))
+
+
+async def _all(orchestrator: GunnercookeOrchestrator, params: dict):
+    params = dict(params)
+    if "partners" in params:
+        params["partners"] = _partners(params)
+    run = await orchestrator.run_all(**params)
+    if run.errors:
+        raise next(iter(run.errors.values()))
+    return {name: run.get(name) for name in ("content", "recruiting", "dashboard") if run.get(name)}
+
+
+PIPELINES = {
+    "content": _content,
+    "recruiting": _recruiting,
+    "dashboard": _dashboard,
+    "all": _all,
+}
+
+
+async def run_job(job: Job) -> dict:
+    orchestrator = GunnercookeOrchestrator(run_id=job.run_id)
+    params = dict(job.params)
+    try:
+        with llm_priority(params.pop("llm_priority", None)):
+            value = await PIPELINES[job.kind](orchestrator, params)
+        if isinstance(value, dict) and value.get("error"):
+            raise RuntimeError(value["error"])
+        summary = {"run_id": job.run_id, **_summarize(value)}
+        if orchestrator.timed_out:
+            summary["timed_out"] = len(orchestrator.timed_out)
+        return summary
+    finally:
+        orchestrator.sink.flush()
+        orchestrator.results.close()
+
+
+async def _worker(queue: JobQueue, name: str, stopping: asyncio.Event, once: bool) -> None:
+    while not stopping.is_set():
+        job = queue.claim(name)
+        if job is None:
+            if once:
+                return
+            try:
+                await asyncio.wait_for(stopping.wait(), POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        print(f"▶️  [{name}] job {job.id} ({job.kind}, attempt {job.attempts})")
+        try:
+            if job.kind not in PIPELINES:
+                raise ValueError(f"Unknown job kind {job.kind!r}")
+            result = await run_job(job)
+        except Exception as e:
+            status = queue.fail(job.id, str(e))
+            print(f"❌ [{name}] job {job.id} failed ({status}): {e}")
+        else:
+            queue.complete(job.id, result)
+            print(f"✅ [{name}] job {job.id} done: {result}")
+
+
+async def _scheduler(queue: JobQueue, stopping: asyncio.Event) -> None:
+    while not stopping.is_set():
+        for job_id in queue.enqueue_due():
+            print(f"⏰ Scheduled job {job_id} queued")
+        try:
+            await asyncio.wait_for(stopping.wait(), POLL_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def serve(queue: JobQueue, workers: int = DEFAULT_WORKERS, once: bool = False) -> None:
+    """
+    Run `workers` job workers until SIGINT/SIGTERM (or, with `once`, until no job is ready).
+
+    A stop signal lets running jobs finish; jobs still running when the process is
+    killed are requeued by `recover()` on the next start.
+    """
+    recovered = queue.recover()
+    if recovered:
+        print(f"♻️  Requeued {recovered} job(s) interrupted by an earlier shutdown")
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stopping.set)
+        except (NotImplementedError, RuntimeError):  # pragma: no cover - Windows / non-main thread
+            pass
+
+    scheduler = None
+    if once:
+        queue.enqueue_due()
+    else:
+        scheduler = asyncio.create_task(_scheduler(queue, stopping), name="service-scheduler")
+    print(f"🛎️  Orchestrator service: {workers} worker(s) on {queue.path}")
+    try:
+        await asyncio.gather(
+            *(_worker(queue, f"worker-{i}", stopping, once) for i in range(1, workers + 1))
+        )
+    finally:
+        stopping.set()
+        if scheduler is not None:
+            await scheduler
+        await aclose_client()
+
+
+def _positive_seconds(value: str) -> float:
+    seconds = float(value)
+    if seconds <= 0:
+        raise argparse.ArgumentTypeError(f"must be a positive number of seconds, got {value}")
+    return seconds
+
+
+def _next_daily(at: str) -> float:
+    hour, minute = (int(part) for part in at.split(":"))
+    now = datetime.now()
+    first = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if first <= now:
+        first += timedelta(days=1)
+    return first.timestamp()
+
+
+def _params(args) -> dict:
+    if args.params_file:
+        with open(args.params_file, encoding="utf-8") as f:
+            params = json.load(f)
+    else:
+        params = json.loads(args.params) if args.params else {}
+    if args.llm_priority:
+        params["llm_priority"] = args.llm_priority
+    return params
+
+
+def _print_job(job: Job) -> None:
+    started = datetime.fromtimestamp(job.created_at).strftime("%Y-%m-%d %H:%M:%S")
+    line = f"#{job.id:<5} {job.kind:<11} {job.status:<9} attempts={job.attempts} {started}"
+    if job.schedule:
+        line += f" schedule={job.schedule}"
+    print(line)
+    if job.error:
+        print(f"       error: {job.error}")
+    if job.result:
+        print(f"       result: {json.dumps(job.result, ensure_ascii=False)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the orchestrator as a job service.")
+    parser.add_argument("--queue", default=os.getenv("JOB_QUEUE_PATH", DEFAULT_QUEUE_PATH))
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_cmd = commands.add_parser("serve", help="Run workers and the scheduler")
+    serve_cmd.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    serve_cmd.add_argument("--once", action="store_true", help="Exit when no job is ready")
+
+    def add_params(cmd):
+        cmd.add_argument("--params", help="Pipeline parameters as JSON")
+        cmd.add_argument("--params-file", help="Pipeline parameters from a JSON file")
+        cmd.add_argument(
+            "--llm-priority",
+            choices=sorted(DEFAULT_CLASSES),
+            help="LLM admission class (default: the pipeline's own, e.g. bulk for backfills)",
+        )
+
+    submit_cmd = commands.add_parser("submit", help="Queue a pipeline run")
+    submit_cmd.add_argument("kind", choices=sorted(PIPELINES))
+    add_params(submit_cmd)
+    submit_cmd.add_argument("--priority", type=int, default=0)
+    submit_cmd.add_argument("--max-attempts", type=int, default=1)
+
+    status_cmd = commands.add_parser("status", help="Show one job, or the most recent jobs")
+    status_cmd.add_argument("job_id", type=int, nargs="?")
+    status_cmd.add_argument("--status", dest="filter_status")
+    status_cmd.add_argument("--limit", type=int, default=20)
+
+    cancel_cmd = commands.add_parser("cancel", help="Cancel a queued job")
+    cancel_cmd.add_argument("job_id", type=int)
+
+    schedule_cmd = commands.add_parser("schedule", help="Create or replace a recurring job")
+    schedule_cmd.add_argument("name")
+    schedule_cmd.add_argument("kind", choices=sorted(PIPELINES))
+    add_params(schedule_cmd)
+    when = schedule_cmd.add_mutually_exclusive_group(required=True)
+    when.add_argument("--every", type=_positive_seconds, metavar="SECONDS")
+    when.add_argument("--daily", metavar="HH:MM")
+
+    commands.add_parser("schedules", help="List recurring jobs")
+    unschedule_cmd = commands.add_parser("unschedule", help="Remove a recurring job")
+    unschedule_cmd.add_argument("name")
+
+    args = parser.parse_args()
+    queue = JobQueue(args.queue)
+
+    if args.command == "serve":
+        asyncio.run(serve(queue, workers=max(1, args.workers), once=args.once))
+    elif args.command == "submit":
+        job_id = queue.submit(
+            args.kind, _params(args), priority=args.priority, max_attempts=args.max_attempts
+        )
+        print(f"📥 Queued job {job_id} ({args.kind})")
+    elif args.command == "status":
+        if args.job_id is not None:
+            job = queue.get(args.job_id)
+            if job is None:
+                raise SystemExit(f"No job {args.job_id}")
+            _print_job(job)
+        else:
+            for job in queue.jobs(args.filter_status, args.limit):
+                _print_job(job)
+    elif args.command == "cancel":
+        if not queue.cancel(args.job_id):
+            raise SystemExit(f"Job {args.job_id} is not queued; nothing cancelled")
+        print(f"🚫 Cancelled job {args.job_id}")
+    elif args.command == "schedule":
+        if args.daily:
+            interval, first = 24 * 3600.0, _next_daily(args.daily)
+        else:
+            interval, first = args.every, time.time()
+        queue.schedule(args.name, args.kind, _params(args), interval, first)
+        print(f"⏰ {args.name}: {args.kind} every {interval:.0f}s, next at {time.ctime(first)}")
+    elif args.command == "schedules":
+        for item in queue.schedules():
+            print(
+                f"{item.name:<20} {item.kind:<11} every {item.interval_s:.0f}s "
+                f"next {time.ctime(item.next_run_at)} last job {item.last_job_id or '-'}"
+            )
+    elif args.command == "unschedule":
+        if not queue.unschedule(args.name):
+            raise SystemExit(f"No schedule {args.name!r}")
+        print(f"🗑️  Removed schedule {args.name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+SHARDED ORCHESTRATOR
+Runs the recruiting and content pipelines with their per-item work spread over
+shard workers (see agents/sharding.py), in other processes or on other hosts.
+
+The coordinator runs Agent A (or Agent E), the ledger and the pre-screen, then
+publishes every candidate (B → C → D) and signal (F) to the broker under a
+stable hash of its key. Each worker serves some of the shards; the coordinator
+merges the results into one sink, results store and summary. Every process
+needs the same `BROKER_URL`; workers on other hosts also need the same
+checkpoint and ledger paths to share resumption and history.
+
+Examples:
+    python orchestrator_shards.py worker --shards 4 --shard 0           # one per shard, any host
+    python orchestrator_shards.py worker --shards 4 --shard 1 --shard 3
+    python orchestrator_shards.py recruiting --profiles-file profiles.txt --shards 4
+    python orchestrator_shards.py recruiting --profiles-file profiles.json --shards 4 \\
+        --local-workers 4                                              # spawn workers here
+    python orchestrator_shards.py content --partner-name "Sebastian Förster" --shards 2 \\
+        --local-workers 2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+from collections import OrderedDict
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from agents.llm_gateway import aclose_client
+from agents.result_sink import NullSink
+from agents.results_store import ResultsStore, spill_path
+from agents.sharding import (
+    DEFAULT_WORKER_CONCURRENCY,
+    ShardDispatcher,
+    Task,
+    open_broker,
+    serve_shards,
+)
+from master_orchestrator import GunnercookeOrchestrator
+
+WORKER_CONCURRENCY = int(os.getenv("SHARD_WORKER_CONCURRENCY", DEFAULT_WORKER_CONCURRENCY))
+# Runs a worker keeps an orchestrator for; the least recently used one is closed first
+WORKER_RUNS_CACHED = int(os.getenv("SHARD_WORKER_RUNS_CACHED", "8"))
+
+_orchestrators: OrderedDict[str, GunnercookeOrchestrator] = OrderedDict()
+
+
+def _worker_orchestrator(run_id: str) -> GunnercookeOrchestrator:
+    """The coordinator's run, as seen by a worker: its results go back through the broker."""
+    orchestrator = _orchestrators.get(run_id)
+    if orchestrator is None:
+        orchestrator = GunnercookeOrchestrator(
+            run_id=run_id,
+            sink=NullSink(),
+            # Never the coordinator's segment, which a worker on the same host would truncate
+            results=ResultsStore(spill_path(f"{run_id}-worker-{os.getpid()}")),
+        )
+        orchestrator.dispatcher = None  # Items a worker claims run here, never dispatched again
+        _orchestrators[run_id] = orchestrator
+        while len(_orchestrators) > max(1, WORKER_RUNS_CACHED):
+            _, evicted = _orchestrators.popitem(last=False)
+            evicted.results.close()
+    _orchestrators.move_to_end(run_id)
+    return orchestrator
+
+
+def _close_orchestrators() -> None:
+    while _orchestrators:
+        _, orchestrator = _orchestrators.popitem()
+        orchestrator.results.close()
+
+
+async def run_candidate(task: Task):
+    """Agents B → C → D for one candidate (None if Agent B says NO GO)."""
+    orchestrator = _worker_orchestrator(task.batch)
+    # The coordinator already ran the ledger and the pre-screen
+    return await orchestrator.process_candidate(
+        task.payload["candidate"], task.payload["sender_name"], screened=True
+    )
+
+
+async def run_post(task: Task):
+    """Agent F for one signal."""
+    orchestrator = _worker_orchestrator(task.batch)
+    return await orchestrator._ghostwrite(task.payload["signal"], task.payload["partner_name"])
+
+
+HANDLERS = {"candidate": run_candidate, "post": run_post}
+
+
+def _worker_shards(shards: int, index: int, count: int) -> list[int]:
+    """Shards of local worker `index` of `count`: every count-th one."""
+    return list(range(index, shards, count))
+
+
+async def work(
+    broker_url: str | None,
+    shards: list[int],
+    concurrency: int = WORKER_CONCURRENCY,
+    idle_exit: float | None = None,
+) -> int:
+    """Serve `shards` until SIGINT/SIGTERM (or `idle_exit` seconds without a task)."""
+    broker = open_broker(broker_url)
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stopping.set)
+        except (NotImplementedError, RuntimeError):  # pragma: no cover - Windows / non-main thread
+            pass
+
+    name = f"{socket.gethostname()}-{os.getpid()}"
+    print(f"🧩 Shard worker {name}: shards {shards}, {concurrency} at a time")
+    try:
+        return await serve_shards(
+            broker,
+            shards,
+            HANDLERS,
+            name=name,
+            concurrency=concurrency,
+            stopping=stopping,
+            idle_exit=idle_exit,
+        )
+    finally:
+        broker.close()
+        _close_orchestrators()
+        await aclose_client()
+
+
+def spawn_workers(
+    count: int, shards: int, broker_url: str | None, concurrency: int = WORKER_CONCURRENCY
+) -> list[subprocess.Popen]:
+    """Start `count` local worker processes that together serve all `shards`."""
+    workers = []
+    for index in range(min(count, shards)):
+        command = [sys.executable, os.path.abspath(__file__)]
+        if broker_url:
+            command += ["--broker", broker_url]
+        command += ["worker", "--shards", str(shards), "--concurrency", str(concurrency)]
+        for shard in _worker_shards(shards, index, count):
+            command += ["--shard", str(shard)]
+        workers.append(subprocess.Popen(command, stdout=subprocess.DEVNULL))
+    return workers
+
+
+def stop_workers(workers: list[subprocess.Popen]) -> None:
+    for process in workers:
+        process.terminate()  # SIGTERM: finish running tasks, then exit
+    for process in workers:
+        process.wait()
+
+
+def _profiles(path: str) -> str | list[dict]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f) if path.endswith(".json") else f.read()
+
+
+async def coordinate(args) -> None:
+    dispatcher = ShardDispatcher(
+        open_broker(args.broker), args.shards, worker_concurrency=args.concurrency
+    )
+    orchestrator = GunnercookeOrchestrator(dispatcher=dispatcher)
+    print(f"🧩 Run {orchestrator.run_id}: {args.shards} shard(s) via {args.broker or 'BROKER_URL'}")
+    try:
+        if args.command == "recruiting":
+            await orchestrator.run_recruiting_pipeline(
+                _profiles(args.profiles_file), args.sender_name
+            )
+        else:
+            await orchestrator.run_content_pipeline(args.partner_name)
+        print(orchestrator.generate_summary())
+    finally:
+        await aclose_client()
+        orchestrator.sink.flush()
+        orchestrator.results.close()
+        dispatcher.broker.close()
+    print(f"\n💾 Results streamed to {orchestrator.sink.path}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the pipelines across shard workers.")
+    parser.add_argument("--broker", help="Broker URL (default: BROKER_URL)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_sharding(cmd):
+        cmd.add_argument("--shards", type=int, default=int(os.getenv("SHARDS", "0") or 1))
+        cmd.add_argument(
+            "--concurrency", type=int, default=WORKER_CONCURRENCY, help="Tasks per worker"
+        )
+
+    worker_cmd = commands.add_parser("worker", help="Serve one or more shards")
+    add_sharding(worker_cmd)
+    worker_cmd.add_argument(
+        "--shard", type=int, action="append", help="Shard to serve (repeatable; default: all)"
+    )
+    worker_cmd.add_argument(
+        "--idle-exit", type=float, metavar="SECONDS", help="Exit after this long without work"
+    )
+
+    recruiting_cmd = commands.add_parser("recruiting", help="Coordinate a recruiting run")
+    recruiting_cmd.add_argument(
+        "--profiles-file", required=True, help="Profile text, or a JSON list of profiles"
+    )
+    recruiting_cmd.add_argument("--sender-name", default="Managing Partner")
+    content_cmd = commands.add_parser("content", help="Coordinate a content run")
+    content_cmd.add_argument("--partner-name", default="Senior Partner")
+    for cmd in (recruiting_cmd, content_cmd):
+        add_sharding(cmd)
+        cmd.add_argument(
+            "--local-workers",
+            type=int,
+            default=0,
+            metavar="N",
+            help="Also start N worker processes on this host for the run",
+        )
+
+    args = parser.parse_args()
+    args.shards = max(1, args.shards)
+    if args.command == "worker":
+        shards = args.shard if args.shard else list(range(args.shards))
+        asyncio.run(work(args.broker, shards, max(1, args.concurrency), args.idle_exit))
+        return
+
+    workers = spawn_workers(args.local_workers, args.shards, args.broker, args.concurrency)
+    try:
+        asyncio.run(coordinate(args))
+    finally:
+        stop_workers(workers)
+
+
+if __name__ == "__main__":
+    main()
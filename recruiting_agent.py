@@ -1,11 +1,11 @@
 import os
-import time
 from datetime import datetime
 
 import trafilatura
-from ddgs import DDGS
 from dotenv import load_dotenv
-from google import genai
+
+from agents.llm_gateway import generate_text
+from agents.search_gateway import search_text
 
 # Load environment variables
 load_dotenv()
@@ -15,8 +15,6 @@ GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 if not GOOGLE_API_KEY:
     raise ValueError("GOOGLE_API_KEY not found in .env file")
 
-client = genai.Client(api_key=GOOGLE_API_KEY)
-
 
 def search_legal_news(country="USA", max_results=5):
     """
@@ -40,36 +38,37 @@ def search_legal_news(country="USA", max_results=5):
     # --- 1. Primary: DuckDuckGo Specific ---
     print(f"Attempting Primary Search (DDG Specific): {primary_query}")
     try:
-        with DDGS() as ddgs:
-            ddg_results = ddgs.text(primary_query, region=region, max_results=max_results)
-            if ddg_results:
-                for r in ddg_results:
-                    results.append(
-                        {"title": r.get("title"), "href": r.get("href"), "body": r.get("body")}
-                    )
-                print(f"  ✅ DDG Specific found {len(results)} results.")
-                return results
-            else:
-                print("  ⚠️ DDG Specific returned no results.")
+        ddg_results = search_text(
+            primary_query, region=region, max_results=max_results, agent="recruiting_agent"
+        )
+        if ddg_results:
+            for r in ddg_results:
+                results.append(
+                    {"title": r.get("title"), "href": r.get("href"), "body": r.get("body")}
+                )
+            print(f"  ✅ DDG Specific found {len(results)} results.")
+            return results
+        else:
+            print("  ⚠️ DDG Specific returned no results.")
     except Exception as e:
         print(f"  ❌ DDG Specific failed: {e}")
 
     # --- 2. Secondary: DuckDuckGo Broad ---
     print(f"Attempting Secondary Search (DDG Broad): {secondary_query}")
     try:
-        # Short sleep to be nice
-        time.sleep(2)
-        with DDGS() as ddgs:
-            ddg_results = ddgs.text(secondary_query, region=region, max_results=max_results)
-            if ddg_results:
-                for r in ddg_results:
-                    results.append(
-                        {"title": r.get("title"), "href": r.get("href"), "body": r.get("body")}
-                    )
-                print(f"  ✅ DDG Broad found {len(results)} results.")
-                return results
-            else:
-                print("  ⚠️ DDG Broad returned no results.")
+        # The search gateway spaces requests to DDGS out
+        ddg_results = search_text(
+            secondary_query, region=region, max_results=max_results, agent="recruiting_agent"
+        )
+        if ddg_results:
+            for r in ddg_results:
+                results.append(
+                    {"title": r.get("title"), "href": r.get("href"), "body": r.get("body")}
+                )
+            print(f"  ✅ DDG Broad found {len(results)} results.")
+            return results
+        else:
+            print("  ⚠️ DDG Broad returned no results.")
     except Exception as e:
         print(f"  ❌ DDG Broad failed: {e}")
 
@@ -108,8 +107,8 @@ def is_relevant(text):
     """
     try:
         # Use a cheaper/faster model for this check
-        response = client.models.generate_content(model="gemini-3-flash", contents=prompt)
-        return "YES" in (response.text or "").upper()
+        answer = generate_text("gemini-3-flash", prompt, agent="recruiting_agent")
+        return "YES" in answer.upper()
     except Exception:
         return True  # Fallback to include if check fails
 
@@ -185,8 +184,7 @@ def generate_linkedin_posts(articles_text, country):
 
     try:
         # Switching to Gemini 3 Flash Preview as currently active/working
-        response = client.models.generate_content(model="gemini-3-flash", contents=prompt)
-        return response.text
+        return generate_text("gemini-3-flash", prompt, agent="recruiting_agent")
     except Exception as e:
         return f"Error gathering generation: {e}"
 
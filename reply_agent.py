@@ -2,7 +2,8 @@ import os
 import sys
 
 from dotenv import load_dotenv
-from google import genai
+
+from agents.llm_gateway import generate_text
 
 # Load env
 load_dotenv()
@@ -10,8 +11,6 @@ GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 if not GOOGLE_API_KEY:
     raise ValueError("GOOGLE_API_KEY is missing")
 
-client = genai.Client(api_key=GOOGLE_API_KEY)
-
 
 def generate_replies(input_text):
     prompt = f"""
@@ -35,8 +34,7 @@ def generate_replies(input_text):
     """
 
     try:
-        response = client.models.generate_content(model="gemini-3-flash", contents=prompt)
-        return response.text
+        return generate_text("gemini-3-flash", prompt, agent="reply_agent")
     except Exception as e:
         return f"Error: {e}"
 
@@ -0,0 +1,79 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from agents import backends, llm_gateway, model_health, search_gateway
+from agents.backends import Backend, FixtureNotFoundError, LatencyModel
+from models import RevenueAnalysis, TopicBrief
+
+
+@pytest.fixture
+def use_backend(monkeypatch, tmp_path):
+    # The gateway consults the circuit breaker; keep its SQLite file out of the repo
+    monkeypatch.setenv("MODEL_HEALTH_PATH", str(tmp_path / "model_health.sqlite3"))
+    monkeypatch.setattr(model_health, "_breaker", None)
+
+    def install(backend):
+        monkeypatch.setattr(backends, "_backend", backend)
+        monkeypatch.setattr(llm_gateway, "_client", None)
+        return backend
+
+    return install
+
+
+def test_latency_specs_parse_and_sample():
+    rng = random.Random(1)
+    assert LatencyModel("fixed:0.5", scale=2).sample(rng) == 1.0
+    assert LatencyModel("recorded").sample(rng, recorded=1.25) == 1.25
+    assert all(0.2 <= LatencyModel("uniform:0.2:0.4").sample(rng) <= 0.4 for _ in range(50))
+    assert LatencyModel("lognormal:1:0.5").sample(rng) > 0
+    for spec in ("gamma:1", "fixed", "uniform:a:b"):
+        with pytest.raises(ValueError):
+            LatencyModel(spec)
+
+
+def test_synthetic_answers_validate_and_follow_prompt_urls(use_backend):
+    use_backend(Backend("synthetic", llm_latency="none", seed="bench"))
+    prompt = "Brief these.\nURL: https://n/1\nURL: https://n/2\nURL: https://n/3\n"
+
+    briefs = llm_gateway.generate_structured("m", prompt, list[TopicBrief], agent="agent_e")
+    assert [brief["source_url"] for brief in briefs] == [
+        "https://n/1",
+        "https://n/2",
+        "https://n/3",
+    ]
+
+    analysis = llm_gateway.generate_structured("m", "deal sheet", RevenueAnalysis)
+    assert analysis["recommendation"] in ("GO", "NO GO")
+    assert llm_gateway.generate_structured("m", "deal sheet", RevenueAnalysis) == analysis
+    assert len(llm_gateway.generate_text("m", "Suggest interview slots please").splitlines()) == 10
+
+
+def test_recorded_traffic_replays_without_the_live_client(monkeypatch, tmp_path, use_backend):
+    calls = []
+
+    def live_generate(*, model, contents, config=None):
+        calls.append(contents)
+        return SimpleNamespace(text=f"live answer to {contents}", usage_metadata=None)
+
+    live_client = SimpleNamespace(
+        models=SimpleNamespace(generate_content=live_generate),
+        aio=SimpleNamespace(models=None, aclose=None),
+        close=lambda: None,
+    )
+    monkeypatch.setattr(llm_gateway, "_build_live_client", lambda: live_client)
+    news = [{"title": "Insolvenz", "url": "https://n/1"}]
+    monkeypatch.setattr(search_gateway, "_ddgs_call", lambda *args: news)
+
+    use_backend(Backend("record", fixtures_dir=str(tmp_path)))
+    assert llm_gateway.generate_text("m", "hello") == "live answer to hello"
+    assert search_gateway.search_news("insolvenz") == news
+
+    monkeypatch.setattr(search_gateway, "_ddgs_call", lambda *args: pytest.fail("went live"))
+    use_backend(Backend("replay", fixtures_dir=str(tmp_path), llm_latency="fixed:0"))
+    assert llm_gateway.generate_text("m", "hello") == "live answer to hello"
+    assert search_gateway.search_news("insolvenz") == news
+    assert calls == ["hello"]
+    with pytest.raises(FixtureNotFoundError):
+        llm_gateway.generate_text("m", "never recorded")
@@ -0,0 +1,186 @@
+import asyncio
+
+import pytest
+
+from agents.agent_k_revenue_predictor import PartnerFinancials
+from agents.checkpoints import CheckpointStore, RunCheckpointer
+from agents.dag import DAGResult
+from agents.entity_ledger import EntityLedger
+from agents.result_sink import ResultSink
+from agents.stage_queue import run_stages
+from master_orchestrator import GunnercookeOrchestrator, resume_params
+
+
+def test_store_keeps_run_params_and_step_payloads(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.sqlite3"))
+    store.start_run("run-1", {"partner_name": "P"})
+    store.start_run("run-1", {"partner_name": "ignored on resume"})
+    store.record("run-1", "agent_b", "Anna|Firm", "done", payload={"score": 80})
+    store.record("run-1", "agent_b", "Ben|Firm", "failed", error="boom")
+
+    assert store.run_params("run-1") == {"partner_name": "P"}
+    assert store.run_params("unknown") is None
+    assert store.load("run-1", "agent_b", "Anna|Firm") == (True, {"score": 80})
+    assert store.load("run-1", "agent_b", "Ben|Firm") == (False, None)
+    assert store.load("run-2", "agent_b", "Anna|Firm") == (False, None)
+    assert store.summary("run-1") == {"agent_b": {"done": 1, "failed": 1}}
+
+
+def test_resume_skips_done_steps_and_retries_failed_ones(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.sqlite3"))
+    calls = []
+
+    async def work(key, fail):
+        calls.append(key)
+        if fail:
+            raise RuntimeError(f"{key} failed")
+        return key.upper()
+
+    async def run(fail_b):
+        checkpoint = RunCheckpointer(store, "run-1")
+        results = []
+        for key in ("a", "b"):
+            try:
+                results.append(
+                    await checkpoint.step("stage", key, lambda k=key: work(k, fail_b and k == "b"))
+                )
+            except RuntimeError:
+                results.append(None)
+        return results
+
+    assert asyncio.run(run(fail_b=True)) == ["A", None]
+    assert asyncio.run(run(fail_b=False)) == ["A", "B"]
+    assert calls == ["a", "b", "b"]
+
+
+def test_orchestrator_resume_reruns_only_unfinished_candidate_stages(tmp_path, monkeypatch):
+    store = CheckpointStore(str(tmp_path / "checkpoints.sqlite3"))
+    calls = []
+    fail_outreach = {"Ben"}
+
+    async def profile(candidate):
+        calls.append(("b", candidate["Name"]))
+        return {"candidate": candidate, "revenue_analysis": {}}
+
+    async def outreach(result, sender_name):
+        name = result["candidate"]["Name"]
+        calls.append(("c", name))
+        if name in fail_outreach:
+            raise RuntimeError("rate limited")
+        return result
+
+    async def schedule(result):
+        calls.append(("d", result["candidate"]["Name"]))
+        return result["candidate"]["Name"]
+
+    monkeypatch.setattr(GunnercookeOrchestrator, "_profile_candidate", staticmethod(profile))
+    monkeypatch.setattr(GunnercookeOrchestrator, "_draft_outreach", staticmethod(outreach))
+    monkeypatch.setattr(GunnercookeOrchestrator, "_schedule_interview", staticmethod(schedule))
+    candidates = [{"Name": "Anna", "Current_Firm": "X"}, {"Name": "Ben", "Current_Firm": "Y"}]
+
+    def run():
+        orchestrator = GunnercookeOrchestrator(
+            run_id="run-1",
+            store=store,
+            sink=ResultSink(str(tmp_path / "results.jsonl")),
+            ledger=EntityLedger(str(tmp_path / "entities.sqlite3")),
+        )
+        return asyncio.run(run_stages(candidates, orchestrator._candidate_stages("S")))
+
+    with pytest.raises(RuntimeError, match="rate limited"):
+        run()
+    calls.clear()
+    fail_outreach.clear()
+
+    assert run() == ["Anna", "Ben"]
+    assert calls == [("c", "Ben"), ("d", "Ben")]
+
+
+def test_agent_error_results_fail_the_step_instead_of_passing_through(tmp_path, monkeypatch):
+    store = CheckpointStore(str(tmp_path / "checkpoints.sqlite3"))
+    outreach_errors = {"Ben": "quota exceeded"}
+
+    async def analyze_book(deal_sheet, name):
+        return {"total_portable_revenue": 300_000, "recommendation": "GO"}
+
+    async def outreach(**kwargs):
+        name = kwargs["candidate_name"]
+        if name in outreach_errors:
+            return {"error": outreach_errors[name]}
+        return {"message": f"Hello {name}"}
+
+    async def schedule(self, result):
+        result["scheduling"] = {"slot": "Mon 10:00"}
+        return result
+
+    monkeypatch.setattr("master_orchestrator.analyze_book_of_business_async", analyze_book)
+    monkeypatch.setattr("master_orchestrator.generate_outreach_async", outreach)
+    monkeypatch.setattr(GunnercookeOrchestrator, "_schedule_interview", schedule)
+    candidates = [
+        {
+            "Name": name,
+            "Current_Firm": "X",
+            "Years_in_Role": 6,
+            "Estimated_Book_of_Business": "Unknown",
+            "Reason_for_Score": "Passed over",
+        }
+        for name in ("Anna", "Ben")
+    ]
+
+    def run():
+        orchestrator = GunnercookeOrchestrator(
+            run_id="run-1",
+            store=store,
+            sink=ResultSink(str(tmp_path / "results.jsonl")),
+            ledger=EntityLedger(str(tmp_path / "entities.sqlite3")),
+        )
+        results = asyncio.run(run_stages(candidates, orchestrator._candidate_stages("S")))
+        return [result and result["outreach"]["message"] for result in results], orchestrator
+
+    messages, orchestrator = run()
+    assert messages == ["Hello Anna", None]  # Ben is dropped; Anna is unaffected
+    assert orchestrator.counts["failed"] == 1
+    assert store.summary("run-1")["agent_c"] == {"done": 1, "failed": 1}
+
+    outreach_errors.clear()
+    messages, _ = run()
+    assert messages == ["Hello Anna", "Hello Ben"]
+
+
+def test_resumed_run_all_keeps_the_dashboard_partners(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.sqlite3"))
+    partners = [
+        PartnerFinancials(
+            name="P. Partner",
+            start_date="2026-01-01",
+            monthly_draw=10_000,
+            months_active=3,
+            cash_collected=[2_000, 4_000, 5_000],
+            pipeline_value=80_000,
+            pipeline_probability=0.5,
+        )
+    ]
+    runs = []
+
+    def orchestrator():
+        instance = GunnercookeOrchestrator(
+            run_id="run-1",
+            store=store,
+            sink=ResultSink(str(tmp_path / "results.jsonl")),
+            ledger=EntityLedger(str(tmp_path / "entities.sqlite3")),
+        )
+
+        async def run(targets, params):
+            runs.append((targets, params.get("partners")))
+            return DAGResult()
+
+        instance.dag.run = run
+        return instance
+
+    asyncio.run(orchestrator().run_all(partner_name="P", partners=partners))
+    # `main --resume run-1` calls run_all with the stored parameters
+    resumed = orchestrator()
+    asyncio.run(resumed.run_all(**resume_params(resumed.checkpoint.params())))
+
+    assert runs == [(["content", "dashboard"], partners)] * 2
+    assert all(isinstance(p, PartnerFinancials) for _, stored in runs for p in stored)
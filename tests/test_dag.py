@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from agents.dag import DAG, DAGError
+
+
+def test_shared_nodes_run_once_and_independent_nodes_overlap():
+    calls = []
+    running = {"now": 0, "peak": 0}
+
+    async def step(name, value):
+        calls.append(name)
+        running["now"] += 1
+        running["peak"] = max(running["peak"], running["now"])
+        await asyncio.sleep(0.01)
+        running["now"] -= 1
+        return value
+
+    dag = DAG()
+    dag.add("scan", lambda: step("scan", [1, 2]), outputs=["signals"])
+    dag.add(
+        "posts",
+        lambda signals, author: step("posts", f"{author}:{len(signals)}"),
+        inputs=["signals", "author"],
+    )
+    dag.add("risk", lambda partners: step("risk", partners[:1]), inputs=["partners"])
+    dag.add(
+        "dashboard",
+        lambda risk, signals: step("dashboard", (risk, signals)),
+        inputs=["risk", "signals"],
+    )
+
+    result = asyncio.run(dag.run(["posts", "dashboard"], {"author": "me", "partners": ["p"]}))
+
+    assert result["posts"] == "me:2"
+    assert result["dashboard"] == (["p"], [1, 2])
+    assert calls.count("scan") == 1
+    assert running["peak"] >= 2
+    assert not result.errors
+
+
+def test_failure_skips_downstream_but_not_independent_branches():
+    async def boom():
+        raise RuntimeError("scan failed")
+
+    async def ok():
+        return "fine"
+
+    async def echo(signals):
+        return signals
+
+    dag = DAG()
+    dag.add("scan", boom, outputs=["signals"])
+    dag.add("content", echo, inputs=["signals"])
+    dag.add("risk", ok)
+
+    result = asyncio.run(dag.run(["content", "risk"]))
+
+    assert result["risk"] == "fine"
+    assert isinstance(result.errors["scan"], RuntimeError)
+    assert isinstance(result.errors["content"], DAGError)
+
+
+def test_plan_rejects_missing_inputs_and_cycles():
+    async def noop(**kwargs):
+        return None
+
+    dag = DAG()
+    dag.add("a", noop, inputs=["b"])
+    dag.add("b", noop, inputs=["a"])
+    dag.add("c", noop, inputs=["missing"])
+
+    with pytest.raises(DAGError, match="Cycle"):
+        dag.plan(["a"])
+    with pytest.raises(DAGError, match="missing"):
+        dag.plan(["c"])
+    assert dag.plan(["c"], params=["missing"]) == ["c"]
@@ -0,0 +1,65 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from agents.deadlines import DeadlineExceeded, check_cancelled, deadline_scope
+from agents.executors import run_in
+from agents.stage_queue import Stage, run_stages
+
+
+async def _sleep_for(item):
+    await asyncio.sleep(item)
+    return item
+
+
+def test_item_timeout_in_partial_mode_keeps_the_other_items():
+    timed_out = []
+    results = asyncio.run(
+        run_stages([0, 5, 0], [Stage("slow", _sleep_for, timeout=0.05)], timed_out=timed_out)
+    )
+
+    assert results == [0, None, 0]
+    assert [(entry["stage"], entry["item"]) for entry in timed_out] == [("slow", 5)]
+
+
+def test_batch_deadline_returns_finished_items_and_lists_in_flight_ones():
+    timed_out = []
+    results = asyncio.run(
+        run_stages(
+            [0, 0.01, 5, 5],
+            [Stage("slow", _sleep_for, concurrency=4, timeout=0)],
+            deadline=0.2,
+            timed_out=timed_out,
+        )
+    )
+
+    assert results == [0, 0.01, None, None]
+    assert sorted(entry["item"] for entry in timed_out) == [5, 5]
+
+
+def test_deadline_fails_the_batch_without_partial_mode():
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(run_stages([5], [Stage("slow", _sleep_for, timeout=0.05)]))
+
+
+def test_thread_sees_cancellation_once_its_scope_expires():
+    stopped = threading.Event()
+
+    def blocking_loop():
+        for _ in range(500):
+            try:
+                check_cancelled()
+            except DeadlineExceeded:
+                stopped.set()
+                return
+            time.sleep(0.01)
+
+    async def scenario():
+        with pytest.raises(DeadlineExceeded):
+            async with deadline_scope(0.05, "agent_e"):
+                await run_in("web_io", blocking_loop)
+
+    asyncio.run(scenario())
+    assert stopped.wait(1)
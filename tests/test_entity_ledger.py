@@ -0,0 +1,124 @@
+import asyncio
+import time
+
+from agents.checkpoints import CheckpointStore
+from agents.entity_ledger import (
+    CHANGED,
+    KNOWN,
+    NEW,
+    STALE,
+    EntityLedger,
+    candidate_identity,
+    canonical_url,
+)
+from agents.result_sink import ResultSink
+from agents.stage_queue import Stage, run_stages
+from master_orchestrator import GunnercookeOrchestrator
+
+
+def test_keys_ignore_formatting_differences():
+    assert candidate_identity(
+        {"Name": "Dr. Anna Müller", "Current_Firm": "Freshfields Bruckhaus Deringer LLP"}
+    ) == candidate_identity({"name": "anna  muller", "firm": "Freshfields Bruckhaus Deringer"})
+    assert (
+        canonical_url("http://www.Example.com/news/item/?utm_source=x&id=7#top")
+        == canonical_url("https://example.com/news/item?id=7")
+        == "https://example.com/news/item?id=7"
+    )
+
+
+def test_recall_states(tmp_path):
+    ledger = EntityLedger(str(tmp_path / "entities.sqlite3"), freshness_days={"signal": 1})
+    assert ledger.recall("signal", "a", "h1").state == NEW
+
+    ledger.record("signal", "a", "h1", {"headline": "A"}, run_id="run-1")
+    recall = ledger.recall("signal", "a", "h1")
+    assert recall.state == KNOWN
+    assert recall.entry.data == {"headline": "A"}
+    assert ledger.recall("signal", "a", "h2").state == CHANGED
+    assert ledger.recall("signal", "a", "h1", now=time.time() + 2 * 86400).state == STALE
+    # A run does not skip the entities it recorded itself (e.g. when it is resumed)
+    assert ledger.recall("signal", "a", "h1", run_id="run-1").state == NEW
+
+
+def _orchestrator(tmp_path, ledger):
+    return GunnercookeOrchestrator(
+        store=CheckpointStore(str(tmp_path / "checkpoints.sqlite3")),
+        sink=ResultSink(str(tmp_path / "results.jsonl")),
+        ledger=ledger,
+    )
+
+
+def test_second_run_skips_known_candidates_and_refreshes_stale_ones(tmp_path, monkeypatch):
+    monkeypatch.setenv("RESULTS_SPILL_DIR", str(tmp_path))
+    ledger = EntityLedger(str(tmp_path / "entities.sqlite3"))
+    calls = []
+
+    async def analyze_book(deal_sheet, name):
+        calls.append(("b", name))
+        return {"total_portable_revenue": 300_000, "recommendation": "GO"}
+
+    async def stage(result, *args):
+        calls.append(("cd", result["candidate"]["Name"]))
+        return result
+
+    candidate = {
+        "Name": "Anna",
+        "Current_Firm": "X",
+        "Years_in_Role": 6,
+        "Estimated_Book_of_Business": "Unknown",
+        "Reason_for_Score": "Passed over",
+    }
+
+    monkeypatch.setattr("master_orchestrator.analyze_book_of_business_async", analyze_book)
+
+    def run():
+        orchestrator = _orchestrator(tmp_path, ledger)
+        monkeypatch.setattr(orchestrator, "_draft_outreach", stage)
+        monkeypatch.setattr(orchestrator, "_schedule_interview", stage)
+        stages = orchestrator._candidate_stages("S")
+        stages.append(Stage("spill", orchestrator._spill_candidate))
+        [result] = asyncio.run(run_stages([dict(candidate)], stages))
+        orchestrator.results.close()
+        return result
+
+    assert run() is not None
+    assert calls == [("b", "Anna"), ("cd", "Anna"), ("cd", "Anna")]
+
+    calls.clear()
+    assert run() is None  # Processed within the window: skipped outright
+    assert calls == []
+
+    ledger.freshness_days["candidate"] = 0
+    assert run() is not None  # Stale: Agent B's analysis is reused, C and D run again
+    assert calls == [("cd", "Anna"), ("cd", "Anna")]
+
+
+def test_only_real_verdicts_are_remembered(tmp_path, monkeypatch):
+    ledger = EntityLedger(str(tmp_path / "entities.sqlite3"))
+    analyses = {
+        "Anna": {"total_portable_revenue": 50_000, "recommendation": "NO GO"},
+        "Ben": {"total_portable_revenue": 0},  # No verdict: nothing to remember
+        "Cleo": {"error": "quota exceeded"},
+    }
+
+    async def analyze_book(deal_sheet, name):
+        return analyses[name]
+
+    monkeypatch.setattr("master_orchestrator.analyze_book_of_business_async", analyze_book)
+    orchestrator = _orchestrator(tmp_path, ledger)
+    candidates = [
+        {
+            "Name": name,
+            "Current_Firm": "X",
+            "Years_in_Role": 6,
+            "Estimated_Book_of_Business": "Unknown",
+            "Reason_for_Score": "Passed over",
+        }
+        for name in analyses
+    ]
+    assert asyncio.run(run_stages(candidates, orchestrator._candidate_stages("S"))) == [None] * 3
+    orchestrator.results.close()
+
+    remembered = [ledger.get("candidate", candidate_identity(c)) for c in candidates]
+    assert [entry and entry.status for entry in remembered] == ["rejected", None, None]
@@ -0,0 +1,49 @@
+import asyncio
+import threading
+import time
+
+from agents.executors import ResourceExecutor, get_executor, run_in
+from agents.metrics import current_pipeline, get_metrics, pipeline_context
+
+
+def test_saturated_class_does_not_block_other_classes():
+    release = threading.Event()
+
+    async def scenario():
+        slow = [asyncio.ensure_future(run_in("llm_io", release.wait, 5)) for _ in range(40)]
+        await asyncio.sleep(0.05)
+        # llm_io is full and backed up; cpu work still runs right away
+        assert await asyncio.wait_for(run_in("cpu", sum, [1, 2, 3]), 1) == 6
+        assert get_executor("llm_io").queue_depth > 0
+        release.set()
+        await asyncio.gather(*slow)
+
+    asyncio.run(scenario())
+    assert get_executor("llm_io").queue_depth == 0
+
+
+def test_queue_depth_and_active_are_published_as_gauges():
+    executor = ResourceExecutor("test_pool", workers=1)
+    gate = threading.Event()
+    futures = [executor.submit(gate.wait, 5) for _ in range(3)]
+
+    while executor.active < 1:
+        time.sleep(0.001)
+    metrics = get_metrics()
+    assert metrics.gauge_value("executor_active", executor="test_pool") == 1
+    assert metrics.gauge_value("executor_queue_depth", executor="test_pool") == 2
+
+    gate.set()
+    for future in futures:
+        future.result()
+    assert metrics.gauge_value("executor_queue_depth", executor="test_pool") == 0
+    assert metrics.gauge_value("executor_active", executor="test_pool") == 0
+    executor.shutdown()
+
+
+def test_thread_pools_carry_the_pipeline_label():
+    async def scenario():
+        with pipeline_context("dashboard"):
+            return await run_in("cpu", current_pipeline)
+
+    assert asyncio.run(scenario()) == "dashboard"
@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+import orchestrator_service
+from agents.job_queue import CANCELLED, DONE, FAILED, QUEUED, JobQueue
+
+
+def test_jobs_are_claimed_once_by_priority_then_age(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"))
+    first = queue.submit("content")
+    urgent = queue.submit("dashboard", priority=5)
+    later = queue.submit("content", run_at=10**12)
+
+    claimed = [queue.claim("w1"), queue.claim("w2"), queue.claim("w3")]
+
+    assert [job.id if job else None for job in claimed] == [urgent, first, None]
+    assert queue.get(later).status == QUEUED
+    assert queue.cancel(later) and queue.get(later).status == CANCELLED
+    assert not queue.cancel(first)  # Already running
+
+
+def test_failed_job_is_retried_until_max_attempts_and_recovered_after_crash(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    queue = JobQueue(path)
+    job_id = queue.submit("recruiting", {"profiles_text": "x"}, max_attempts=2)
+
+    assert queue.fail(queue.claim("w1").id, "429") == QUEUED
+    queue._conn.execute("UPDATE jobs SET available_at = 0")  # Skip the retry backoff
+    retry = queue.claim("w1")
+    assert (retry.id, retry.attempts, retry.run_id) == (job_id, 2, f"job-{job_id}")
+
+    # The process dies mid-job; the next service start requeues it
+    assert JobQueue(path).recover() == 1
+    assert queue.fail(queue.claim("w2").id, "boom") == FAILED
+    assert queue.get(job_id).error == "boom"
+
+
+def test_due_schedule_enqueues_once_and_skips_missed_runs(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"))
+    queue.schedule("daily-dashboard", "dashboard", {"partners": []}, 100.0, first_run_at=1000.0)
+
+    assert len(queue.enqueue_due(now=1350.0)) == 1
+    assert queue.enqueue_due(now=1350.0) == []
+    [schedule] = queue.schedules()
+    assert schedule.next_run_at == 1400.0
+    assert queue.get(schedule.last_job_id).schedule == "daily-dashboard"
+
+
+def test_schedule_rejects_non_positive_intervals(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"))
+    for interval in (0.0, -60.0):
+        with pytest.raises(ValueError, match="must be positive"):
+            queue.schedule("broken", "content", None, interval)
+    assert queue.schedules() == []
+
+
+def test_service_once_drains_the_queue(tmp_path, monkeypatch):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"))
+    ok = queue.submit("content")
+    bad = queue.submit("content", {"fail": True})
+
+    async def fake_run_job(job):
+        if job.params.get("fail"):
+            raise RuntimeError("no signals")
+        return {"run_id": job.run_id, "posts": 3}
+
+    monkeypatch.setattr(orchestrator_service, "run_job", fake_run_job)
+    monkeypatch.setattr(orchestrator_service, "aclose_client", lambda: asyncio.sleep(0))
+    asyncio.run(orchestrator_service.serve(queue, workers=2, once=True))
+
+    assert queue.get(ok).status == DONE
+    assert queue.get(ok).result == {"run_id": f"job-{ok}", "posts": 3}
+    assert (queue.get(bad).status, queue.get(bad).error) == (FAILED, "no signals")
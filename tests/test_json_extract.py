@@ -0,0 +1,37 @@
+import pytest
+
+from agents.json_extract import IncrementalJSONParser, extract_json
+from agents.llm_gateway import StructuredOutputError, parse_structured
+from models import FrustrationAssessment, RevenueAnalysis
+
+
+def test_extract_json_handles_prose_fences_and_trailing_commas():
+    text = 'Sure, here it is:\n```json\n{"a": [1, 2,], "b": "x, }",}\n```\nAnything else?'
+    assert extract_json(text) == {"a": [1, 2], "b": "x, }"}
+    assert extract_json('Result: [{"a": 1}] -- done') == [{"a": 1}]
+
+
+def test_extract_json_closes_truncated_output():
+    assert extract_json('{"clients": [{"name": "Bank", "type": "Instit') == {
+        "clients": [{"name": "Bank", "type": "Instit"}]
+    }
+    with pytest.raises(ValueError):
+        extract_json("no json here")
+
+
+def test_incremental_parser_yields_array_items_as_they_close():
+    parser = IncrementalJSONParser()
+    chunks = ['[{"Name": "A", "note": "has ] and }"}', ', {"Na', 'me": "B"}', "]"]
+    seen = [parser.feed(chunk) for chunk in chunks]
+    assert seen == [[{"Name": "A", "note": "has ] and }"}], [], [{"Name": "B"}], []]
+
+
+def test_parse_structured_validates_and_keeps_prompt_keys():
+    text = '[{"Name": "A", "Current_Firm": "F", "Frustration_Score": "85"}]'
+    [candidate] = parse_structured(text, list[FrustrationAssessment])
+    assert candidate["Frustration_Score"] == 85
+    assert candidate["Current_Firm"] == "F"
+
+    with pytest.raises(StructuredOutputError) as excinfo:
+        parse_structured('{"candidate_name": "A", "recommendation": "MAYBE"}', RevenueAnalysis)
+    assert excinfo.value.raw_response.startswith('{"candidate_name"')
@@ -0,0 +1,42 @@
+import time
+
+from agents.llm_cache import ResponseCache, make_cache_key
+
+
+def test_cache_key_depends_on_model_prompt_and_config():
+    base = make_cache_key("gemini-3-pro", "prompt")
+    assert base == make_cache_key("gemini-3-pro", "prompt")
+    assert base != make_cache_key("gemini-flash-latest", "prompt")
+    assert base != make_cache_key("gemini-3-pro", "other prompt")
+    assert base != make_cache_key("gemini-3-pro", "prompt", {"temperature": 0.2})
+
+
+def test_cache_round_trip_and_ttl_expiry(tmp_path, monkeypatch):
+    cache = ResponseCache(path=str(tmp_path / "cache.sqlite3"), agent_ttls={"agent_b": 60})
+    cache.put("k1", '{"recommendation": "GO"}', agent="agent_b", model="gemini-3-pro")
+    assert cache.get("k1") == '{"recommendation": "GO"}'
+
+    later = time.time() + 120
+    monkeypatch.setattr("agents.llm_cache.time.time", lambda: later)
+    assert cache.get("k1") is None
+
+
+def test_cache_skips_agents_with_zero_ttl(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "cache.sqlite3"), agent_ttls={"reply_agent": 0})
+    cache.put("k1", "Option 1", agent="reply_agent", model="gemini-3-flash")
+    assert cache.get("k1") is None
+
+
+def test_cache_evicts_least_recently_used_entries(tmp_path, monkeypatch):
+    clock = iter(range(1_000, 2_000))
+    monkeypatch.setattr("agents.llm_cache.time.time", lambda: next(clock))
+    cache = ResponseCache(path=str(tmp_path / "cache.sqlite3"), max_bytes=25, default_ttl=60)
+    cache.put("old", "a" * 10, agent="x", model="m")
+    cache.put("recent", "b" * 10, agent="x", model="m")
+    assert cache.get("old") is not None  # touch "old" so "recent" becomes the LRU entry
+
+    cache.put("new", "c" * 10, agent="x", model="m")
+
+    assert cache.get("recent") is None
+    assert cache.get("old") == "a" * 10
+    assert cache.get("new") == "c" * 10
@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from agents import llm_gateway
+from agents.latency_tracker import LatencyTracker
+from models import TopicBrief
+
+
+@pytest.fixture
+def fast_hedge(monkeypatch):
+    tracker = LatencyTracker(min_samples=1, default_delay=0.05)
+    monkeypatch.setattr(llm_gateway, "get_latency_tracker", lambda: tracker)
+    return tracker
+
+
+def test_async_hedge_fires_fallback_and_cancels_slow_primary(monkeypatch, fast_hedge):
+    cancelled = []
+
+    async def fake_agenerate(model, contents, *, agent="default", config=None):
+        if model == "primary":
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(model)
+                raise
+        return f"answer from {model}"
+
+    monkeypatch.setattr(llm_gateway, "agenerate_text", fake_agenerate)
+
+    started = time.monotonic()
+    text = asyncio.run(
+        llm_gateway.agenerate_with_fallback(["primary", "secondary"], "prompt", hedge=True)
+    )
+
+    assert text == "answer from secondary"
+    assert cancelled == ["primary"]
+    assert time.monotonic() - started < 1
+
+
+def test_sync_fallback_skips_empty_and_failed_models(monkeypatch, fast_hedge):
+    def fake_generate(model, contents, *, agent="default", config=None):
+        if model == "broken":
+            raise RuntimeError("404 NOT_FOUND")
+        return "" if model == "empty" else "ok"
+
+    monkeypatch.setattr(llm_gateway, "generate_text", fake_generate)
+
+    assert llm_gateway.generate_with_fallback(["broken", "empty", "good"], "p", hedge=False) == "ok"
+    with pytest.raises(llm_gateway.LLMGatewayError):
+        llm_gateway.generate_with_fallback(["broken", "empty"], "p", hedge=False)
+
+
+def test_hedge_delay_tracks_latency_percentile():
+    tracker = LatencyTracker(min_samples=3, default_delay=10)
+    assert tracker.hedge_delay("m") == 10
+    for seconds in (1.0, 2.0, 3.0, 4.0):
+        tracker.record("m", seconds)
+    assert tracker.hedge_delay("m", q=50) == pytest.approx(2.5)
+    assert tracker.snapshot()["m"]["count"] == 4
+
+
+def test_stream_structured_yields_items_before_the_array_closes(monkeypatch):
+    brief = '{"headline": "h%d", "business_pain": "p", "urgency": "LOW", "source_url": null}'
+    chunks = ["[" + brief % 1, ", " + brief % 2, ", " + brief % 3 + "]"]
+    sent = []
+
+    async def stream():
+        for chunk in chunks:
+            sent.append(chunk)
+            yield SimpleNamespace(text=chunk, usage_metadata=None)
+
+    async def generate_content_stream(**kwargs):
+        return stream()
+
+    client = SimpleNamespace(
+        aio=SimpleNamespace(models=SimpleNamespace(generate_content_stream=generate_content_stream))
+    )
+    monkeypatch.setattr(llm_gateway, "get_client", lambda: client)
+    monkeypatch.setattr(llm_gateway, "get_cache", lambda: None)
+    monkeypatch.setattr(llm_gateway, "_check_model_available", lambda model: None)
+    monkeypatch.setattr(llm_gateway, "_record_outcome", lambda model, error: None)
+    monkeypatch.setattr(llm_gateway.get_model_catalog(), "is_stale", lambda: False)
+
+    async def consume():
+        seen = []
+        async for item in llm_gateway.astream_structured("m", "p", TopicBrief):
+            seen.append((item["headline"], len(sent)))
+        return seen
+
+    assert asyncio.run(consume()) == [("h1", 1), ("h2", 2), ("h3", 3)]
+
+
+def test_sync_hedges_run_on_their_own_executor(monkeypatch, fast_hedge):
+    threads = {}
+
+    def fake_generate(model, contents, *, agent="default", config=None):
+        threads[model] = threading.current_thread().name
+        if model == "primary":
+            time.sleep(0.5)
+        return f"answer from {model}"
+
+    monkeypatch.setattr(llm_gateway, "generate_text", fake_generate)
+
+    text = llm_gateway.generate_with_fallback(["primary", "secondary"], "prompt", hedge=True)
+
+    assert text == "answer from secondary"
+    assert all(name.startswith("exec-llm_hedge") for name in threads.values())
@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+from agents.llm_scheduler import AdmissionScheduler, PriorityClass, current_priority, llm_priority
+from agents.metrics import pipeline_context
+
+CLASSES = {
+    "recruiting": PriorityClass("recruiting", weight=4),
+    "content": PriorityClass("content", weight=1),
+    "bulk": PriorityClass("bulk", weight=1, share=0.5),
+}
+
+
+async def _admission_order(scheduler, requests):
+    """Queue `requests` ((priority, flow) pairs) behind a held slot; return the admission order."""
+    order = []
+    gate = asyncio.Event()
+
+    async def hold():
+        async with scheduler.aadmit("holder", priority="recruiting"):
+            await gate.wait()
+
+    async def request(priority, flow):
+        async with scheduler.aadmit(flow, priority=priority):
+            order.append((priority, flow))
+            await asyncio.sleep(0)
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    tasks = [asyncio.create_task(request(priority, flow)) for priority, flow in requests]
+    await asyncio.sleep(0.01)
+    gate.set()
+    await asyncio.gather(holder, *tasks)
+    return order
+
+
+def test_weighted_classes_share_admissions_under_contention():
+    scheduler = AdmissionScheduler(capacity=1, classes=CLASSES)
+    requests = [("content", f"c{i}") for i in range(5)] + [
+        ("recruiting", f"r{i}") for i in range(5)
+    ]
+    order = asyncio.run(_admission_order(scheduler, requests))
+
+    # Weight 4:1 - recruiting takes four of the first five slots, but content is not starved
+    first_five = [priority for priority, _ in order[:5]]
+    assert first_five.count("recruiting") == 4
+    assert "content" in first_five
+
+
+def test_flows_take_turns_within_a_class():
+    scheduler = AdmissionScheduler(capacity=1, classes=CLASSES)
+    requests = [("content", "agent_f")] * 3 + [("content", "agent_e")]
+    order = asyncio.run(_admission_order(scheduler, requests))
+
+    # agent_e's single call is not queued behind agent_f's whole burst
+    assert [flow for _, flow in order][:2] == ["agent_f", "agent_e"]
+
+
+def test_class_share_leaves_headroom_for_higher_classes():
+    scheduler = AdmissionScheduler(capacity=4, classes=CLASSES)
+
+    async def scenario():
+        gate = asyncio.Event()
+
+        async def bulk_call():
+            async with scheduler.aadmit("backfill", priority="bulk"):
+                await gate.wait()
+
+        bulk = [asyncio.create_task(bulk_call()) for _ in range(6)]
+        await asyncio.sleep(0.01)
+        assert scheduler.stats()["bulk"] == {"waiting": 4, "in_flight": 2}
+        # Bulk holds half the quota; a recruiting call still gets in at once
+        async with scheduler.aadmit("agent_b", priority="recruiting"):
+            pass
+        gate.set()
+        await asyncio.gather(*bulk)
+
+    asyncio.run(asyncio.wait_for(scenario(), 1))
+    assert scheduler.stats()["bulk"] == {"waiting": 0, "in_flight": 0}
+
+
+def test_priority_follows_the_pipeline_unless_overridden():
+    with pipeline_context("recruiting"):
+        assert current_priority() == "recruiting"
+        with llm_priority("bulk"):
+            assert current_priority() == "bulk"
+    with pipeline_context("signals"):
+        assert current_priority() == "dashboard"
+
+
+def test_cancelled_waiter_gives_up_its_place():
+    scheduler = AdmissionScheduler(capacity=1, classes=CLASSES)
+
+    async def scenario():
+        async with scheduler.aadmit("holder", priority="content"):
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(
+                    scheduler.aadmit("late", priority="content").__aenter__(), 0.01
+                )
+            assert scheduler.stats()["content"] == {"waiting": 0, "in_flight": 1}
+
+    asyncio.run(scenario())
+    assert scheduler.stats()["content"]["in_flight"] == 0
@@ -0,0 +1,99 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from agents import llm_gateway
+from agents.dag import DAG
+from agents.metrics import MetricsRegistry, get_metrics, instrument_pipeline, pipeline_context
+
+
+@pytest.fixture
+def metrics():
+    registry = get_metrics()
+    registry.reset()
+    yield registry
+    registry.reset()
+
+
+def test_prometheus_export_has_counters_and_cumulative_buckets():
+    registry = MetricsRegistry(buckets=(1.0, 5.0))
+    registry.inc("llm_requests_total", agent="agent_b", outcome="ok")
+    for seconds in (0.5, 2.0, 7.0):
+        registry.observe("llm_request_duration_seconds", seconds, agent="agent_b")
+
+    text = registry.to_prometheus()
+    assert "# TYPE llm_requests_total counter" in text
+    assert 'llm_requests_total{agent="agent_b",outcome="ok",pipeline="none"} 1' in text
+    assert 'le="1"} 1' in text and 'le="5"} 2' in text and 'le="+Inf"} 3' in text
+    assert 'llm_request_duration_seconds_count{agent="agent_b",pipeline="none"} 3' in text
+
+    [series] = registry.snapshot()["histograms"]["llm_request_duration_seconds"]
+    assert series["p50"] == 5.0 and series["p95"] == 7.0
+
+
+def test_pipeline_label_follows_tasks_and_threads(metrics):
+    async def stage():
+        metrics.inc("llm_retries_total", agent="agent_b")
+
+    @instrument_pipeline("recruiting")
+    async def pipeline():
+        await asyncio.to_thread(metrics.inc, "search_requests_total", agent="agent_e")
+        await asyncio.gather(stage())
+
+    asyncio.run(pipeline())
+    with pipeline_context("content"):
+        metrics.inc("search_requests_total", agent="agent_e")
+
+    assert metrics.counter_value("search_requests_total", pipeline="recruiting") == 1
+    assert metrics.counter_value("search_requests_total", pipeline="content") == 1
+    assert metrics.counter_value("llm_retries_total", pipeline="recruiting") == 1
+
+
+def test_gateway_records_tokens_latency_and_cache_hits(monkeypatch, metrics):
+    usage = SimpleNamespace(prompt_token_count=120, candidates_token_count=30)
+    response = SimpleNamespace(text="ok", usage_metadata=usage)
+    client = SimpleNamespace(models=SimpleNamespace(generate_content=lambda **kwargs: response))
+    cache = {}
+    fake_cache = SimpleNamespace(
+        get=cache.get, put=lambda key, text, agent, model: cache.__setitem__(key, text)
+    )
+    monkeypatch.setattr(llm_gateway, "get_client", lambda: client)
+    monkeypatch.setattr(llm_gateway, "get_cache", lambda: fake_cache)
+    monkeypatch.setattr(llm_gateway, "ensure_model_catalog", lambda: None)
+    monkeypatch.setattr(llm_gateway, "_check_model_available", lambda model: None)
+    monkeypatch.setattr(llm_gateway, "_record_outcome", lambda model, error: None)
+
+    for _ in range(2):
+        assert llm_gateway.generate_text("m", "metrics prompt", agent="agent_c") == "ok"
+
+    assert metrics.counter_value("llm_prompt_tokens_total", agent="agent_c") == 120
+    assert metrics.counter_value("llm_completion_tokens_total", agent="agent_c") == 30
+    assert metrics.counter_value("llm_requests_total", outcome="ok") == 1
+    assert metrics.counter_value("llm_requests_total", outcome="cache_hit") == 1
+    [series] = metrics.snapshot()["histograms"]["llm_request_duration_seconds"]
+    assert series["labels"] == {"agent": "agent_c", "model": "m", "pipeline": "none"}
+
+
+def test_durations_are_recorded_per_granularity(metrics):
+    dag = DAG()
+
+    async def scan():
+        return ["signal"]
+
+    dag.add("signal_hunter", scan, outputs=["signals"], pipeline="signals")
+
+    @instrument_pipeline("content")
+    async def pipeline():
+        await dag.run(["signals"], {})
+
+    asyncio.run(pipeline())
+    histograms = metrics.snapshot()["histograms"]
+
+    assert [s["labels"] for s in histograms["pipeline_duration_seconds"]] == [
+        {"pipeline": "content"}
+    ]
+    assert [s["labels"] for s in histograms["dag_node_duration_seconds"]] == [
+        {"node": "signal_hunter", "pipeline": "signals"}
+    ]
+    assert "stage_duration_seconds" not in histograms  # Only per-item agent steps go there
@@ -0,0 +1,62 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+
+from agents.deadlines import DeadlineExceeded
+from agents.model_health import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    ModelCatalog,
+    is_model_failure,
+)
+
+
+def test_breaker_opens_after_threshold_and_persists_across_instances(tmp_path):
+    path = str(tmp_path / "health.sqlite3")
+    breaker = CircuitBreaker(path, failure_threshold=2, cooldown=60)
+    breaker.record_failure("gemini-1.5-pro", "404 NOT_FOUND")
+    assert breaker.allow("gemini-1.5-pro")
+    breaker.record_failure("gemini-1.5-pro", "404 NOT_FOUND")
+
+    other_process = CircuitBreaker(path, failure_threshold=2, cooldown=60)
+    assert other_process.state("gemini-1.5-pro") == OPEN
+    assert not other_process.allow("gemini-1.5-pro")
+
+
+def test_breaker_half_open_allows_single_probe_then_closes(tmp_path):
+    breaker = CircuitBreaker(str(tmp_path / "health.sqlite3"), failure_threshold=1, cooldown=0)
+    breaker.record_failure("gemini-3-flash")
+
+    assert breaker.allow("gemini-3-flash")
+    assert breaker.state("gemini-3-flash") == HALF_OPEN
+    assert not breaker.allow("gemini-3-flash")
+
+    breaker.record_success("gemini-3-flash")
+    assert breaker.state("gemini-3-flash") == CLOSED
+
+
+def test_catalog_reports_unknown_models(tmp_path):
+    catalog = ModelCatalog(str(tmp_path / "catalog.json"))
+    assert catalog.is_known("gemini-3-pro") is None
+
+    catalog.refresh(lambda: [SimpleNamespace(name="models/gemini-flash-latest")])
+
+    reloaded = ModelCatalog(str(tmp_path / "catalog.json"))
+    assert reloaded.is_known("gemini-flash-latest") is True
+    assert reloaded.is_known("gemini-1.5-flash") is False
+
+
+def test_only_model_level_errors_trip_the_breaker():
+    assert is_model_failure(SimpleNamespace(code=404))
+    assert is_model_failure(SimpleNamespace(code=503))
+    assert not is_model_failure(SimpleNamespace(code=429))
+    assert not is_model_failure(SimpleNamespace(code=400))
+    assert is_model_failure(httpx.ReadTimeout("read timed out"))
+    assert is_model_failure(httpx.ConnectError("connection refused"))
+    # Raised on our side: they say nothing about the model
+    assert not is_model_failure(DeadlineExceeded("agent_b", 30))
+    assert not is_model_failure(asyncio.CancelledError())
+    assert not is_model_failure(ValueError("bad JSON"))
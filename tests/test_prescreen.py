@@ -0,0 +1,88 @@
+import asyncio
+
+from agents import prescreen
+from agents.checkpoints import CheckpointStore
+from agents.entity_ledger import EntityLedger
+from agents.prescreen import ACCEPT, REJECT, UNCERTAIN, parse_book, screen_profile, screen_revenue
+from agents.result_sink import ResultSink
+from master_orchestrator import GunnercookeOrchestrator
+
+
+def test_parse_book_reads_common_formats():
+    assert parse_book("€450k") == (450_000, 450_000)
+    assert parse_book("EUR 1.2M") == (1_200_000, 1_200_000)
+    assert parse_book("€300-500k") == (300_000, 500_000)
+    assert parse_book("EUR 450,000") == (450_000, 450_000)
+    assert parse_book("€0,8 Mio") == (800_000, 800_000)
+    assert parse_book("1,5 Mio") == (1_500_000, 1_500_000)
+    assert parse_book("1.200.000 €") == (1_200_000, 1_200_000)
+    assert parse_book("Unknown") is None
+    assert parse_book("Synthetic book 13") is None
+
+
+def test_revenue_screen_decides_only_clear_cases():
+    # Even all-institutional (20% portable), €1.5M gross is €300k portable
+    accepted = screen_revenue({"Name": "A", "Estimated_Book_of_Business": "€1.5M"})
+    assert accepted.decision == ACCEPT
+    assert accepted.result["recommendation"] == "GO"
+
+    # Even all-relationship (80% portable), €150k gross is €120k portable
+    assert screen_revenue({"Estimated_Book_of_Business": "€150k"}).decision == REJECT
+    assert screen_revenue({"Estimated_Book_of_Business": "€500k"}).decision == UNCERTAIN
+    assert screen_revenue({"Estimated_Book_of_Business": "€0,8 Mio"}).decision == UNCERTAIN
+    assert screen_revenue({"Estimated_Book_of_Business": "Unknown"}).decision == UNCERTAIN
+
+
+def test_revenue_screen_uses_structured_clients():
+    clients = [{"name": "Family Office", "type": "Relationship", "hours_per_year": 1500}]
+    screen = screen_revenue({"Name": "A", "clients": clients})
+
+    # 1500 h × €350 × 80% portable = €420k
+    assert screen.decision == ACCEPT
+    assert screen.result["total_portable_revenue"] == 420_000
+    assert "portable_revenue" not in clients[0]  # The caller's data is not modified
+
+
+def test_profile_screen_and_pipeline_skip_llm_for_clear_candidates(tmp_path, monkeypatch):
+    clear = {
+        "name": "Dr. Clear",
+        "firm": "Freshfields",
+        "title": "Senior Associate",
+        "years_in_role": 7,
+        "practice_area": "Restructuring",
+        "deals": [{"role": "Lead", "value": 50_000_000}],
+        "estimated_book": "€2M",
+    }
+    no_evidence = {"name": "Dr. Quiet", "firm": "Kanzlei Schmidt", "title": "Partner"}
+    assert screen_profile(clear).decision == ACCEPT
+    # No evidence is not evidence of no frustration: the model decides, unless opted out
+    assert screen_profile(no_evidence).decision == UNCERTAIN
+    monkeypatch.setitem(prescreen._config, "frustration_reject_at", 0)
+    assert screen_profile(no_evidence).decision == REJECT
+
+    calls = []
+
+    async def no_model(*args, **kwargs):
+        calls.append(args)
+        raise AssertionError("LLM stage called for a pre-screened candidate")
+
+    async def stage(result, *args):
+        return result
+
+    monkeypatch.setenv("RESULTS_SPILL_DIR", str(tmp_path))
+    orchestrator = GunnercookeOrchestrator(
+        store=CheckpointStore(str(tmp_path / "checkpoints.sqlite3")),
+        sink=ResultSink(str(tmp_path / "results.jsonl")),
+        ledger=EntityLedger(str(tmp_path / "entities.sqlite3")),
+    )
+    monkeypatch.setattr("master_orchestrator.stream_profiles_async", no_model)
+    monkeypatch.setattr("master_orchestrator.analyze_book_of_business_async", no_model)
+    monkeypatch.setattr(orchestrator, "_draft_outreach", stage)
+    monkeypatch.setattr(orchestrator, "_schedule_interview", stage)
+
+    results = asyncio.run(orchestrator._recruit([clear, no_evidence], "Managing Partner"))
+    names = [result["candidate"]["Name"] for result in results]
+    orchestrator.results.close()
+
+    assert names == ["Dr. Clear"]
+    assert calls == []
@@ -0,0 +1,56 @@
+from agents.prompt_guardrails import (
+    OUTPUT_TOKEN_RESERVE,
+    PromptBudget,
+    TokenBudget,
+    TokenEstimator,
+    chunk_transcript,
+    reduce_summary_payloads,
+    summarize_chunks,
+)
+
+GERMAN = (
+    "Kandidat: Die Lieferkettensorgfaltspflichtengesetz-Prüfung und die "
+    "Geschäftsführerhaftung sind nicht mit der Vermögensschadenhaftpflicht abgedeckt."
+)
+ENGLISH = "Candidate: The supply chain review and the director liability are not covered by it."
+
+
+def test_estimator_detects_language_and_charges_german_compounds_more():
+    estimator = TokenEstimator()
+    assert estimator.detect_language(GERMAN) == "DE"
+    assert estimator.detect_language(ENGLISH) == "EN"
+    assert estimator.count(GERMAN) / len(GERMAN) > estimator.count(ENGLISH) / len(ENGLISH)
+    assert len(ENGLISH) / 6 < estimator.count(ENGLISH) < len(ENGLISH) / 3
+
+
+def test_calibration_moves_the_language_scale_towards_real_counts():
+    estimator = TokenEstimator()
+    before = estimator.count(GERMAN)
+    for _ in range(20):
+        estimator.calibrate(GERMAN, before * 2)
+    assert estimator.count(GERMAN) > 1.8 * before
+    assert estimator.count(ENGLISH) == TokenEstimator().count(ENGLISH)
+
+
+def test_token_mode_chunks_fit_the_budget():
+    budget = TokenBudget(raw_chunk_size_tokens=60)
+    transcript = "\n".join([GERMAN, ENGLISH] * 20) + "\n" + "Wort" * 200
+    chunks = chunk_transcript(transcript, budget.raw_chunk_size, budget.measure)
+
+    assert len(chunks) > 1
+    assert all(budget.measure(chunk.text) <= 60 for chunk in chunks)
+    assert "".join(c.text for c in chunks).replace("\n", "").replace(" ", "") == (
+        transcript.replace("\n", "").replace(" ", "")
+    )
+
+
+def test_context_window_budget_and_char_mode_defaults():
+    budget = TokenBudget.for_context_window(1_048_576)
+    assert budget.input_budget == 1_048_576 - OUTPUT_TOKEN_RESERVE
+    assert budget.raw_chunk_size < budget.input_budget
+
+    chars = PromptBudget()
+    chunks = chunk_transcript("A: " + "x " * 4_000, chars.raw_chunk_size, chars.measure)
+    assert all(chunk.char_count <= 3_000 for chunk in chunks)
+    payloads = summarize_chunks(chunks, lambda chunk: chunk.text[:10])
+    assert reduce_summary_payloads(payloads, lambda group, idx: "merged", 10_000) == payloads
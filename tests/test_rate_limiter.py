@@ -0,0 +1,50 @@
+from types import SimpleNamespace
+
+import pytest
+
+from agents.rate_limiter import (
+    Limiter,
+    RateLimit,
+    TokenBucket,
+    call_with_rate_limit,
+    retry_after_seconds,
+)
+
+
+class FakeRateLimitError(Exception):
+    def __init__(self, headers=None, details=""):
+        super().__init__("429 RESOURCE_EXHAUSTED")
+        self.code = 429
+        self.response = SimpleNamespace(headers=headers or {})
+        self.details = details
+
+
+def test_token_bucket_only_waits_when_empty():
+    bucket = TokenBucket(rate_per_second=1.0, capacity=2)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(1.0, abs=0.05)
+
+
+def test_retry_after_prefers_header_then_retry_info():
+    assert retry_after_seconds(FakeRateLimitError(headers={"retry-after": "7"})) == 7.0
+    details = "{'error': {'details': [{'retryDelay': '12s'}]}}"
+    assert retry_after_seconds(FakeRateLimitError(details=details)) == 12.0
+    assert retry_after_seconds(ValueError("boom")) is None
+
+
+def test_call_with_rate_limit_retries_429_and_blocks_bucket(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr("agents.rate_limiter.time.sleep", sleeps.append)
+    limiter = Limiter("llm:test", RateLimit(rpm=600))
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise FakeRateLimitError(headers={"retry-after": "3"})
+        return "ok"
+
+    assert call_with_rate_limit(limiter, flaky) == "ok"
+    assert len(attempts) == 2
+    assert sleeps and sleeps[-1] == pytest.approx(3.0, abs=0.1)
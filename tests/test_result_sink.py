@@ -0,0 +1,42 @@
+import json
+
+from agents.result_sink import ResultSink, compact_view, read_results
+
+
+def test_records_are_readable_while_the_sink_is_open(tmp_path):
+    path = str(tmp_path / "results.jsonl")
+    sink = ResultSink(path, fsync_every=100, fsync_interval=60)
+    sink.write("candidate", "Anna|X", {"score": 80}, run_id="run-1")
+    sink.write("post", "https://a", {"post": "hi"}, run_id="run-1")
+
+    records = list(read_results(path, kinds=["candidate"]))
+
+    assert [(r["run_id"], r["key"], r["data"]) for r in records] == [
+        ("run-1", "Anna|X", {"score": 80})
+    ]
+    sink.close()
+
+
+def test_compact_view_keeps_latest_record_per_key_of_one_run(tmp_path):
+    path = str(tmp_path / "results.jsonl")
+    sink = ResultSink(path)
+    sink.write("candidate", "Anna|X", {"attempt": 1}, run_id="run-1")
+    sink.write("candidate", "Ben|Y", {"attempt": 1}, run_id="run-1")
+    sink.write("candidate", "Anna|X", {"attempt": 2}, run_id="run-1")  # re-emitted on resume
+    sink.write("alert", "Carla", {"at_risk": True}, run_id="run-2")
+    sink.close()
+
+    assert compact_view(path, "run-1") == {
+        "run_id": "run-1",
+        "counts": {"candidate": 2},
+        "items": {"candidate": [{"attempt": 2}, {"attempt": 1}]},
+    }
+    assert compact_view(path)["run_id"] == "run-2"
+
+
+def test_partial_last_line_is_skipped(tmp_path):
+    path = tmp_path / "results.jsonl"
+    whole = json.dumps({"run_id": "r", "kind": "post", "key": "k", "data": 1})
+    path.write_text(whole + "\n" + '{"run_id": "r", "kind": "po', encoding="utf-8")
+
+    assert [r["data"] for r in read_results(str(path))] == [1]
@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+from agents.results_store import ResultsStore
+
+
+def _result(name, dossier_size):
+    return {
+        "candidate": {"Name": name},
+        "scheduling": {"dossier": "═" * dossier_size},
+    }
+
+
+def test_payloads_are_compressed_on_disk_and_loaded_back_lazily(tmp_path):
+    store = ResultsStore(str(tmp_path / "run.seg"))
+    refs = [
+        store.add(
+            "candidate", name, _result(name, 5000), lambda r: {"Name": r["candidate"]["Name"]}
+        )
+        for name in ("Anna", "Ben")
+    ]
+
+    assert store.summaries("candidate") == [{"Name": "Anna"}, {"Name": "Ben"}]
+    assert store.disk_bytes < 2 * 5000
+    assert refs[1]["candidate"] == {"Name": "Ben"}
+    assert refs[0].payload() == _result("Anna", 5000)
+    assert [p["candidate"]["Name"] for p in store.iter_payloads("candidate")] == ["Anna", "Ben"]
+
+
+def test_kinds_are_indexed_separately(tmp_path):
+    store = ResultsStore(str(tmp_path / "run.seg"))
+    store.add("candidate", "a", {"x": 1})
+    store.add("post", "p", {"y": 2})
+
+    assert store.count("candidate") == 1
+    assert [ref.key for ref in store.refs("post")] == ["p"]
+    assert store.count("alert") == 0
+
+
+def test_close_deletes_the_segment(tmp_path):
+    path = tmp_path / "run.seg"
+    store = ResultsStore(str(path))
+    ref = store.add("candidate", "a", {"x": 1})
+    assert os.path.exists(path)
+
+    store.close()
+
+    assert not os.path.exists(path)
+    assert store.count("candidate") == 0
+    with pytest.raises(ValueError):
+        ref.payload()
@@ -0,0 +1,200 @@
+import asyncio
+import os
+from collections import OrderedDict
+
+import pytest
+
+import orchestrator_shards
+from agents import entity_ledger
+from agents.checkpoints import CheckpointStore
+from agents.entity_ledger import EntityLedger
+from agents.result_sink import ResultSink, read_results
+from agents.sharding import (
+    DONE,
+    FAILED,
+    ShardDispatcher,
+    ShardTaskError,
+    SQLiteBroker,
+    open_broker,
+    serve_shards,
+    shard_of,
+)
+from master_orchestrator import GunnercookeOrchestrator
+
+
+def test_shard_of_is_stable_and_spreads_keys():
+    keys = [f"Candidate {i}|Firm {i % 7}" for i in range(400)]
+    shards = [shard_of(key, 4) for key in keys]
+
+    assert shards == [shard_of(key, 4) for key in keys]
+    assert shard_of("Anna|X", 4) == 1  # Same value in every process and on every host
+    assert all(60 < shards.count(shard) < 140 for shard in range(4))
+
+
+def test_claims_are_exclusive_per_shard_and_expired_leases_requeue(tmp_path):
+    url = f"sqlite:///{tmp_path}/broker.sqlite3"
+    coordinator, worker_a, worker_b = open_broker(url), open_broker(url), open_broker(url)
+    ids = [coordinator.publish("run-1", i % 2, "candidate", f"k{i}", {"i": i}) for i in range(6)]
+
+    claimed_a = worker_a.claim("a", [0], limit=10)
+    assert [task.payload["i"] for task in claimed_a] == [0, 2, 4]
+    assert worker_b.claim("b", [0], limit=10) == []  # Shard 0's tasks are already taken
+    assert len(worker_b.claim("b", [1], limit=2)) == 2
+
+    worker_a.complete(claimed_a[0].id, "a", {"ok": True})
+    worker_a.fail(claimed_a[1].id, "a", "boom")
+    finished = {task.id: task for task in coordinator.collect(ids)}
+    assert finished[claimed_a[0].id].status == DONE
+    assert finished[claimed_a[0].id].result == {"ok": True}
+    assert finished[claimed_a[1].id].status == FAILED
+    assert coordinator.collect(ids) == []  # Collected tasks are removed
+
+    # Worker a dies holding its last task: the lease runs out and another worker takes it
+    assert coordinator.requeue_expired(lease=-1) == 3
+    [k4] = worker_b.claim("b", [0], limit=10)
+    assert k4.key == "k4"
+    # Worker a finishing late cannot overwrite the task it no longer holds
+    worker_a.complete(k4.id, "a", {"stale": True})
+    assert coordinator.collect([k4.id]) == []
+    worker_b.complete(k4.id, "b", {"ok": True})
+    assert [task.result for task in coordinator.collect([k4.id])] == [{"ok": True}]
+
+
+def test_dispatcher_returns_worker_results_and_errors(tmp_path):
+    broker = SQLiteBroker(str(tmp_path / "broker.sqlite3"))
+    dispatcher = ShardDispatcher(broker, shards=2, poll_interval=0.01)
+
+    async def echo(task):
+        if task.payload == "fail":
+            raise ValueError("bad item")
+        return {"shard": task.shard, "item": task.payload}
+
+    async def scenario():
+        stopping = asyncio.Event()
+        workers = [
+            asyncio.create_task(
+                serve_shards(broker, [shard], {"echo": echo}, stopping=stopping, poll_interval=0.01)
+            )
+            for shard in range(2)
+        ]
+        results = await asyncio.gather(
+            *(dispatcher.submit("echo", f"key-{i}", i, run_id="run-1") for i in range(8))
+        )
+        with pytest.raises(ShardTaskError, match="bad item"):
+            await dispatcher.submit("echo", "key-x", "fail", run_id="run-1")
+        stopping.set()
+        return results, await asyncio.gather(*workers)
+
+    results, handled = asyncio.run(asyncio.wait_for(scenario(), 5))
+    assert [result["item"] for result in results] == list(range(8))
+    assert [result["shard"] for result in results] == [shard_of(f"key-{i}", 2) for i in range(8)]
+    assert sum(handled) == 9
+    assert broker.pending() == 0
+
+
+def test_sharded_recruiting_merges_into_one_result_set(tmp_path, monkeypatch):
+    # Workers build their own orchestrators from the environment
+    monkeypatch.setenv("CHECKPOINTS_DISABLED", "1")
+    monkeypatch.setenv("ENTITY_LEDGER_DISABLED", "1")
+    monkeypatch.setenv("RESULTS_SPILL_DIR", str(tmp_path))
+    monkeypatch.setattr(orchestrator_shards, "_orchestrators", OrderedDict())
+
+    async def analyze_book(deal_sheet, name):
+        go = not name.endswith("3")
+        return {"total_portable_revenue": 300_000, "recommendation": "GO" if go else "NO GO"}
+
+    async def outreach(**kwargs):
+        return f"Hello {kwargs['candidate_name']}"
+
+    async def schedule(self, result):
+        result["scheduling"] = {"slot": "Mon 10:00"}
+        return result
+
+    monkeypatch.setattr("master_orchestrator.analyze_book_of_business_async", analyze_book)
+    monkeypatch.setattr("master_orchestrator.generate_outreach_async", outreach)
+    monkeypatch.setattr(GunnercookeOrchestrator, "_schedule_interview", schedule)
+
+    candidates = [
+        {
+            "Name": f"Candidate {i}",
+            "Current_Firm": f"Firm {i}",
+            "Years_in_Role": 6,
+            "Estimated_Book_of_Business": "Unknown",
+            "Reason_for_Score": "Passed over",
+            "Frustration_Score": 85,
+        }
+        for i in range(6)
+    ]
+
+    async def scored(profiles):
+        for candidate in candidates:
+            yield candidate
+
+    broker = SQLiteBroker(str(tmp_path / "broker.sqlite3"))
+    coordinator = GunnercookeOrchestrator(
+        store=CheckpointStore(str(tmp_path / "checkpoints.sqlite3")),
+        sink=ResultSink(str(tmp_path / "results.jsonl")),
+        ledger=EntityLedger(str(tmp_path / "entities.sqlite3")),
+        dispatcher=ShardDispatcher(broker, shards=3, poll_interval=0.01),
+    )
+    monkeypatch.setattr(coordinator, "_score_profiles", scored)
+
+    async def scenario():
+        stopping = asyncio.Event()
+        workers = [
+            asyncio.create_task(
+                serve_shards(
+                    broker,
+                    [shard],
+                    orchestrator_shards.HANDLERS,
+                    stopping=stopping,
+                    poll_interval=0.01,
+                )
+            )
+            for shard in range(3)
+        ]
+        results = await coordinator._recruit("profiles", "Managing Partner")
+        stopping.set()
+        return results, await asyncio.gather(*workers)
+
+    results, handled = asyncio.run(asyncio.wait_for(scenario(), 10))
+    names = [result["candidate"]["Name"] for result in results]
+    outreach_sent = [result["outreach"] for result in results]
+    coordinator.sink.close()
+    coordinator.results.close()
+
+    expected = [f"Candidate {i}" for i in range(6) if i != 3]
+    assert names == expected  # One result set, in Agent A's order
+    assert outreach_sent == [f"Hello {name}" for name in expected]
+    assert sum(handled) == 6 and all(handled)  # Every shard did part of the work
+    assert list(orchestrator_shards._orchestrators) == [coordinator.run_id]  # One per run
+    streamed = read_results(str(tmp_path / "results.jsonl"), kinds=["candidate"])
+    assert sorted(record["key"] for record in streamed) == sorted(
+        f"{name}|Firm {name[-1]}" for name in expected
+    )
+
+
+def test_workers_reuse_one_orchestrator_per_run_and_skip_the_screening_stages(
+    tmp_path, monkeypatch
+):
+    monkeypatch.setenv("CHECKPOINTS_DISABLED", "1")
+    monkeypatch.setenv("RESULTS_SPILL_DIR", str(tmp_path))
+    monkeypatch.setenv("ENTITY_LEDGER_PATH", str(tmp_path / "entities.sqlite3"))
+    monkeypatch.setattr(entity_ledger, "_ledger", None)
+    monkeypatch.setattr(orchestrator_shards, "_orchestrators", OrderedDict())
+    monkeypatch.setattr(orchestrator_shards, "WORKER_RUNS_CACHED", 1)
+
+    first = orchestrator_shards._worker_orchestrator("run-1")
+    assert orchestrator_shards._worker_orchestrator("run-1") is first
+    first.results.add("candidate", "k", {"x": 1})  # Opens the worker's own segment
+    assert first.results.path != os.path.join(str(tmp_path), "run-1.seg")
+
+    second = orchestrator_shards._worker_orchestrator("run-2")
+    assert list(orchestrator_shards._orchestrators) == ["run-2"]
+    assert first.results.count("candidate") == 0  # Evicted and closed
+    assert not os.path.exists(first.results.path)
+
+    stages = [stage.name for stage in second._candidate_stages("S", screened=True)]
+    assert "ledger" in [stage.name for stage in second._candidate_stages("S")]
+    assert stages == ["agent_b", "agent_c", "agent_d"]
+    orchestrator_shards._close_orchestrators()
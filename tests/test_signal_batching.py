@@ -0,0 +1,55 @@
+from agents import agent_e_signal_hunter as agent_e
+from agents.llm_gateway import StructuredOutputError
+
+
+def _signals(count):
+    return [
+        {"type": "regulatory", "title": f"News {i}", "body": "x" * 200, "url": f"https://n/{i}"}
+        for i in range(count)
+    ]
+
+
+def _brief(url):
+    return {"headline": url, "business_pain": "pain", "urgency": "HIGH", "source_url": url}
+
+
+def test_pack_signal_batches_respects_budget_and_item_cap():
+    signals = _signals(10)
+    batches = agent_e.pack_signal_batches(signals, token_budget=200, max_items=3)
+    assert [s for batch in batches for s in batch] == signals
+    assert all(1 <= len(batch) <= 3 for batch in batches)
+    assert len(agent_e.pack_signal_batches(signals, token_budget=10_000, max_items=50)) == 1
+
+
+def test_invalid_batch_is_split_until_items_validate(monkeypatch):
+    calls = []
+
+    def fake_structured(model, prompt, schema, *, agent):
+        urls = [line.split("URL: ")[1].strip() for line in prompt.splitlines() if "URL: " in line]
+        calls.append(len(urls))
+        if "https://n/2" in urls and len(urls) > 1:
+            raise StructuredOutputError("bad item", raw_response="[]")
+        briefs = [_brief(url) for url in urls]
+        return briefs if len(urls) > 1 else briefs[0]
+
+    monkeypatch.setattr(agent_e, "generate_structured", fake_structured)
+
+    results = agent_e.analyze_signals(_signals(4))
+
+    assert [r["source_url"] for r in results] == [f"https://n/{i}" for i in range(4)]
+    assert calls == [4, 2, 2, 1, 1]
+
+
+def test_briefs_missing_from_the_response_are_retried(monkeypatch):
+    def fake_structured(model, prompt, schema, *, agent):
+        urls = [line.split("URL: ")[1].strip() for line in prompt.splitlines() if "URL: " in line]
+        if len(urls) > 1:
+            return [_brief(url + "/") for url in urls[:-1]]  # drops the last item
+        return _brief(urls[0])
+
+    monkeypatch.setattr(agent_e, "generate_structured", fake_structured)
+
+    results = agent_e.analyze_signals(_signals(3))
+
+    assert len(results) == 3
+    assert "error" not in results[-1]
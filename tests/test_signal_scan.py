@@ -0,0 +1,73 @@
+import asyncio
+import functools
+import threading
+import time
+
+from agents import agent_e_signal_hunter as agent_e
+from agents.search_gateway import PolitenessGate, PolitenessPolicy
+
+
+def test_politeness_gate_bounds_concurrency_and_spaces_starts():
+    gate = PolitenessGate("test", PolitenessPolicy(concurrency=2, min_interval=0.02))
+    starts, in_flight, peak = [], [0], [0]
+    lock = threading.Lock()
+
+    def request():
+        with gate:
+            with lock:
+                starts.append(time.monotonic())
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.03)
+            with lock:
+                in_flight[0] -= 1
+
+    threads = [threading.Thread(target=request) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    starts.sort()
+    assert peak[0] == 2
+    assert all(b - a >= 0.015 for a, b in zip(starts, starts[1:], strict=False))
+
+
+def test_async_scan_runs_queries_concurrently_and_streams_into_analysis(monkeypatch):
+    monkeypatch.setenv("ENTITY_LEDGER_DISABLED", "1")
+    monkeypatch.setattr(agent_e, "BatchPacker", functools.partial(agent_e.BatchPacker, max_items=4))
+    events = []
+
+    async def search(query, region, max_results, agent):
+        # The first queries are the slowest: sequential order is not arrival order
+        position = [q for _, _, queries, _ in agent_e.SCANNERS for q in queries].index(query)
+        await asyncio.sleep(0.05 if position < 2 else 0.01)
+        events.append(("search", query))
+        shared = {"title": "Shared", "body": "Both", "url": "https://n/shared", "href": ""}
+        item = {"title": query, "body": "b", "url": f"https://n/{position}"}
+        item["href"] = item["url"]
+        return [item, shared] if position in (0, 5) else [item]
+
+    async def structured(model, prompt, schema, *, agent):
+        urls = [line.split("URL: ")[1].strip() for line in prompt.splitlines() if "URL: " in line]
+        events.append(("analyze", len(urls)))
+        briefs = [{"headline": url, "source_url": url} for url in urls]
+        return briefs[0] if schema is agent_e.TopicBrief else briefs
+
+    monkeypatch.setattr(agent_e, "asearch_news", search)
+    monkeypatch.setattr(agent_e, "asearch_text", search)
+    monkeypatch.setattr(agent_e, "agenerate_structured", structured)
+
+    queries = sum(len(queries) for _, _, queries, _ in agent_e.SCANNERS)
+    started = time.monotonic()
+    briefs = asyncio.run(agent_e._run_signal_hunter_async())
+    elapsed = time.monotonic() - started
+
+    assert elapsed < queries * 0.01  # Not one query after another
+    # The first batch went to analysis before the slow first queries came back
+    first_analysis = events.index(next(e for e in events if e[0] == "analyze"))
+    assert first_analysis < len([e for e in events if e[0] == "search"])
+    # Deduplicated by URL, reported in sequential scan order
+    assert [brief["source_url"] for brief in briefs] == (
+        ["https://n/0", "https://n/shared"] + [f"https://n/{i}" for i in range(1, queries)]
+    )
@@ -0,0 +1,95 @@
+import asyncio
+import threading
+import time
+
+from agents.single_flight import SingleFlight
+
+
+def test_concurrent_threads_share_one_call():
+    flight = SingleFlight()
+    calls = []
+
+    def slow_search():
+        calls.append(1)
+        time.sleep(0.05)
+        return ["result"]
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(flight.do("q", slow_search)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [["result"]] * 5
+    assert flight.in_flight() == 0
+
+
+def test_coroutines_share_one_call_and_errors_propagate():
+    flight = SingleFlight()
+    calls = []
+
+    async def failing_prompt():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise ValueError("quota")
+
+    async def run():
+        return await asyncio.gather(
+            *(flight.ado("p", failing_prompt) for _ in range(3)), return_exceptions=True
+        )
+
+    outcomes = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(isinstance(outcome, ValueError) for outcome in outcomes)
+
+
+def test_cancelling_one_caller_does_not_fail_the_others():
+    flight = SingleFlight()
+    calls = []
+
+    async def slot_prompt():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "slots"
+
+    async def run():
+        leader = asyncio.create_task(flight.ado("d", slot_prompt))
+        await asyncio.sleep(0)
+        followers = [asyncio.create_task(flight.ado("d", slot_prompt)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        followers[0].cancel()  # e.g. one candidate's step deadline
+        outcomes = await asyncio.gather(leader, *followers, return_exceptions=True)
+        return outcomes
+
+    outcomes = asyncio.run(run())
+    assert isinstance(outcomes[1], asyncio.CancelledError)
+    assert outcomes[0] == outcomes[2] == outcomes[3] == "slots"
+    assert len(calls) == 1
+    assert flight.in_flight() == 0
+
+
+def test_followers_take_over_when_the_leader_is_cancelled():
+    flight = SingleFlight()
+    calls = []
+
+    async def slot_prompt():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return "slots"
+
+    async def run():
+        leader = asyncio.create_task(flight.ado("d", slot_prompt))
+        await asyncio.sleep(0)
+        followers = [asyncio.create_task(flight.ado("d", slot_prompt)) for _ in range(2)]
+        await asyncio.sleep(0.005)
+        leader.cancel()
+        return await asyncio.gather(*followers)
+
+    assert asyncio.run(run()) == ["slots", "slots"]
+    assert len(calls) == 2  # The cancelled leader's call, then one follower's retry
+    assert flight.in_flight() == 0
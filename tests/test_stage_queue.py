@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from agents.stage_queue import Stage, run_stages
+
+
+def _tracked(limit_log, name, fn):
+    active = {"now": 0}
+
+    async def stage(item):
+        active["now"] += 1
+        limit_log.setdefault(name, 0)
+        limit_log[name] = max(limit_log[name], active["now"])
+        try:
+            await asyncio.sleep(0.001 * (item % 3))
+            return fn(item)
+        finally:
+            active["now"] -= 1
+
+    return stage
+
+
+def test_each_stage_respects_its_own_worker_limit():
+    peaks = {}
+    stages = [
+        Stage("b", _tracked(peaks, "b", lambda x: x), concurrency=5),
+        Stage("c", _tracked(peaks, "c", lambda x: x * 10), concurrency=2),
+    ]
+
+    results = asyncio.run(run_stages(range(40), stages))
+
+    assert results == [x * 10 for x in range(40)]
+    assert peaks == {"b": 5, "c": 2}
+
+
+def test_dropped_items_stay_none_and_keep_input_order():
+    async def only_even(item):
+        return item if item % 2 == 0 else None
+
+    async def label(item):
+        await asyncio.sleep(0.001 * (10 - item))
+        return f"#{item}"
+
+    results = asyncio.run(run_stages(range(10), [Stage("b", only_even), Stage("c", label)]))
+
+    assert results == ["#0", None, "#2", None, "#4", None, "#6", None, "#8", None]
+
+
+def test_stage_error_surfaces_after_the_batch_drains():
+    finished = []
+
+    async def flaky(item):
+        if item == 1:
+            raise RuntimeError("boom")
+        finished.append(item)
+        return item
+
+    with pytest.raises(RuntimeError, match="boom"):
+        asyncio.run(run_stages(range(5), [Stage("b", flaky, concurrency=1)]))
+    assert finished == [0, 2, 3, 4]
+
+
+def test_async_source_items_enter_the_first_stage_as_they_arrive():
+    started = []
+
+    async def source():
+        for item in range(3):
+            await asyncio.sleep(0.01)
+            yield item
+
+    async def stage(item):
+        started.append(item)
+        return item + 1
+
+    assert asyncio.run(run_stages(source(), [Stage("b", stage)])) == [1, 2, 3]
+    assert started == [0, 1, 2]
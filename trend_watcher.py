@@ -1,6 +1,4 @@
-import time
-
-from ddgs import DDGS
+from agents.search_gateway import search_news
 
 
 def check_trends():
@@ -18,33 +16,29 @@ def check_trends():
 
     found_trends = False
 
-    with DDGS() as ddgs:
-        for country, query in keywords:
-            print(f"Scanning {country}: '{query}'...")
-            try:
-                # Use 'news' search specifically if available, else 'text' with time filter 'd' (day)
-                # ddgs.news() is often better for trending
-                results = ddgs.news(
-                    query,
-                    region="de-de" if country == "Germany" else "us-en",
-                    safesearch="off",
-                    max_results=3,
-                )
-
-                if results:
-                    found_trends = True
-                    print(f"\n🚨 TREND ALERT ({country}):")
-                    for r in results:
-                        # Depending on version r is dict or object. Usually dict.
-                        title = r.get("title")
-                        date = r.get("date")  # Might be relative like "2 hours ago"
-                        url = r.get("url")
-                        print(f"  - [{date}] {title}")
-                        print(f"    Link: {url}")
-            except Exception as e:
-                print(f"  Error scanning {country}: {e}")
-
-            time.sleep(2)  # be nice
+    # The search gateway spaces requests to DDGS out
+    for country, query in keywords:
+        print(f"Scanning {country}: '{query}'...")
+        try:
+            # News search is better than text search for trending items
+            results = search_news(
+                query,
+                region="de-de" if country == "Germany" else "us-en",
+                max_results=3,
+                agent="trend_watcher",
+            )
+
+            if results:
+                found_trends = True
+                print(f"\n🚨 TREND ALERT ({country}):")
+                for r in results:
+                    title = r.get("title")
+                    date = r.get("date")  # Might be relative like "2 hours ago"
+                    url = r.get("url")
+                    print(f"  - [{date}] {title}")
+                    print(f"    Link: {url}")
+        except Exception as e:
+            print(f"  Error scanning {country}: {e}")
 
     if not found_trends:
         print("\nNo major breaking trends found right now.")